@@ -14,8 +14,11 @@ from search.semantic_search import SemanticSearch
 from storage.vector_store import VectorStore  
 from embeddings.embedding_engine import EmbeddingEngine  
 from image_generation.advanced_image_generator import AdvancedImageGenerator  
+from monitoring.metrics import instrument_app
+from jobs.job_queue import JobQueue
   
 app = FastAPI(title="Java Knowledge System API", version="1.0.0")  
+instrument_app(app, "knowledge_api")
   
 class ChatRequest(BaseModel):  
     question: str  
@@ -34,11 +37,50 @@ class ImageResponse(BaseModel):
     image_path: Optional[str] = None  
     error: Optional[str] = None  
   
+class ImageJobResponse(BaseModel):
+    job_id: str
+    status: str
+    queue_position: Optional[int] = None
+    result: Optional[ImageResponse] = None
+    error: Optional[str] = None
+  
 vector_store = VectorStore()  
 embedding_engine = EmbeddingEngine()  
 search_engine = SemanticSearch(vector_store, embedding_engine)  
 rag_engine = RAGEngine(search_engine, api_key=os.getenv("GEMINI_API_KEY"))  
 image_generator = AdvancedImageGenerator(api_key=os.getenv("STABILITY_API_KEY"))  
+
+def run_image_job(payload: dict) -> dict:
+    # corre en un worker de la cola, fuera del event loop
+    result = image_generator.generate_with_quality_check(payload['concept'])
+    if result.get('success'):
+        return {'success': True, 'image_path': result['generation']['path']}
+    return {'success': False, 'error': result.get('error') or result.get('reason', 'Unknown error')}
+
+image_jobs = JobQueue(
+    run_image_job,
+    db_path=os.getenv("IMAGE_JOBS_DB", "data/jobs/image_jobs.db"),
+    workers=int(os.getenv("IMAGE_JOB_WORKERS", "2")),
+    name="image_jobs"
+)
+
+@app.on_event("startup")
+async def start_job_workers():
+    # al arrancar retomo los trabajos que quedaron a medias
+    image_jobs.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    image_jobs.stop()
+
+def to_job_response(job: dict) -> ImageJobResponse:
+    return ImageJobResponse(
+        job_id=job['job_id'],
+        status=job['status'],
+        queue_position=job.get('queue_position'),
+        result=ImageResponse(**job['result']) if job['result'] else None,
+        error=job['error']
+    )
   
 @app.get("/")  
 async def root():  
@@ -56,17 +98,22 @@ async def chat(request: ChatRequest):
     except Exception as e:  
         raise HTTPException(status_code=500, detail=str(e))  
   
-@app.post("/generate-image", response_model=ImageResponse)  
+@app.post("/generate-image", response_model=ImageJobResponse, status_code=202)  
 async def generate_image(request: ImageRequest):  
+    # encolo y retorno al instante; el resultado se consulta en /generate-image/{job_id}
     try:  
-        result = image_generator.generate_with_quality_check(request.concept)  
-        if result.get('success'):  
-            return ImageResponse(success=True, image_path=result['generation']['path'])  
-        else:  
-            return ImageResponse(success=False, error=result.get('error', 'Unknown error'))  
+        job_id = image_jobs.submit({'concept': request.concept, 'style': request.style})  
+        return to_job_response(image_jobs.get(job_id))  
     except Exception as e:  
         raise HTTPException(status_code=500, detail=str(e))  
   
+@app.get("/generate-image/{job_id}", response_model=ImageJobResponse)  
+async def generate_image_status(job_id: str):  
+    job = image_jobs.get(job_id)  
+    if job is None:  
+        raise HTTPException(status_code=404, detail="Job not found")  
+    return to_job_response(job)  
+  
 @app.get("/system/info")  
 async def system_info():  
     return {  
@@ -14,6 +14,9 @@ sys.path.append(str(Path(__file__).parent.parent / "src"))
 from ingestion.document_loader import DocumentLoader
 from embeddings.embedding_engine import EmbeddingEngine
 from storage.vector_store import VectorStore
+from quality.annotator import QualityAnnotator
+from quality.streaming_anomaly import StreamingAnomalyDetector
+from quality.corpus_stats import CorpusStats
 
 def setup_logging():
     """configuro logging"""
@@ -41,6 +44,7 @@ def main():
     parser.add_argument("input_dir", help="directorio que contiene los documentos a ingestar")
     parser.add_argument("--batch-size", type=int, default=16, help="tamaño de lote para generar embeddings")
     parser.add_argument("--clear", action="store_true", help="borro documentos existentes antes de ingestar")
+    parser.add_argument("--skip-quality", action="store_true", help="no califico los documentos al ingestar")
     
     args = parser.parse_args()
     
@@ -60,7 +64,15 @@ def main():
             model_name=os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v1"),
             device=os.getenv("EMBEDDING_DEVICE", "cpu")
         )
-        vector_store = VectorStore(db_path=os.getenv("CHROMA_DB_PATH", "./data/vectordb"))
+        # califico calidad y anomalías en lote y lo guardo como metadata de cada documento
+        # las anomalías las califico en streaming: sigo la deriva y reentreno solo si hace falta
+        anomaly_stream = None if args.skip_quality else StreamingAnomalyDetector()
+        quality_annotator = None if args.skip_quality else QualityAnnotator(anomaly_detector=anomaly_stream)
+        vector_store = VectorStore(
+            db_path=os.getenv("CHROMA_DB_PATH", "./data/vectordb"),
+            quality_annotator=quality_annotator,
+            corpus_stats=CorpusStats()
+        )
         
         # si me piden limpiar el store, lo hago
         if args.clear:
@@ -95,6 +107,12 @@ def main():
         final_count = vector_store.get_document_count()
         logger.info(f"ingesta completada. total de documentos en el store: {final_count}")
         
+        if anomaly_stream is not None and anomaly_stream.is_trained:
+            # si la ingesta disparó un reentrenamiento, lo dejo terminar antes de salir
+            anomaly_stream.wait_for_refit()
+            stats = anomaly_stream.get_stats()
+            logger.info(f"deriva de features: {stats['drift_score']:.2f}, reentrenamientos: {stats['refits']}")
+        
         return 0
         
     except Exception as e:
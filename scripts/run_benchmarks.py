@@ -0,0 +1,144 @@
+"""
+script cli para correr la suite de benchmarks
+escribe los resultados en json para seguir regresiones entre releases
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+import importlib.util
+from pathlib import Path
+
+# agrego src al path
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT))  # algunos módulos importan `src.monitoring`
+
+from benchmarks.suites import (
+    DEFAULT_QUERIES,
+    benchmark_ingest,
+    benchmark_search,
+    benchmark_http,
+    benchmark_image_validation,
+    serve_app_in_thread,
+    environment_info,
+)
+from stubs.fake_services import FakeGeminiServer, FakeStabilityServer, FakeServiceConfig
+
+SUITES = ["ingest", "search", "http", "validator"]
+
+def load_queries(path):
+    """cargo queries de un archivo (una por línea) o uso las de siempre"""
+    if not path:
+        return DEFAULT_QUERIES
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def run_http_suite(args, queries, logger):
+    """levanto stubs de gemini/stability y las dos apis en proceso, y mido /chat y /search"""
+    gemini = FakeGeminiServer(FakeServiceConfig(latency_ms=args.llm_latency_ms,
+                                                latency_jitter_ms=args.llm_latency_ms * 0.1)).start()
+    stability = FakeStabilityServer(FakeServiceConfig(latency_ms=args.llm_latency_ms)).start()
+    os.environ["GEMINI_API_ENDPOINT"] = gemini.url
+    os.environ["STABILITY_API_URL"] = stability.text_to_image_url()
+    os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+    os.environ.setdefault("STABILITY_API_KEY", "fake-key")
+
+    servers = []
+    try:
+        # api de chat (scripts/api_server.py arma sus componentes al importarse)
+        spec = importlib.util.spec_from_file_location("api_server", ROOT / "scripts" / "api_server.py")
+        chat_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(chat_module)
+        chat_server, chat_url = serve_app_in_thread(chat_module.app)
+        servers.append(chat_server)
+
+        # api de búsqueda (src/api/main.py)
+        from api.main import app as search_app
+        search_server, search_url = serve_app_in_thread(search_app)
+        servers.append(search_server)
+
+        logger.info(f"midiendo /chat en {chat_url} y /search en {search_url}")
+        return {
+            'llm_stub_latency_ms': args.llm_latency_ms,
+            'chat': benchmark_http(
+                f"{chat_url}/chat",
+                [{'question': q, 'top_k': 3} for q in queries],
+                n_requests=args.requests, concurrency=args.concurrency
+            ),
+            'search': benchmark_http(
+                f"{search_url}/search",
+                [{'q': q, 'top_k': 10} for q in queries],
+                method="GET", n_requests=args.requests, concurrency=args.concurrency
+            ),
+            'gemini_stub_stats': gemini.get_stats(),
+        }
+    finally:
+        for server in servers:
+            server.should_exit = True
+        gemini.stop()
+        stability.stop()
+
+def main():
+    """función principal del script"""
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(description="corro benchmarks de ingesta, búsqueda y apis")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=SUITES)
+    parser.add_argument("--docs-dir", default="data/raw/github_docs", help="documentos para la suite de ingesta")
+    parser.add_argument("--batch-size", type=int, default=16, help="tamaño de lote de embeddings")
+    parser.add_argument("--queries-file", default=None, help="archivo con una query por línea")
+    parser.add_argument("--requests", type=int, default=200, help="requests por medición")
+    parser.add_argument("--concurrency", type=int, default=8, help="hilos concurrentes")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="latencia de los stubs de llm")
+    parser.add_argument("--validator-max-side", type=int, default=512,
+                        help="lado máximo del análisis reducido en la suite validator")
+    parser.add_argument("--output", default=None, help="ruta del json (por defecto data/benchmarks/<fecha>.json)")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries_file)
+    env = environment_info()
+    results = {'environment': env, 'config': vars(args), 'results': {}}
+
+    embedding_engine = None
+    if "ingest" in args.suites or "search" in args.suites:
+        from embeddings.embedding_engine import EmbeddingEngine
+        embedding_engine = EmbeddingEngine()
+
+    if "ingest" in args.suites:
+        logger.info("suite de ingesta...")
+        results['results']['ingest'] = benchmark_ingest(args.docs_dir, args.batch_size, embedding_engine)
+
+    if "search" in args.suites:
+        logger.info("suite de búsqueda...")
+        from storage.vector_store import VectorStore
+        from search.semantic_search import SemanticSearch
+        search_engine = SemanticSearch(VectorStore(), embedding_engine)
+        results['results']['search'] = benchmark_search(
+            search_engine, queries, n_requests=args.requests, concurrency=args.concurrency
+        )
+
+    if "http" in args.suites:
+        logger.info("suite http con backends simulados...")
+        results['results']['http'] = run_http_suite(args, queries, logger)
+
+    if "validator" in args.suites:
+        logger.info("suite del validador de imágenes...")
+        results['results']['validator'] = benchmark_image_validation(
+            analysis_max_side=args.validator_max_side
+        )
+
+    output = Path(args.output) if args.output else \
+        Path("data/benchmarks") / f"benchmark_{env['timestamp'].replace(':', '-')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print(json.dumps(results['results'], indent=2, ensure_ascii=False))
+    print(f"\nresultados guardados en {output}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
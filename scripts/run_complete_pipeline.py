@@ -11,6 +11,8 @@ from embeddings.embedding_engine import EmbeddingEngine
 from storage.vector_store import VectorStore
 from quality.quality_classifier import QualityClassifier
 from quality.anomaly_detector import AnomalyDetector
+from quality.annotator import QualityAnnotator
+from quality.corpus_stats import CorpusStats
 from clustering.cluster_engine import ClusterEngine
 from clustering.dimensionality_reducer import DimensionalityReducer
 
@@ -25,16 +27,8 @@ def main():
     docs = loader.load_documents_from_directory("data/raw/github_docs")
     print(f"   {len(docs)} documentos cargados")
     
-    print("\npaso 2: generando embeddings...")
-    engine = EmbeddingEngine()
-    embeddings_dict = engine.encode_documents(docs)
-    
-    store = VectorStore()
-    store.delete_all_documents()
-    store.add_documents(docs, embeddings_dict)
-    print(f"   {len(embeddings_dict)} embeddings generados y almacenados")
-    
-    print("\npaso 3: entrenando modelos de calidad...")
+    # entreno antes de almacenar para guardar la calidad como metadata de cada documento
+    print("\npaso 2: entrenando modelos de calidad...")
     classifier = QualityClassifier()
     quality_report = classifier.train(docs)
     print(f"   clasificador entrenado (Accuracy: {quality_report['accuracy']:.3f})")
@@ -43,6 +37,15 @@ def main():
     anomaly_report = detector.train(docs)
     print(f"   detector entrenado ({anomaly_report['anomalies_detected']} anomalías)")
     
+    print("\npaso 3: generando embeddings...")
+    engine = EmbeddingEngine()
+    embeddings_dict = engine.encode_documents(docs)
+    
+    store = VectorStore(quality_annotator=QualityAnnotator(classifier, detector), corpus_stats=CorpusStats())
+    store.delete_all_documents()
+    store.add_documents(docs, embeddings_dict)
+    print(f"   {len(embeddings_dict)} embeddings generados y almacenados con su calidad")
+    
     print("\npaso 4: ejecutando clustering...")
     embeddings_array = np.array(list(embeddings_dict.values()))
     
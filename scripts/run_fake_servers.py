@@ -0,0 +1,65 @@
+"""
+script cli para levantar los servidores falsos de gemini y stability ai
+sirve para pruebas de carga y latencia sin api keys ni red
+"""
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+# agrego src al path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from stubs.fake_services import FakeGeminiServer, FakeStabilityServer, FakeServiceConfig
+
+def main():
+    """función principal del script"""
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="levanto servidores falsos de gemini y stability")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--gemini-port", type=int, default=8701)
+    parser.add_argument("--stability-port", type=int, default=8702)
+    parser.add_argument("--gemini-latency-ms", type=float, default=800.0, help="latencia media de gemini")
+    parser.add_argument("--stability-latency-ms", type=float, default=6000.0, help="latencia media de stability")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="variación uniforme de la latencia")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fracción de requests que fallan (0-1)")
+    parser.add_argument("--error-status", type=int, default=500, help="código http de los fallos simulados")
+    parser.add_argument("--response-chars", type=int, default=800, help="largo de la respuesta de gemini")
+    parser.add_argument("--image-size", type=int, default=None, help="lado de la imagen (por defecto el del request)")
+    parser.add_argument("--compress-level", type=int, default=6, help="compresión png 0-9 (0 = payload más grande)")
+    args = parser.parse_args()
+
+    common = dict(
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    gemini = FakeGeminiServer(
+        FakeServiceConfig(latency_ms=args.gemini_latency_ms, response_chars=args.response_chars, **common),
+        host=args.host, port=args.gemini_port
+    ).start()
+    stability = FakeStabilityServer(
+        FakeServiceConfig(latency_ms=args.stability_latency_ms, image_size=args.image_size,
+                          compress_level=args.compress_level, **common),
+        host=args.host, port=args.stability_port
+    ).start()
+
+    print("servidores falsos listos, exporta estas variables antes de lanzar la api o la ui:")
+    print(f"   GEMINI_API_ENDPOINT={gemini.url}")
+    print(f"   STABILITY_API_URL={stability.text_to_image_url()}")
+    print("\npresiona ctrl+c para detener")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\ngemini: {gemini.get_stats()}  stability: {stability.get_stats()}")
+    finally:
+        gemini.stop()
+        stability.stop()
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
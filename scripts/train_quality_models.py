@@ -4,6 +4,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
 import logging
+import argparse
 from ingestion.document_loader import DocumentLoader
 from quality.quality_classifier import QualityClassifier
 from quality.anomaly_detector import AnomalyDetector
@@ -12,6 +13,13 @@ from quality.dashboard import QualityDashboard
 def main():
     logging.basicConfig(level=logging.INFO)
     
+    parser = argparse.ArgumentParser(description="entreno los modelos de calidad y anomalías")
+    parser.add_argument("--search", action="store_true",
+                        help="busco hiperparámetros del clasificador con validación cruzada en paralelo")
+    parser.add_argument("--jobs", type=int, default=None, help="procesos para la búsqueda (default: todos los núcleos)")
+    parser.add_argument("--cv", type=int, default=3, help="folds de la validación cruzada")
+    args = parser.parse_args()
+    
     print("iniciando entrenamiento de modelos de calidad...")
     
     # cargo documentos
@@ -28,7 +36,14 @@ def main():
     # entreno clasificador de calidad
     print("\n 1. entrenando clasificador de calidad...")
     classifier = QualityClassifier()
-    quality_report = classifier.train(docs)
+    if args.search:
+        quality_report = classifier.train_with_search(docs, cv=args.cv, n_jobs=args.jobs)
+        search = quality_report['search']
+        print(f"   mejores parámetros: {search['best_params']}")
+        print(f"   cv accuracy: {search['best_cv_accuracy']:.3f} "
+              f"({search['fold_fits']} entrenamientos en {search['search_seconds']:.1f}s con {search['n_jobs']} procesos)")
+    else:
+        quality_report = classifier.train(docs)
     print(f"   accuracy: {quality_report['accuracy']:.3f}")
     
     # entreno detector de anomalías
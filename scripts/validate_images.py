@@ -0,0 +1,68 @@
+"""
+script cli para auditar la calidad de todas las imágenes generadas
+valida en paralelo y escribe un reporte jsonl/parquet mientras avanza
+"""
+import sys
+import json
+import time
+import logging
+import argparse
+from pathlib import Path
+
+# agrego src/image_generation y la raíz al path
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT / "src" / "image_generation"))
+sys.path.append(str(ROOT))
+
+from bulk_validation import iter_image_paths, validate_bulk, summarize
+
+def main():
+    """función principal del script"""
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(description="valido en paralelo un directorio o glob de imágenes")
+    parser.add_argument("source", nargs="?", default="data/generated_images",
+                        help="directorio (recursivo) o patrón glob, p.ej. 'data/**/*.png'")
+    parser.add_argument("--report", default=None,
+                        help="ruta del reporte .jsonl o .parquet (por defecto data/reports/image_quality_<fecha>.jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto uno por núcleo)")
+    parser.add_argument("--min-score", type=float, default=0.6, help="score mínimo para aprobar")
+    parser.add_argument("--max-side", type=int, default=None,
+                        help="analizo una versión reducida a este lado máximo (más rápido, scores aproximados)")
+    parser.add_argument("--no-recursive", action="store_true", help="no recorro subdirectorios")
+    args = parser.parse_args()
+
+    report = Path(args.report) if args.report else \
+        Path("data/reports") / f"image_quality_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+    paths = iter_image_paths(args.source, recursive=not args.no_recursive)
+    start = time.perf_counter()
+    processed = 0
+
+    def progress(results):
+        nonlocal processed
+        for result in results:
+            processed += 1
+            if processed % 500 == 0:
+                elapsed = time.perf_counter() - start
+                logger.info(f"{processed} imágenes validadas ({processed / elapsed:.1f} img/s)")
+            yield result
+
+    summary = summarize(progress(validate_bulk(
+        paths,
+        report_path=report,
+        workers=args.workers,
+        min_quality_score=args.min_score,
+        analysis_max_side=args.max_side
+    )))
+    elapsed = time.perf_counter() - start
+    summary['elapsed_s'] = round(elapsed, 2)
+    summary['images_per_s'] = round(summary['total_images'] / elapsed, 2) if elapsed > 0 else 0.0
+    summary['report'] = str(report)
+
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
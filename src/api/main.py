@@ -12,6 +12,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 from search.semantic_search import SemanticSearch, SearchResult
 from storage.vector_store import VectorStore
 from embeddings.embedding_engine import EmbeddingEngine
+from monitoring.metrics import instrument_app
 
 # configuro logging
 logging.basicConfig(level=logging.INFO)
@@ -32,6 +33,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# expongo /metrics y mido la latencia de cada endpoint
+instrument_app(app, "search_api")
+
 # modelos pydantic
 class SearchRequest(BaseModel):
     query: str
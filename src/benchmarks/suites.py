@@ -0,0 +1,328 @@
+"""
+suites de benchmark del sistema
+mido ingesta, búsqueda semántica, latencia http de /chat y /search
+y el costo de validar la calidad de una imagen
+"""
+
+import os
+import time
+import logging
+import platform
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERIES = [
+    "Spring Boot REST API",
+    "cómo configuro un controller en spring mvc",
+    "dependency injection con anotaciones",
+    "JPA entity relationships one-to-many",
+    "microservices architecture with service discovery",
+    "spring security authentication flow",
+    "java streams y colecciones",
+    "configuración de application.properties",
+]
+
+
+def latency_summary(latencies_s: List[float], wall_time_s: float, errors: int = 0) -> Dict[str, Any]:
+    """resumo latencias (en segundos) como qps y percentiles en ms"""
+    if not latencies_s:
+        return {'requests': 0, 'errors': errors, 'qps': 0.0}
+
+    ms = np.asarray(latencies_s) * 1000.0
+    return {
+        'requests': len(latencies_s),
+        'errors': errors,
+        'wall_time_s': round(wall_time_s, 4),
+        'qps': round(len(latencies_s) / wall_time_s, 2) if wall_time_s > 0 else 0.0,
+        'latency_ms': {
+            'mean': round(float(ms.mean()), 3),
+            'p50': round(float(np.percentile(ms, 50)), 3),
+            'p95': round(float(np.percentile(ms, 95)), 3),
+            'p99': round(float(np.percentile(ms, 99)), 3),
+            'max': round(float(ms.max()), 3),
+        }
+    }
+
+
+def run_concurrent(call: Callable[[int], bool], n_requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    ejecuto call(i) n_requests veces con concurrency hilos
+    call retorna True si la operación fue exitosa
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def timed(i: int):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ok = call(i)
+        except Exception as e:
+            logger.debug(f"request {i} falló: {e}")
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(n_requests)))
+    wall_time = time.perf_counter() - wall_start
+
+    summary = latency_summary(latencies, wall_time, errors)
+    summary['concurrency'] = concurrency
+    return summary
+
+
+def benchmark_ingest(docs_dir: str, batch_size: int = 16, embedding_engine=None) -> Dict[str, Any]:
+    """mido docs/seg de DocumentLoader + EmbeddingEngine.encode_documents"""
+    from ingestion.document_loader import DocumentLoader
+    from embeddings.embedding_engine import EmbeddingEngine
+
+    if embedding_engine is None:
+        embedding_engine = EmbeddingEngine()
+
+    loader = DocumentLoader()
+    start = time.perf_counter()
+    documents = loader.load_documents_from_directory(Path(docs_dir))
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embeddings = embedding_engine.encode_documents(documents, batch_size=batch_size)
+    encode_time = time.perf_counter() - start
+
+    total = load_time + encode_time
+    n_docs = len(documents)
+    return {
+        'documents': n_docs,
+        'embeddings': len(embeddings),
+        'batch_size': batch_size,
+        'load_time_s': round(load_time, 4),
+        'encode_time_s': round(encode_time, 4),
+        'load_docs_per_s': round(n_docs / load_time, 2) if load_time > 0 else 0.0,
+        'encode_docs_per_s': round(n_docs / encode_time, 2) if encode_time > 0 else 0.0,
+        'docs_per_s': round(n_docs / total, 2) if total > 0 else 0.0,
+    }
+
+
+def benchmark_search(search_engine, queries: Optional[List[str]] = None,
+                     n_requests: int = 200, concurrency: int = 4,
+                     top_k: int = 10) -> Dict[str, Any]:
+    """mido qps y percentiles de SemanticSearch.search"""
+    queries = queries or DEFAULT_QUERIES
+
+    # una pasada de calentamiento para no medir la carga del modelo
+    search_engine.search(queries[0], top_k=top_k)
+
+    def call(i: int) -> bool:
+        search_engine.search(queries[i % len(queries)], top_k=top_k)
+        return True
+
+    result = run_concurrent(call, n_requests, concurrency)
+    result['top_k'] = top_k
+    return result
+
+
+def benchmark_http(url: str, payloads: List[Dict], method: str = "POST",
+                   n_requests: int = 100, concurrency: int = 8,
+                   timeout: float = 120.0) -> Dict[str, Any]:
+    """mido latencia end-to-end de un endpoint http bajo concurrencia"""
+    import requests
+
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    def call(i: int) -> bool:
+        payload = payloads[i % len(payloads)]
+        if method == "GET":
+            response = session().get(url, params=payload, timeout=timeout)
+        else:
+            response = session().post(url, json=payload, timeout=timeout)
+        return response.status_code == 200
+
+    result = run_concurrent(call, n_requests, concurrency)
+    result['url'] = url
+    return result
+
+
+def synthetic_diagram(size: int = 1024, seed: int = 0):
+    """imagen rgb tipo diagrama (cajas, flechas y ruido) para medir el validador sin llamar a la api"""
+    import cv2
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    canvas = np.full((size, size, 3), 245, dtype=np.uint8)
+    for _ in range(12):
+        x, y = rng.integers(0, size - size // 5, size=2)
+        w, h = rng.integers(size // 12, size // 5, size=2)
+        color = tuple(int(c) for c in rng.integers(0, 200, size=3))
+        cv2.rectangle(canvas, (int(x), int(y)), (int(x + w), int(y + h)), color, 3)
+        x2, y2 = rng.integers(0, size, size=2)
+        cv2.arrowedLine(canvas, (int(x + w // 2), int(y + h)), (int(x2), int(y2)), color, 2)
+    noise = rng.normal(0, 6, canvas.shape)
+    canvas = np.clip(canvas + noise, 0, 255).astype(np.uint8)
+    return Image.fromarray(canvas, 'RGB')
+
+
+def legacy_quality_scores(image) -> Dict[str, float]:
+    """
+    referencia: los siete checks como eran antes, cada uno con su propio convert('L') y np.array
+    la uso para medir la mejora y verificar que los scores no cambian
+    """
+    import cv2
+    from PIL import ImageStat
+
+    scores = {}
+    gray = np.array(image.convert('L'))
+    scores['sharpness'] = min(cv2.Laplacian(gray, cv2.CV_64F).var() / 500, 1.0)
+
+    brightness = ImageStat.Stat(image.convert('L')).mean[0]
+    if 80 <= brightness <= 170:
+        scores['brightness'] = 1.0
+    elif brightness < 80:
+        scores['brightness'] = brightness / 80
+    else:
+        scores['brightness'] = max(0, (255 - brightness) / (255 - 170))
+
+    scores['contrast'] = min(ImageStat.Stat(image.convert('L')).stddev[0] / 60, 1.0)
+
+    gray = np.array(image.convert('L'))
+    noise = np.abs(gray.astype(float) - cv2.medianBlur(gray, 5).astype(float))
+    scores['noise'] = 1.0 - min(noise.mean() / 255.0 * 5, 1.0)
+
+    width, height = image.size
+    gray = np.array(image.convert('L'))
+    h_mid, w_mid = height // 2, width // 2
+    densities = [np.std(q) for q in (gray[:h_mid, :w_mid], gray[:h_mid, w_mid:],
+                                     gray[h_mid:, :w_mid], gray[h_mid:, w_mid:])]
+    balance = 1.0 - (np.std(densities) / (np.mean(densities) + 1e-6))
+    scores['composition'] = min(max(balance, 0), 1.0)
+
+    if image.mode == 'RGB':
+        deviation = np.std(ImageStat.Stat(image).mean[:3])
+        scores['color_balance'] = 1.0 - min(deviation / 100, 1.0)
+    else:
+        scores['color_balance'] = 1.0
+
+    edges = cv2.Canny(np.array(image.convert('L')), 50, 150)
+    edge_density = np.sum(edges > 0) / edges.size
+    if 0.05 <= edge_density <= 0.20:
+        scores['technical_clarity'] = 1.0
+    elif edge_density < 0.05:
+        scores['technical_clarity'] = edge_density / 0.05
+    else:
+        scores['technical_clarity'] = max(0, 1.0 - (edge_density - 0.20) / 0.30)
+    return scores
+
+
+def benchmark_image_validation(images: Optional[List[Any]] = None, iterations: int = 5,
+                               analysis_max_side: int = 512) -> Dict[str, Any]:
+    """
+    comparo por imagen: checks independientes (legacy), ImageAnalysis a resolución completa
+    y ImageAnalysis reducida; reporto ms por imagen, speedup y diferencia máxima de scores
+    """
+    from image_generation.image_quality_validator import ImageAnalysis, ImageQualityValidator
+
+    images = images or [synthetic_diagram(seed=i) for i in range(3)]
+    validator = ImageQualityValidator()
+
+    def per_image_ms(func) -> float:
+        func(images[0])  # calentamiento
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for image in images:
+                func(image)
+        return (time.perf_counter() - start) * 1000.0 / (iterations * len(images))
+
+    def engine(max_side):
+        return lambda image: validator.compute_scores(ImageAnalysis(image, max_side))
+
+    legacy_ms = per_image_ms(legacy_quality_scores)
+    full_ms = per_image_ms(engine(None))
+    reduced_ms = per_image_ms(engine(analysis_max_side))
+
+    def max_diff(max_side) -> Dict[str, float]:
+        diffs: Dict[str, float] = {}
+        for image in images:
+            reference = legacy_quality_scores(image)
+            scores = engine(max_side)(image)
+            for name, value in scores.items():
+                diffs[name] = max(diffs.get(name, 0.0), abs(float(value) - float(reference[name])))
+        return {name: round(value, 6) for name, value in diffs.items()}
+
+    return {
+        'images': len(images),
+        'image_size': list(images[0].size),
+        'iterations': iterations,
+        'legacy_ms_per_image': round(legacy_ms, 3),
+        'full_resolution': {
+            'ms_per_image': round(full_ms, 3),
+            'speedup': round(legacy_ms / full_ms, 2) if full_ms > 0 else None,
+            'max_score_diff': max_diff(None),
+        },
+        'downscaled': {
+            'max_side': analysis_max_side,
+            'ms_per_image': round(reduced_ms, 3),
+            'speedup': round(legacy_ms / reduced_ms, 2) if reduced_ms > 0 else None,
+            'max_score_diff': max_diff(analysis_max_side),
+        },
+    }
+
+
+def serve_app_in_thread(app, host: str = "127.0.0.1", port: int = 0, timeout: float = 60.0) -> Any:
+    """
+    levanto una app asgi con uvicorn en un hilo de fondo
+    retorno el servidor (server.should_exit = True para detenerlo) y su url
+    """
+    import socket
+    import uvicorn
+
+    if port == 0:
+        with socket.socket() as sock:
+            sock.bind((host, 0))
+            port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + timeout
+    while not server.started:
+        if time.time() > deadline or not thread.is_alive():
+            raise RuntimeError(f"el servidor no arrancó en {host}:{port}")
+        time.sleep(0.05)
+
+    return server, f"http://{host}:{port}"
+
+
+def environment_info() -> Dict[str, Any]:
+    """metadatos del entorno para comparar corridas entre releases"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
@@ -1,14 +1,23 @@
+import os
 import logging
-from typing import Dict
+from typing import Dict, Optional
 import google.generativeai as genai
 from src.filters.content_filter import ContentFilter  
+from src.monitoring.metrics import STAGE_LATENCY, GEMINI_ERRORS, FILTER_BLOCKS
+from src.monitoring.tracing import tracer
 
 class RAGEngine:
     """Motor de generación de respuestas usando RAG con Gemini"""
     
-    def __init__(self, search_engine, api_key: str):
+    def __init__(self, search_engine, api_key: str, api_endpoint: Optional[str] = None):
         self.search_engine = search_engine
-        genai.configure(api_key=api_key)
+        # si hay endpoint propio (p. ej. el servidor falso de src/stubs) uso transporte rest
+        api_endpoint = api_endpoint or os.getenv("GEMINI_API_ENDPOINT")
+        if api_endpoint:
+            genai.configure(api_key=api_key, transport="rest",
+                            client_options={"api_endpoint": api_endpoint})
+        else:
+            genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('models/gemini-2.5-flash')
         self.logger = logging.getLogger(__name__)
         self.content_filter = ContentFilter()
@@ -17,6 +26,7 @@ class RAGEngine:
 
         filter_result = self.content_filter.validate_prompt(query)
         if not filter_result.allowed:
+            FILTER_BLOCKS.inc(component="rag_engine")
             return {
                 'answer': "no puedo procesar esta solicitud debido a contenido inapropiado",
                 'sources': [],
@@ -26,13 +36,16 @@ class RAGEngine:
         """Genera respuesta basada en documentos"""
         self.logger.info(f"Consulta: {query}")
         
-        results = self.search_engine.search(query, top_k=top_k, min_similarity=0.2)
+        with tracer.start_span("semantic_search", {"top_k": top_k}) as span:
+            results = self.search_engine.search(query, top_k=top_k, min_similarity=0.2)
+            span.set_attribute("results", len(results))
         
         if not results:
             return {"answer": "No encontré información sobre eso en mis documentos.", "sources": []}
         
         context = self._build_context(results)
-        answer = self._call_gemini(query, context)
+        with tracer.start_span("call_gemini", {"context_chars": len(context)}):
+            answer = self._call_gemini(query, context)
         
         return {
             "answer": answer,
@@ -63,11 +76,13 @@ Instrucciones:
 """
 
         try:
-            response = self.model.generate_content(prompt)
+            with STAGE_LATENCY.time(stage="call_gemini"):
+                response = self.model.generate_content(prompt)
             if response and hasattr(response, "text"):
                 return response.text.strip()
             else:
                 return "No se obtuvo respuesta del modelo."
         except Exception as e:
+            GEMINI_ERRORS.inc()
             self.logger.error(f"Error al llamar a Gemini: {e}")
             return "Ocurrió un error al generar la respuesta."
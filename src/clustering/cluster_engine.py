@@ -7,6 +7,11 @@ import hdbscan
 from sklearn.cluster import KMeans
 from sklearn.metrics import silhouette_score, calinski_harabasz_score
 
+try:
+    from storage.model_registry import MODEL_REGISTRY
+except ImportError:
+    from src.storage.model_registry import MODEL_REGISTRY
+
 class ClusterEngine:
     """motor de clustering para documentos"""
     
@@ -18,20 +23,33 @@ class ClusterEngine:
         self.model = None
         self.cluster_labels = None
         self.cluster_info = {}
-        self.is_trained = False
-        
+        self._trained = False
+        # versión del archivo que tengo en memoria; el modelo se carga de forma diferida
+        self._artifact_version = None
+    
+    @property
+    def is_trained(self) -> bool:
+        """el modelo guardado lo tomo del registro compartido recién cuando hace falta"""
         self._load_model()
+        return self._trained
+    
+    @is_trained.setter
+    def is_trained(self, value: bool):
+        self._trained = value
     
     def _load_model(self):
-        """cargo modelo pre-entrenado"""
+        """tomo el modelo pre-entrenado del registro si existe o cambió en disco"""
+        artifact = MODEL_REGISTRY.get(self.model_path)
+        if artifact is None or artifact.version == self._artifact_version:
+            return
+        self._artifact_version = artifact.version
         try:
-            if self.model_path.exists():
-                saved_data = joblib.load(self.model_path)
-                self.model = saved_data['model']
-                self.cluster_labels = saved_data.get('labels')
-                self.cluster_info = saved_data.get('cluster_info', {})
-                self.is_trained = True
-                self.logger.info("modelo de clustering cargado")
+            saved_data = artifact.data
+            self.model = saved_data['model']
+            self.cluster_labels = saved_data.get('labels')
+            self.cluster_info = saved_data.get('cluster_info', {})
+            self._trained = True
+            self.logger.info("modelo de clustering cargado")
         except Exception as e:
             self.logger.warning(f"no se pudo cargar modelo: {e}")
     
@@ -127,6 +145,8 @@ class ClusterEngine:
     
     def _save_model(self):
         """guardo modelo"""
+        # si falla el dump, el modelo en memoria sigue siendo el vigente
+        self._artifact_version = MODEL_REGISTRY.version(self.model_path)
         try:
             save_data = {
                 'model': self.model,
@@ -134,6 +154,7 @@ class ClusterEngine:
                 'cluster_info': self.cluster_info
             }
             joblib.dump(save_data, self.model_path)
+            self._artifact_version = MODEL_REGISTRY.version(self.model_path)
             self.logger.info(f"modelo guardado en {self.model_path}")
         except Exception as e:
             self.logger.error(f"error guardando modelo: {e}")
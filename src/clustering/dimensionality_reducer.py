@@ -6,6 +6,11 @@ from pathlib import Path
 import umap
 from sklearn.decomposition import PCA
 
+try:
+    from storage.model_registry import MODEL_REGISTRY
+except ImportError:
+    from src.storage.model_registry import MODEL_REGISTRY
+
 class DimensionalityReducer:
     """Reductor de dimensionalidad para visualización"""
     
@@ -17,26 +22,41 @@ class DimensionalityReducer:
         self.umap_2d = None
         self.umap_3d = None
         self.pca = None
-        self.is_trained = False
-        
+        self._trained = False
+        # versión del archivo que tengo en memoria; el modelo se carga de forma diferida
+        self._artifact_version = None
+    
+    @property
+    def is_trained(self) -> bool:
+        """el reductor guardado lo tomo del registro compartido recién cuando hace falta"""
         self._load_model()
+        return self._trained
+    
+    @is_trained.setter
+    def is_trained(self, value: bool):
+        self._trained = value
     
     def _load_model(self):
-        """Cargar modelo pre-entrenado"""
+        """Tomar el reductor pre-entrenado del registro si existe o cambió en disco"""
+        artifact = MODEL_REGISTRY.get(self.model_path)
+        if artifact is None or artifact.version == self._artifact_version:
+            return
+        self._artifact_version = artifact.version
         try:
-            if self.model_path.exists():
-                saved_data = joblib.load(self.model_path)
-                self.umap_2d = saved_data.get('umap_2d')
-                self.umap_3d = saved_data.get('umap_3d')
-                self.pca = saved_data.get('pca')
-                self.is_trained = True
-                self.logger.info("Reductor dimensional cargado")
+            saved_data = artifact.data
+            self.umap_2d = saved_data.get('umap_2d')
+            self.umap_3d = saved_data.get('umap_3d')
+            self.pca = saved_data.get('pca')
+            self._trained = True
+            self.logger.info("Reductor dimensional cargado")
         except Exception as e:
             self.logger.warning(f"No se pudo cargar reductor: {e}")
     
     def fit_transform_2d(self, embeddings: np.ndarray) -> np.ndarray:
         """Reducir a 2D con UMAP"""
         self.logger.info(f"Reduciendo {embeddings.shape} a 2D con UMAP")
+        # traigo los otros reductores guardados para no pisarlos al guardar
+        self._load_model()
         
         self.umap_2d = umap.UMAP(
             n_components=2,
@@ -55,6 +75,8 @@ class DimensionalityReducer:
     def fit_transform_3d(self, embeddings: np.ndarray) -> np.ndarray:
         """Reducir a 3D con UMAP"""
         self.logger.info(f"Reduciendo {embeddings.shape} a 3D con UMAP")
+        # traigo los otros reductores guardados para no pisarlos al guardar
+        self._load_model()
         
         self.umap_3d = umap.UMAP(
             n_components=3,
@@ -83,6 +105,8 @@ class DimensionalityReducer:
     
     def _save_model(self):
         """Guardar modelos"""
+        # si falla el dump, el reductor en memoria sigue siendo el vigente
+        self._artifact_version = MODEL_REGISTRY.version(self.model_path)
         try:
             save_data = {
                 'umap_2d': self.umap_2d,
@@ -90,6 +114,7 @@ class DimensionalityReducer:
                 'pca': self.pca
             }
             joblib.dump(save_data, self.model_path)
+            self._artifact_version = MODEL_REGISTRY.version(self.model_path)
             self.logger.info("Reductor guardado")
         except Exception as e:
             self.logger.error(f"Error guardando reductor: {e}")
\ No newline at end of file
@@ -1,19 +1,25 @@
 import logging  
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional  
 from .modality_selector import ModalitySelector, ModalityType  
 from .coherence_validator import CoherenceValidator
 from src.filters.content_filter import ContentFilter  
+from src.monitoring.metrics import FILTER_BLOCKS
+from src.monitoring.tracing import tracer
 
 
 class CrossModalCoordinator:  
 
-    def __init__(self, rag_engine, image_generator):  
+    def __init__(self, rag_engine, image_generator, max_workers: int = 4):  
         self.rag_engine = rag_engine  
         self.image_generator = image_generator  
         self.coherence_validator = CoherenceValidator(min_coherence_score=0.6)  
         self.modality_selector = ModalitySelector()  
         self.logger = logging.getLogger(__name__)  
         self.content_filter = ContentFilter()
+        # hilos para correr la rama de texto y la de imagen en paralelo
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cross_modal")
 
     def _should_generate_image(self, question: str, answer: str) -> bool:  
         diagram_keywords = [  
@@ -27,10 +33,25 @@ class CrossModalCoordinator:
         return any(keyword in question_lower or keyword in answer_lower  
                    for keyword in diagram_keywords)  
 
-    def process_cross_modal_query(self, question: str, top_k: int = 3) -> Dict:  
+    def process_cross_modal_query(self, question: str, top_k: int = 3) -> Dict:
+        # cada paso queda como span hijo; el trace_id va en la respuesta
+        with tracer.start_span("cross_modal_query", {"question_length": len(question), "top_k": top_k}) as span:
+            result = self._process_cross_modal_query(question, top_k)
+            span.set_attributes({
+                "modality": result.get('modality'),
+                "image_generated": result.get('image_generated', False),
+                "filter_blocked": result.get('filter_blocked', False)
+            })
+        result['trace_id'] = span.trace_id
+        return result
+
+    def _process_cross_modal_query(self, question: str, top_k: int) -> Dict:
         try:  
-            filter_result = self.content_filter.validate_prompt(question)  
+            with tracer.start_span("content_filter") as span:
+                filter_result = self.content_filter.validate_prompt(question)
+                span.set_attribute("allowed", filter_result.allowed)
             if not filter_result.allowed:  
+                FILTER_BLOCKS.inc(component="cross_modal")
                 self.logger.warning(f"Query bloqueada: {filter_result.reason}")  
                 return {  
                     'text_answer': "no puedo procesar esta solicitud debido a contenido inapropiado",  
@@ -44,27 +65,43 @@ class CrossModalCoordinator:
               
             clean_question = self.content_filter.sanitize_prompt(question)  
               
-            chat_result = self.rag_engine.generate_answer(clean_question, top_k)  
-              
-            modality = self.modality_selector.select_modality(  
-                question, 
-                chat_result.get('sources', [])  
-            )  
+            # la modalidad se decide solo con la pregunta, así las ramas de
+            # texto e imagen no dependen entre sí
+            with tracer.start_span("modality_selection") as span:
+                modality = self.modality_selector.select_modality(question)
+                span.set_attribute("modality", modality.value)
               
             if modality == ModalityType.TEXT_AND_IMAGE:  
-                image_result = self.image_generator.generate_with_quality_check(clean_question)  
+                # lanzo la imagen en otro hilo mientras genero la respuesta de texto
+                image_future = self.executor.submit(
+                    contextvars.copy_context().run, self._generate_image, clean_question
+                )
+                answered = False
+                try:
+                    chat_result = self._generate_answer(clean_question, top_k)
+                    answered = True
+                finally:
+                    if not answered:
+                        # si falla el texto no dejo la imagen (que se cobra) corriendo suelta
+                        self._abandon_image(image_future)
+                image_result = image_future.result()
                   
                 coherence_validation = None  
                 coherence_passed = False  
                   
                 if image_result.get('success'):  
-                    coherence_validation = self.coherence_validator.validate_cross_modal_coherence(  
-                        question=question, 
-                        text_answer=chat_result['answer'],  
-                        image_prompt=image_result.get('prompt', ''),  
-                        image_concept=clean_question 
-                    )  
-                    coherence_passed = coherence_validation['passed']  
+                    with tracer.start_span("coherence_validation") as span:
+                        coherence_validation = self.coherence_validator.validate_cross_modal_coherence(
+                            question=question,
+                            text_answer=chat_result['answer'],
+                            image_prompt=image_result.get('prompt', ''),
+                            image_concept=clean_question
+                        )
+                        coherence_passed = coherence_validation['passed']
+                        span.set_attributes({
+                            "passed": coherence_passed,
+                            "global_score": coherence_validation.get('global_score', 0.0)
+                        })
                   
                 return {  
                     'text_answer': chat_result['answer'],  
@@ -78,7 +115,7 @@ class CrossModalCoordinator:
                 }  
               
             elif modality == ModalityType.IMAGE_ONLY:  
-                image_result = self.image_generator.generate_with_quality_check(clean_question)  
+                image_result = self._generate_image(clean_question)
                 return {  
                     'text_answer': None,  
                     'sources': [],  
@@ -89,6 +126,7 @@ class CrossModalCoordinator:
                 }  
               
             else:  # TEXT_ONLY  
+                chat_result = self._generate_answer(clean_question, top_k)
                 return {  
                     'text_answer': chat_result['answer'],  
                     'sources': chat_result['sources'],  
@@ -106,3 +144,31 @@ class CrossModalCoordinator:
                 'modality': 'text_only',  
                 'confidence': 0.0  
             }
+
+    def _generate_answer(self, question: str, top_k: int) -> Dict:
+        with tracer.start_span("rag_answer", {"top_k": top_k}) as span:
+            chat_result = self.rag_engine.generate_answer(question, top_k)
+            span.set_attribute("sources", len(chat_result.get('sources', [])))
+            return chat_result
+
+    def _abandon_image(self, image_future):
+        """cancelo la imagen si todavía no arrancó; si ya está en curso espero y registro su resultado"""
+        if image_future.cancel():
+            self.logger.info("generación de imagen cancelada: falló la respuesta de texto")
+            return
+        try:
+            image_result = image_future.result()
+            self.logger.warning(
+                f"falló la respuesta de texto; la imagen ya generada queda en {image_result.get('path')}"
+            )
+        except Exception as e:
+            self.logger.error(f"falló la respuesta de texto y también la imagen: {e}")
+
+    def _generate_image(self, concept: str) -> Dict:
+        with tracer.start_span("image_generation") as span:
+            image_result = self.image_generator.generate_with_quality_check(concept)
+            span.set_attributes({
+                "success": bool(image_result.get('success')),
+                "attempts": image_result.get('attempt', 0)
+            })
+            return image_result
@@ -7,6 +7,7 @@ from tqdm import tqdm
 import torch
 
 from ingestion.document_loader import Document
+from monitoring.metrics import STAGE_LATENCY
 
 class EmbeddingEngine:
     """motor de embeddings usando sentence-transformers"""
@@ -96,7 +97,8 @@ class EmbeddingEngine:
     
     def encode_query(self, query: str) -> np.ndarray:
         """acá genero embedding para una consulta"""
-        return self.encode_text(query)
+        with STAGE_LATENCY.time(stage="encode_query"):
+            return self.encode_text(query)
 
 # acá hago un test básico
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ import re
 from typing import Dict, List, Set
 from dataclasses import dataclass
 
+from .keyword_matcher import KeywordMatcher
+
 @dataclass
 
 class FilterResult:
@@ -30,6 +32,10 @@ class ContentFilter:
             r'\b(porn|nude|sexual)\b',  
         ]
 
+        # todas las categorías en un matcher y los patrones compilados una vez
+        self.keyword_matcher = KeywordMatcher(self.blocked_terms)
+        self.compiled_patterns = [(pattern, re.compile(pattern)) for pattern in self.patterns]
+
         self.logger.info("ContentFilter inicializado")
 
     def validate_prompt(self, prompt: str) -> FilterResult:  
@@ -37,13 +43,12 @@ class ContentFilter:
         prompt_lower = prompt.lower()  
         blocked_found = []  
           
-        for category, terms in self.blocked_terms.items():  
+        for category, terms in self.keyword_matcher.find(prompt_lower).items():  
             for term in terms:  
-                if term in prompt_lower:  
-                    blocked_found.append(f"{category}:{term}")  
+                blocked_found.append(f"{category}:{term}")  
           
-        for pattern in self.patterns:  
-            if re.search(pattern, prompt_lower):  
+        for pattern, compiled in self.compiled_patterns:  
+            if compiled.search(prompt_lower):  
                 blocked_found.append(f"pattern:{pattern}")  
           
         if blocked_found:  
@@ -0,0 +1,45 @@
+"""
+buscador de palabras clave por familias, compartido por el filtro de contenido
+y las métricas de calidad
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class KeywordMatcher:
+    """
+    agrupo varias familias de keywords (semántica de substring, igual que `kw in text`)
+    cada keyword se busca una sola vez por texto aunque pertenezca a varias familias
+    nota: un regex combinado (incluso en forma de trie) resultó 2-7x más lento que `in` en cpython
+    """
+
+    def __init__(self, families: Dict[str, Iterable[str]]):
+        # quito duplicados conservando el orden de definición
+        self.families: Dict[str, Tuple[str, ...]] = {
+            name: tuple(dict.fromkeys(word.lower() for word in words))
+            for name, words in families.items()
+        }
+        self._keywords_by_selection: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def _keywords_for(self, names: Tuple[str, ...]) -> Tuple[str, ...]:
+        keywords = self._keywords_by_selection.get(names)
+        if keywords is None:
+            keywords = tuple(dict.fromkeys(word for name in names for word in self.families[name]))
+            self._keywords_by_selection[names] = keywords
+        return keywords
+
+    def find(self, text: str, families: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """
+        retorno las keywords presentes en text agrupadas por familia
+        text tiene que venir en minúsculas
+        """
+        names = tuple(families) if families is not None else tuple(self.families)
+        present = {word for word in self._keywords_for(names) if word in text}
+        return {
+            name: [word for word in self.families[name] if word in present]
+            for name in names
+        }
+
+    def count(self, text: str, families: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """cantidad de keywords distintas presentes por familia"""
+        return {name: len(words) for name, words in self.find(text, families).items()}
@@ -10,6 +10,11 @@ sys.path.append(str(Path(__file__).parent))
 from image_generator import ImageGenerator
 from image_quality_validator import ImageQualityValidator
 from style_controller import StyleController, StyleConfig, DiagramType, ColorScheme
+from rate_limiter import run_batch, DEFAULT_MAX_WORKERS
+from image_cache import ImageCache, DEFAULT_MAX_BYTES
+from retry_policy import AdaptiveRetryPolicy, AttemptRecord, DEFAULT_TIME_BUDGET_S
+from src.monitoring.tracing import tracer
+from src.monitoring.metrics import record_cache, IMAGE_ATTEMPTS
 
 class AdvancedImageGenerator:
     """
@@ -20,7 +25,11 @@ class AdvancedImageGenerator:
                  api_key: str,
                  min_quality_score: float = 0.6,
                  max_retries: int = 3,
-                 output_dir: str = "data/generated_images"):
+                 output_dir: str = "data/generated_images",
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 cache_dir: Optional[str] = "data/image_cache",
+                 cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                 time_budget_s: Optional[float] = DEFAULT_TIME_BUDGET_S):
         
         self.logger = logging.getLogger(__name__)
         
@@ -30,17 +39,33 @@ class AdvancedImageGenerator:
         self.style_controller = StyleController()
         
         self.max_retries = max_retries
+        # decide ajustes entre intentos y cuándo dejar de pagar generaciones
+        self.retry_policy = AdaptiveRetryPolicy(
+            min_quality_score=min_quality_score,
+            max_attempts=max_retries,
+            time_budget_s=time_budget_s
+        )
+        self.max_workers = max_workers
         self.output_dir = Path(output_dir)
         
+        # cache de imágenes aprobadas; cache_dir=None lo desactiva
+        self.cache = ImageCache(cache_dir, cache_max_bytes) if cache_dir else None
+        
+        # parámetros de generación que entran en la clave del cache
+        self.generation_params = {'cfg_scale': 7, 'steps': 30, 'width': 1024, 'height': 1024}
+        
         self.logger.info("advancedimagegenerator inicializado")
     
     def generate_with_quality_check(self,
                                    technical_concept: str,
                                    style_config: Optional[StyleConfig] = None,
-                                   auto_retry: bool = True) -> Dict:
+                                   auto_retry: bool = True,
+                                   seed: Optional[int] = None,
+                                   use_cache: bool = True) -> Dict:
         """
         genero una imagen con validacion automatica de calidad
         si la calidad no alcanza el minimo, reintento
+        si ya genere la misma combinacion de prompt y parametros, la saco del cache
         """
         # si no hay config, sugiero una
         if style_config is None:
@@ -51,68 +76,133 @@ class AdvancedImageGenerator:
         prompt = self.style_controller.build_prompt(technical_concept, style_config)
         negative_prompt = self.style_controller.build_negative_prompt(style_config)
         
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = ImageCache.make_key(
+                prompt=prompt,
+                negative_prompt=negative_prompt,
+                seed=seed,
+                style=style_config,
+                **self.generation_params
+            )
+            cached = self._get_cached_result(cache_key, style_config)
+            record_cache("image", cached is not None)
+            if cached is not None:
+                self.logger.info("imagen servida desde cache")
+                return cached
+        
         attempts = 0
         best_result = None
         best_score = 0
+        history = []
+        stop_reason = None
+        params = {**self.generation_params, 'seed': seed}
+        started_at = time.monotonic()
         
-        while attempts < self.max_retries:
+        while True:
             attempts += 1
             self.logger.info(f"intento {attempts}/{self.max_retries}")
+            attempt_start = time.monotonic()
             
             # genero imagen
-            # Genero imagen (sin parámetros no soportados)
-            gen_result = self.generator.generate_image(
-                prompt=prompt,
-                negative_prompt=negative_prompt
-            )
+            with tracer.start_span("generate_image", {"attempt": attempts}) as span:
+                gen_result = self.generator.generate_image(
+                    prompt=prompt,
+                    negative_prompt=negative_prompt,
+                    return_image=True,
+                    **params
+                )
+                span.set_attribute("success", bool(gen_result['success']))
             
             if not gen_result['success']:
                 self.logger.error(f"error generando: {gen_result.get('error')}")
-                continue
-            
-            # valido calidad
-            validation = self.validator.validate_image(gen_result['path'])
-            
-            self.logger.info(
-                f"calidad: {validation['global_score']:.2%} "
-                f"({'aprobada' if validation['passed'] else 'rechazada'})"
-            )
-            
-            # guardo mejor resultado
-            if validation['global_score'] > best_score:
-                best_score = validation['global_score']
-                best_result = {
-                    'generation': gen_result,
-                    'validation': validation,
-                    'attempt': attempts,
-                    'style_config': style_config,
-                    'path': str(Path(gen_result['path']).resolve()),
-                    'prompt': prompt
-                }
-            
-            # si paso validacion, termino
-            if validation['passed']:
-                best_result['success'] = True
-                break
+                IMAGE_ATTEMPTS.inc(result="error")
+                history.append(AttemptRecord(
+                    attempt=attempts,
+                    duration_s=time.monotonic() - attempt_start,
+                    params=params,
+                    error=str(gen_result.get('error', ''))
+                ))
+            else:
+                # valido calidad
+                with tracer.start_span("validate_image", {"attempt": attempts}) as span:
+                    # valido sobre el buffer en memoria, sin releer el png del disco
+                    validation = self.validator.validate_image(
+                        gen_result['path'], image=gen_result.pop('image', None)
+                    )
+                    span.set_attributes({
+                        "global_score": validation.get('global_score', 0.0),
+                        "passed": bool(validation.get('passed'))
+                    })
+                
+                global_score = validation.get('global_score', 0.0)
+                self.logger.info(
+                    f"calidad: {global_score:.2%} "
+                    f"({'aprobada' if validation['passed'] else 'rechazada'})"
+                )
+                IMAGE_ATTEMPTS.inc(result="passed" if validation['passed'] else "rejected")
+                history.append(AttemptRecord(
+                    attempt=attempts,
+                    duration_s=time.monotonic() - attempt_start,
+                    params=params,
+                    global_score=global_score,
+                    scores=validation.get('scores', {})
+                ))
+                
+                # guardo mejor resultado
+                if global_score > best_score or best_result is None:
+                    best_score = global_score
+                    best_result = {
+                        'generation': gen_result,
+                        'validation': validation,
+                        'attempt': attempts,
+                        'style_config': style_config,
+                        'path': str(Path(gen_result['path']).resolve()),
+                        'prompt': prompt
+                    }
+                
+                # si paso validacion, termino
+                if validation['passed']:
+                    best_result['success'] = True
+                    stop_reason = "passed"
+                    break
             
             # si no puedo reintentar, paro
             if not auto_retry:
+                stop_reason = "auto_retry_disabled"
                 break
             
-            # espero antes de reintentar
-            if attempts < self.max_retries:
-                self.logger.info("reintentando con parametros mejorados...")
-                time.sleep(2)
+            retry, stop_reason = self.retry_policy.should_retry(history, started_at)
+            if not retry:
+                self.logger.info(f"dejo de reintentar: {stop_reason}")
+                break
+            
+            # ajusto prompt y parametros segun las metricas debiles del ultimo intento
+            if history[-1].scores:
+                prompt, negative_prompt, params, changes = self.retry_policy.adjust(
+                    prompt, negative_prompt, params, history[-1].scores
+                )
+                self.logger.info(f"reintentando con ajustes: {', '.join(changes) or 'ninguno'}")
         
         # si no hubo exito pero tengo resultado
         if best_result and 'success' not in best_result:
             best_result['success'] = False
             best_result['reason'] = 'no alcanzo la calidad minima despues de reintentos'
         
+        if best_result:
+            best_result['paid_generations'] = attempts
+            best_result['stop_reason'] = stop_reason
+        
+        # solo cacheo imagenes aprobadas, asi un mal resultado no queda fijo
+        if cache_key and best_result and best_result.get('success'):
+            self._store_cached_result(cache_key, best_result)
+        
         return best_result or {
             'success': False,
             'error': 'no se pudo generar ninguna imagen',
-            'path': None
+            'path': None,
+            'paid_generations': attempts,
+            'stop_reason': stop_reason
         }
     
     def generate_variations(self,
@@ -128,24 +218,17 @@ class AdvancedImageGenerator:
         style_variations = self.style_controller.get_style_variations(base_style)
         styles_to_try = [base_style] + style_variations[:num_variations-1]
         
-        results = []
-        
-        for i, style in enumerate(styles_to_try[:num_variations]):
-            self.logger.info(f"\ngenerando variacion {i+1}/{num_variations}")
+        def generate(style):
             self.logger.info(f"estilo: {style.diagram_type.value}, {style.color_scheme.value}")
-            
-            result = self.generate_with_quality_check(
+            return self.generate_with_quality_check(
                 technical_concept,
                 style_config=style,
                 auto_retry=False
             )
-            
-            results.append(result)
-            
-            if i < len(styles_to_try) - 1:
-                time.sleep(3)
         
-        return results
+        # en paralelo; la cuota la controla el token bucket del generador
+        return run_batch(generate, styles_to_try[:num_variations],
+                         max_workers=self.max_workers, description="variacion")
     
     def generate_with_preset(self,
                            technical_concept: str,
@@ -172,32 +255,21 @@ class AdvancedImageGenerator:
         """
         genero multiples conceptos con validacion agregada
         """
-        results = []
-        successful = 0
-        failed = 0
-        
-        for i, concept in enumerate(concepts):
-            self.logger.info(f"\n{'='*60}")
-            self.logger.info(f"concepto {i+1}/{len(concepts)}: {concept}")
-            self.logger.info('='*60)
-            
+        def generate(concept):
+            self.logger.info(f"concepto: {concept}")
             if style == 'auto':
-                result = self.generate_with_quality_check(concept)
-            else:
-                result = self.generate_with_preset(concept, style)
-            
-            results.append({
-                'concept': concept,
-                'result': result
-            })
-            
-            if result.get('success'):
-                successful += 1
-            else:
-                failed += 1
-            
-            if i < len(concepts) - 1:
-                time.sleep(3)
+                return self.generate_with_quality_check(concept)
+            return self.generate_with_preset(concept, style)
+        
+        # un concepto que falla no aborta el lote, queda con su error
+        batch_results = run_batch(generate, concepts,
+                                  max_workers=self.max_workers, description="concepto")
+        results = [
+            {'concept': concept, 'result': result}
+            for concept, result in zip(concepts, batch_results)
+        ]
+        successful = sum(1 for r in batch_results if r.get('success'))
+        failed = len(batch_results) - successful
         
         return {
             'total': len(concepts),
@@ -207,6 +279,40 @@ class AdvancedImageGenerator:
             'results': results
         }
     
+    def _get_cached_result(self, cache_key: str, style_config: StyleConfig) -> Optional[Dict]:
+        """
+        armo el resultado desde el cache con la misma forma que una generacion nueva
+        """
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        path = entry['path']
+        return {
+            'success': True,
+            'cached': True,
+            'generation': {**entry.get('generation', {}), 'path': path},
+            'validation': {**entry.get('validation', {}), 'image_path': path},
+            'attempt': entry.get('attempt', 1),
+            'style_config': style_config,
+            'path': path,
+            'prompt': entry.get('prompt')
+        }
+    
+    def _store_cached_result(self, cache_key: str, result: Dict):
+        """
+        guardo la imagen aprobada y su validacion en el cache
+        """
+        generation = {k: v for k, v in result['generation'].items() if k != 'path'}
+        self.cache.put(cache_key, result['path'], {
+            'generation': generation,
+            'validation': result['validation'],
+            'attempt': result['attempt'],
+            'prompt': result['prompt'],
+            'style_config': result['style_config'],
+            'created_at': time.time()
+        })
+    
     def get_generation_report(self, result: Dict) -> str:
         """
         genero un reporte en formato legible
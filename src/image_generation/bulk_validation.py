@@ -0,0 +1,227 @@
+"""
+validación masiva de imágenes generadas
+recorro un directorio o glob sin cargar la lista completa, valido en un pool de procesos
+y voy escribiendo cada resultado a un reporte jsonl (o parquet si está pyarrow)
+"""
+
+import os
+import sys
+import json
+import glob
+import logging
+import multiprocessing
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+SCORE_NAMES = ('sharpness', 'brightness', 'contrast', 'noise',
+               'composition', 'color_balance', 'technical_clarity')
+
+# validador por proceso, lo crea _init_worker
+_worker_validator = None
+
+
+def iter_image_paths(source: Union[str, Path], recursive: bool = True) -> Iterator[str]:
+    """
+    genero rutas de imágenes de un directorio (recursivo) o de un patrón glob
+    uso os.scandir/iglob para no armar la lista completa en memoria
+    """
+    source = str(source)
+    if os.path.isdir(source):
+        stack = [source]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                        elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                            yield entry.path
+            except OSError as e:
+                logger.warning(f"no se pudo leer {current}: {e}")
+    elif os.path.isfile(source):
+        yield source
+    else:
+        for path in glob.iglob(source, recursive=recursive):
+            if path.lower().endswith(IMAGE_EXTENSIONS):
+                yield path
+
+
+def _to_builtin(value: Any) -> Any:
+    """paso tipos numpy a tipos python para serializar"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    return value
+
+
+def _init_worker(min_quality_score: float, analysis_max_side: Optional[int]):
+    global _worker_validator
+    from image_quality_validator import ImageQualityValidator
+    # cv2 ya paraleliza por dentro; con un proceso por núcleo conviene un hilo por proceso
+    import cv2
+    cv2.setNumThreads(1)
+    _worker_validator = ImageQualityValidator(min_quality_score, analysis_max_side=analysis_max_side)
+
+
+def _validate_path(path: str) -> Dict[str, Any]:
+    return _to_builtin(_worker_validator.validate_image(path))
+
+
+class ReportWriter:
+    """
+    escribo resultados a medida que llegan
+    .jsonl -> una línea por imagen; .parquet -> filas planas en lotes (requiere pyarrow)
+    """
+
+    def __init__(self, path: Union[str, Path], batch_size: int = 1000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.parquet = self.path.suffix.lower() == '.parquet'
+        self._rows: List[Dict[str, Any]] = []
+        self._writer = None
+
+        if self.parquet:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError("para reportes .parquet instala pyarrow (o usa .jsonl)")
+            self._file = None
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+
+    @staticmethod
+    def flatten(result: Dict[str, Any]) -> Dict[str, Any]:
+        """fila plana con columnas fijas, así el esquema no cambia entre lotes"""
+        scores = result.get('scores') or {}
+        size = result.get('size') or (None, None)
+        row = {
+            'image_path': result.get('image_path'),
+            'passed': bool(result.get('passed', False)),
+            'global_score': result.get('global_score'),
+        }
+        for name in SCORE_NAMES:
+            row[f'score_{name}'] = scores.get(name)
+        row.update({
+            'width': size[0],
+            'height': size[1],
+            'format': result.get('format'),
+            'mode': result.get('mode'),
+            'recommendations': ' | '.join(result.get('recommendations') or []) or None,
+            'error': result.get('error'),
+        })
+        return row
+
+    def write(self, result: Dict[str, Any]):
+        if not self.parquet:
+            self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+            return
+        self._rows.append(self.flatten(result))
+        if len(self._rows) >= self.batch_size:
+            self._flush_parquet()
+
+    def _flush_parquet(self):
+        if not self._rows:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist(self._rows, schema=self._schema(pa))
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(str(self.path), table.schema)
+        self._writer.write_table(table)
+        self._rows = []
+
+    @staticmethod
+    def _schema(pa):
+        fields = [('image_path', pa.string()), ('passed', pa.bool_()), ('global_score', pa.float64())]
+        fields += [(f'score_{name}', pa.float64()) for name in SCORE_NAMES]
+        fields += [('width', pa.int64()), ('height', pa.int64()), ('format', pa.string()),
+                   ('mode', pa.string()), ('recommendations', pa.string()), ('error', pa.string())]
+        return pa.schema(fields)
+
+    def close(self):
+        if self.parquet:
+            self._flush_parquet()
+            if self._writer is not None:
+                self._writer.close()
+        elif self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def validate_bulk(paths: Iterable[str],
+                  report_path: Optional[Union[str, Path]] = None,
+                  workers: Optional[int] = None,
+                  min_quality_score: float = 0.6,
+                  analysis_max_side: Optional[int] = None,
+                  chunksize: int = 8) -> Iterator[Dict[str, Any]]:
+    """
+    valido las imágenes en un pool de procesos y voy retornando cada resultado
+    el orden es el de finalización, no el de entrada; cada resultado trae su image_path
+    si hay report_path escribo cada resultado apenas llega
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = ReportWriter(report_path) if report_path else None
+
+    # los hijos tienen que poder importar image_quality_validator y src.monitoring
+    module_dir = str(Path(__file__).parent)
+    root_dir = str(Path(__file__).parent.parent.parent)
+    for path in (module_dir, root_dir):
+        if path not in sys.path:
+            sys.path.append(path)
+
+    pool = multiprocessing.Pool(
+        processes=workers,
+        initializer=_init_worker,
+        initargs=(min_quality_score, analysis_max_side)
+    )
+    try:
+        for result in pool.imap_unordered(_validate_path, paths, chunksize=chunksize):
+            if writer is not None:
+                writer.write(result)
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+        if writer is not None:
+            writer.close()
+
+
+def summarize(results: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """agrego resultados sin guardarlos (conteos y promedio incremental)"""
+    total = passed = errors = 0
+    score_sum = 0.0
+    for result in results:
+        total += 1
+        if 'error' in result:
+            errors += 1
+            continue
+        passed += bool(result.get('passed'))
+        score_sum += result.get('global_score', 0.0)
+
+    scored = total - errors
+    return {
+        'total_images': total,
+        'passed': passed,
+        'failed': total - passed,
+        'errors': errors,
+        'pass_rate': passed / total if total else 0,
+        'average_score': round(score_sum / scored, 3) if scored else 0.0,
+    }
@@ -0,0 +1,143 @@
+"""
+cliente http compartido para las apis de imágenes
+reutilizo conexiones (keep-alive) y reintento con backoff exponencial y jitter solo lo que el
+servidor no llegó a procesar (errores de conexión, 429 y 503): la generación se cobra por POST
+"""
+
+import logging
+import threading
+from typing import Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.image_generation.retry_policy import DEFAULT_TIME_BUDGET_S
+from src.image_generation.rate_limiter import TokenBucket, get_shared_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# rechazos antes de procesar el pedido; un 500/502/504 o un timeout de lectura pueden
+# llegar con la imagen ya generada (y cobrada), esos no se reenvían
+RETRY_STATUSES = (429, 503)
+
+# (connect, read) por intento; cada reintento vuelve a tener el timeout completo
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 90.0)
+
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_MAX = 10.0
+
+_shared_session: Optional[requests.Session] = None
+_shared_lock = threading.Lock()
+
+
+class ApiRetry(Retry):
+    """
+    igual que Retry pero acoto el Retry-After del servidor a retry_after_cap,
+    así un 429 con una espera enorme no se pasa del presupuesto de la imagen
+    con rate_limiter cada reintento toma un token después de la espera: los reintentos
+    de la sesión también cuentan para la cuota de la api key
+    """
+
+    def __init__(self, *args, retry_after_cap: float = DEFAULT_BACKOFF_MAX,
+                 rate_limiter: Optional[TokenBucket] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after_cap = retry_after_cap
+        self.rate_limiter = rate_limiter
+
+    def new(self, **kw):
+        # urllib3 crea un Retry nuevo por intento con los parámetros conocidos
+        kw.setdefault('retry_after_cap', self.retry_after_cap)
+        kw.setdefault('rate_limiter', self.rate_limiter)
+        return super().new(**kw)
+
+    def sleep(self, response=None):
+        # urllib3 llama a sleep justo antes de reenviar, tanto por status como por error de conexión
+        super().sleep(response)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.retry_after_cap)
+
+
+def retries_within_budget(budget_s: float = DEFAULT_TIME_BUDGET_S,
+                          timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                          backoff_max: float = DEFAULT_BACKOFF_MAX) -> int:
+    """
+    cuántos reintentos entran en el presupuesto: un intento reintentable cuesta a lo sumo
+    el timeout de conexión (los 429/503 responden sin procesar) más la espera,
+    y el último intento puede durar connect + read
+    """
+    connect, read = timeout
+    spare = budget_s - (connect + read)
+    return max(0, int(spare // (connect + backoff_max)))
+
+
+def build_retry(total: Optional[int] = None,
+                backoff_factor: float = 1.0,
+                backoff_max: float = DEFAULT_BACKOFF_MAX,
+                backoff_jitter: float = 0.5,
+                status_forcelist: Iterable[int] = RETRY_STATUSES,
+                rate_limiter: Optional[TokenBucket] = None) -> Retry:
+    """
+    política de reintentos: espera backoff_factor * 2^(n-1) (+ jitter) hasta backoff_max
+    respeta Retry-After en los 429 (acotado a backoff_max)
+    sin total, reintento lo que entra en IMAGE_TIME_BUDGET_S con el timeout por defecto
+    con rate_limiter cada reintento consume un token del mismo bucket que la llamada original
+    """
+    if total is None:
+        total = min(DEFAULT_MAX_RETRIES, retries_within_budget(backoff_max=backoff_max))
+    kwargs = dict(
+        total=total,
+        connect=total,
+        # un timeout de lectura o una conexión cortada después de enviar no se reintentan:
+        # el POST pudo haberse procesado
+        read=0,
+        other=0,
+        status=total,
+        backoff_factor=backoff_factor,
+        status_forcelist=tuple(status_forcelist),
+        # por defecto urllib3 no reintenta POST; acá solo reintento lo que no llegó a procesarse
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        retry_after_cap=backoff_max,
+        rate_limiter=rate_limiter,
+    )
+    try:
+        return ApiRetry(backoff_max=backoff_max, backoff_jitter=backoff_jitter, **kwargs)
+    except TypeError:
+        # urllib3 < 2 no soporta jitter ni backoff_max configurable
+        logger.debug("urllib3 sin backoff_jitter, uso backoff exponencial sin jitter")
+        return ApiRetry(**kwargs)
+
+
+def create_session(pool_connections: int = 4,
+                   pool_maxsize: int = 8,
+                   retry: Optional[Retry] = None) -> requests.Session:
+    """creo una sesión con pool de conexiones acotado y reintentos"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=True,  # si el pool está lleno espero en vez de abrir conexiones extra
+        max_retries=retry or build_retry()
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_shared_session() -> requests.Session:
+    """
+    sesión única del proceso, así todos los generadores comparten el pool
+    sus reintentos toman tokens del bucket compartido, igual que las llamadas
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_lock:
+            if _shared_session is None:
+                _shared_session = create_session(retry=build_retry(rate_limiter=get_shared_rate_limiter()))
+    return _shared_session
@@ -0,0 +1,162 @@
+"""
+cache en disco de imágenes generadas, direccionado por contenido del request
+guardo el png y su validación; desalojo por tamaño total con política lru
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from enum import Enum
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 gb
+
+
+def _normalize(value: Any) -> Any:
+    """paso dataclasses y enums a tipos json estables"""
+    if is_dataclass(value):
+        value = asdict(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+class ImageCache:
+    """
+    cada entrada son dos archivos: {key}.png y {key}.json
+    el mtime del json marca el último acceso (lo toco en cada hit)
+    """
+
+    def __init__(self, cache_dir: str = "data/image_cache", max_bytes: int = DEFAULT_MAX_BYTES):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = self._scan_size()
+
+    @staticmethod
+    def make_key(**params) -> str:
+        """hash estable de los parámetros que determinan la imagen"""
+        canonical = json.dumps(_normalize(params), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        return self.cache_dir / f"{key}.png", self.cache_dir / f"{key}.json"
+
+    def _scan_size(self) -> int:
+        return sum(f.stat().st_size for f in self.cache_dir.iterdir() if f.is_file())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """retorno la entrada (con 'path' al png cacheado) o None"""
+        image_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not image_path.exists():
+            return None
+
+        # actualizo el acceso para la política lru
+        now = time.time()
+        try:
+            os.utime(meta_path, (now, now))
+        except OSError:
+            pass
+
+        entry['path'] = str(image_path.resolve())
+        return entry
+
+    def put(self, key: str, image_source, metadata: Dict[str, Any]) -> Optional[str]:
+        """
+        guardo la imagen (bytes o ruta a un png existente) y su metadata
+        retorno la ruta del png cacheado
+        """
+        image_path, meta_path = self._paths(key)
+        tmp_image = image_path.with_suffix('.png.tmp')
+        tmp_meta = meta_path.with_suffix('.json.tmp')
+
+        try:
+            if isinstance(image_source, (bytes, bytearray, memoryview)):
+                with open(tmp_image, 'wb') as f:
+                    f.write(image_source)
+            else:
+                shutil.copyfile(image_source, tmp_image)
+
+            with open(tmp_meta, 'w', encoding='utf-8') as f:
+                json.dump(_normalize(metadata), f, ensure_ascii=False, default=str)
+
+            with self._lock:
+                previous = sum(p.stat().st_size for p in (image_path, meta_path) if p.exists())
+                # escritura atómica: otro proceso nunca ve una entrada a medias
+                os.replace(tmp_image, image_path)
+                os.replace(tmp_meta, meta_path)
+                self._total_bytes += image_path.stat().st_size + meta_path.stat().st_size - previous
+
+            self._evict_if_needed(keep=key)
+            return str(image_path.resolve())
+
+        except OSError as e:
+            self.logger.warning(f"no se pudo guardar en cache: {e}")
+            for tmp in (tmp_image, tmp_meta):
+                tmp.unlink(missing_ok=True)
+            return None
+
+    def _evict_if_needed(self, keep: Optional[str] = None):
+        """borro las entradas menos usadas hasta quedar bajo max_bytes"""
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+
+            entries = []
+            for meta_path in self.cache_dir.glob('*.json'):
+                if meta_path.stem == keep:
+                    continue
+                try:
+                    entries.append((meta_path.stat().st_mtime, meta_path.stem))
+                except OSError:
+                    continue
+            entries.sort()
+
+            evicted = 0
+            for _, key in entries:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                for path in self._paths(key):
+                    try:
+                        size = path.stat().st_size
+                        path.unlink()
+                        self._total_bytes -= size
+                    except OSError:
+                        continue
+                evicted += 1
+
+            if evicted:
+                self.logger.info(f"cache de imágenes: desalojé {evicted} entradas")
+
+    def clear(self):
+        with self._lock:
+            for path in self.cache_dir.iterdir():
+                if path.is_file():
+                    path.unlink(missing_ok=True)
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(list(self.cache_dir.glob('*.json'))),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -1,8 +1,14 @@
+import os
 import logging
 import requests
 import base64
+import hashlib
 from src.filters.content_filter import ContentFilter  
-from typing import Dict, Optional, List
+from src.monitoring.metrics import STAGE_LATENCY, FILTER_BLOCKS
+from src.image_generation.http_client import get_shared_session, create_session, build_retry, DEFAULT_TIMEOUT
+from src.image_generation.rate_limiter import TokenBucket, get_shared_rate_limiter, run_batch, DEFAULT_MAX_WORKERS
+from src.image_generation.phash_index import PerceptualHashIndex, dhash
+from typing import Dict, Optional, List, Tuple
 from pathlib import Path
 import time
 from io import BytesIO
@@ -10,12 +16,31 @@ from PIL import Image
 
 class ImageGenerator:
 
-    def __init__(self, api_key: str, output_dir: str = "data/generated_images"):
+    DEFAULT_API_URL = "https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image"
+
+    def __init__(self, api_key: str, output_dir: str = "data/generated_images",
+                 api_url: Optional[str] = None,
+                 session: Optional[requests.Session] = None,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 dedupe: bool = True):
         self.logger = logging.getLogger(__name__)
         self.api_key = api_key
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.api_url = "https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image"
+        # STABILITY_API_URL permite apuntar a un servidor local (src/stubs)
+        self.api_url = api_url or os.getenv("STABILITY_API_URL", self.DEFAULT_API_URL)
+        # todas las llamadas a la api pasan por el mismo token bucket
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        # sesión con keep-alive y reintentos 429/503 compartida entre generadores;
+        # con un bucket propio armo una sesión cuyos reintentos tomen tokens de ese bucket
+        if session is None:
+            session = (get_shared_session() if rate_limiter is None
+                       else create_session(retry=build_retry(rate_limiter=self.rate_limiter)))
+        self.session = session
+        self.timeout = timeout
+        # índice de hashes perceptuales para no guardar casi-duplicados en output_dir
+        self.phash_index = PerceptualHashIndex(str(self.output_dir)) if dedupe else None
         self.style_templates = {
             "diagram": "technical diagram, clean lines, professional, white background, UML style",
             "architecture": "system architecture diagram, boxes and arrows, clean design, technical illustration",
@@ -64,10 +89,19 @@ class ImageGenerator:
     def generate_image(self, 
                       prompt: str, 
                       negative_prompt: Optional[str] = None,
-                      save_path: Optional[str] = None) -> Dict:
-        
+                      save_path: Optional[str] = None,
+                      cfg_scale: float = 7,
+                      steps: int = 30,
+                      width: int = 1024,
+                      height: int = 1024,
+                      seed: Optional[int] = None,
+                      return_image: bool = False,
+                      dedupe_scope: Optional[str] = None) -> Dict:
+        # return_image=True agrega en 'image' la imagen en memoria para validarla sin releer el archivo
+        # dedupe_scope limita la reutilización de casi-duplicados a ese grupo; sin él vale todo output_dir
         filter_result = self.content_filter.validate_prompt(prompt)
         if not filter_result.allowed:
+            FILTER_BLOCKS.inc(component="image_generator")
             self.logger.warning(f"Prompt bloqueado {filter_result.reason}")
             return {
                 "success": False,
@@ -92,24 +126,28 @@ class ImageGenerator:
                         "weight": -1
                     }
                 ],
-                "cfg_scale": 7,
-                "height": 1024,
-                "width": 1024,
+                "cfg_scale": cfg_scale,
+                "height": height,
+                "width": width,
                 "samples": 1,
-                "steps": 30
+                "steps": steps
             }
+            if seed is not None:
+                payload["seed"] = seed
             
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json",
                 "Accept": "application/json"
             }  
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=120
-            )    
+            self.rate_limiter.acquire()
+            with STAGE_LATENCY.time(stage="generate_image"):
+                response = self.session.post(
+                    self.api_url,
+                    headers=headers,
+                    json=payload,
+                    timeout=self.timeout
+                )    
             if response.status_code != 200:
                 error_msg = f"API error ({response.status_code}): {response.text}"
                 self.logger.error(error_msg)
@@ -139,26 +177,55 @@ class ImageGenerator:
                 }
             
             image_bytes = base64.b64decode(image_base64)
+            # Image.open solo lee la cabecera; los píxeles se decodifican si alguien los usa
             image = Image.open(BytesIO(image_bytes))
             
+            image_hash = dhash(image) if self.phash_index is not None else None
+            # no uso prompt ni parámetros como clave: los reintentos los cambian y el umbral
+            # de hamming es el que decide qué es duplicado
+
+            duplicate = None
             if save_path is None:
+                # el hash del contenido (y del scope) evita colisiones de nombre dentro del mismo segundo
                 timestamp = int(time.time())
-                filename = f"generated_{timestamp}.png"
-                save_path = self.output_dir / filename
+                digest = hashlib.sha256(image_bytes + (dedupe_scope or "").encode()).hexdigest()[:12]
+                save_path = self.output_dir / f"generated_{timestamp}_{digest}.png"
+                # la api ya entrega un png: escribo los bytes tal cual, sin re-encodear
+                with open(save_path, "wb") as f:
+                    f.write(image_bytes)
+
+                if image_hash is not None:
+                    # buscar y registrar es una sola operación: dos lotes no pueden agregar la misma imagen
+                    duplicate = self.phash_index.find_or_add(image_hash, str(save_path), dedupe_scope)
+                if duplicate:
+                    # ya tengo una imagen casi idéntica: reutilizo ese archivo
+                    if Path(duplicate[0]) != save_path:
+                        save_path.unlink(missing_ok=True)
+                    save_path = Path(duplicate[0])
+                    self.logger.info(f"imagen duplicada (distancia {duplicate[1]}) de: {save_path}")
+                else:
+                    self.logger.info(f"imagen guardada en: {save_path}")
             else:
+                # con una ruta explícita siempre escribo donde me piden
                 save_path = Path(save_path)
-            
-            image.save(save_path)
-            self.logger.info(f"imagen guardada en: {save_path}")
-            
-            return {
+                with open(save_path, "wb") as f:
+                    f.write(image_bytes)
+                self.logger.info(f"imagen guardada en: {save_path}")
+                if image_hash is not None and save_path.resolve().parent == self.output_dir.resolve():
+                    self.phash_index.add(image_hash, str(save_path), dedupe_scope)
+
+            result = {
                 "success": True,
                 "path": str(save_path),
                 "prompt": prompt,
                 "negative_prompt": negative_prompt,
                 "size": image.size,
-                "format": image.format
+                "format": image.format,
+                "duplicate": bool(duplicate)
             }
+            if return_image:
+                result["image"] = image
+            return result
             
         except requests.exceptions.RequestException as e:
             self.logger.error(f"error en request a API: {e}")
@@ -183,17 +250,17 @@ class ImageGenerator:
         result["original_query"] = technical_query
         result["style"] = style
         return result
-    def batch_generate(self, queries: List[str], style: str = "diagram") -> List[Dict]:
-        results = []
-        
-        for i, query in enumerate(queries):
-            self.logger.info(f"Generando imagen {i+1}/{len(queries)}")
-            result = self.generate_from_query(query, style)
-            results.append(result)
-            
-            if i < len(queries) - 1:
-                time.sleep(3)
-        
+    def batch_generate(self, queries: List[str], style: str = "diagram",
+                       max_workers: int = DEFAULT_MAX_WORKERS) -> List[Dict]:
+        # concurrente y limitado por el token bucket; resultados en orden de entrada
+        results = run_batch(
+            lambda query: self.generate_from_query(query, style),
+            queries,
+            max_workers=max_workers,
+            description="imagen"
+        )
+        for query, result in zip(queries, results):
+            result.setdefault("original_query", query)
         return results
     
     def list_available_styles(self) -> List[str]:
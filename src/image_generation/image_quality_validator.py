@@ -10,15 +10,48 @@ from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 import cv2
 
+from src.monitoring.metrics import timed
+
+
+class ImageAnalysis:
+    """
+    buffers compartidos por todas las métricas de una imagen
+    convierto a escala de grises y calculo las estadísticas una sola vez
+    si max_side está definido trabajo sobre una versión reducida (más rápida, scores aproximados)
+    """
+
+    def __init__(self, image: Image.Image, max_side: Optional[int] = None):
+        self.size = image.size
+        self.mode = image.mode
+        self.format = image.format
+
+        gray = np.asarray(image.convert('L'))
+        if max_side and max(gray.shape) > max_side:
+            scale = max_side / max(gray.shape)
+            new_size = (max(1, round(gray.shape[1] * scale)), max(1, round(gray.shape[0] * scale)))
+            gray = cv2.resize(gray, new_size, interpolation=cv2.INTER_AREA)
+        self.gray = np.ascontiguousarray(gray)
+
+        # estadísticas globales del gris (media y desviación poblacional, igual que ImageStat)
+        gray_f = self.gray.astype(np.float64)
+        self.mean = float(gray_f.mean())
+        self.stddev = float(gray_f.std())
+
+        # medias por canal solo hacen falta para el balance de color en rgb
+        self.channel_means = ImageStat.Stat(image).mean[:3] if image.mode == 'RGB' else None
+
+
 class ImageQualityValidator:
     """
     validador de calidad para imágenes técnicas generadas
     evalúo claridad, nitidez, composición y coherencia técnica
     """
     
-    def __init__(self, min_quality_score: float = 0.6):
+    def __init__(self, min_quality_score: float = 0.6, analysis_max_side: Optional[int] = None):
         self.logger = logging.getLogger(__name__)
         self.min_quality_score = min_quality_score
+        # None = resolución completa; p.ej. 512 acelera la validación a costa de scores aproximados
+        self.analysis_max_side = analysis_max_side
         
         # aquí defino los umbrales de calidad
         self.thresholds = {
@@ -32,23 +65,19 @@ class ImageQualityValidator:
         
         self.logger.info("imagequalityvalidator inicializado")
     
-    def validate_image(self, image_path: str) -> Dict:
+    @timed("validate_image")
+    def validate_image(self, image_path: str, image: Optional[Image.Image] = None) -> Dict:
         """
         valido una imagen y retorno un reporte completo de calidad
+        si recibo la imagen ya cargada en memoria no vuelvo a leerla de disco
         """
         try:
-            image = Image.open(image_path)
+            if image is None:
+                image = Image.open(image_path)
             
-            # ejecuto todas las validaciones
-            scores = {
-                'sharpness': self._check_sharpness(image),
-                'brightness': self._check_brightness(image),
-                'contrast': self._check_contrast(image),
-                'noise': self._check_noise(image),
-                'composition': self._check_composition(image),
-                'color_balance': self._check_color_balance(image),
-                'technical_clarity': self._check_technical_clarity(image)
-            }
+            # extraigo los buffers una vez y ejecuto todas las validaciones sobre ellos
+            analysis = ImageAnalysis(image, self.analysis_max_side)
+            scores = self.compute_scores(analysis)
             
             # calculo score global
             global_score = self._calculate_global_score(scores)
@@ -65,9 +94,9 @@ class ImageQualityValidator:
                 'scores': {k: round(v, 3) for k, v in scores.items()},
                 'recommendations': recommendations,
                 'image_path': image_path,
-                'size': image.size,
-                'format': image.format,
-                'mode': image.mode
+                'size': analysis.size,
+                'format': analysis.format,
+                'mode': analysis.mode
             }
             
         except Exception as e:
@@ -78,23 +107,33 @@ class ImageQualityValidator:
                 'image_path': image_path
             }
     
-    def _check_sharpness(self, image: Image.Image) -> float:
+    def compute_scores(self, analysis: ImageAnalysis) -> Dict[str, float]:
+        """
+        calculo todas las métricas a partir de un mismo análisis
+        """
+        return {
+            'sharpness': self._check_sharpness(analysis),
+            'brightness': self._check_brightness(analysis),
+            'contrast': self._check_contrast(analysis),
+            'noise': self._check_noise(analysis),
+            'composition': self._check_composition(analysis),
+            'color_balance': self._check_color_balance(analysis),
+            'technical_clarity': self._check_technical_clarity(analysis)
+        }
+    
+    def _check_sharpness(self, analysis: ImageAnalysis) -> float:
         """
         evalúo la nitidez usando laplacian, valores más altos indican mayor nitidez
         """
-        gray = image.convert('L')
-        img_array = np.array(gray)
-        laplacian_var = cv2.Laplacian(img_array, cv2.CV_64F).var()
+        laplacian_var = cv2.Laplacian(analysis.gray, cv2.CV_64F).var()
         score = min(laplacian_var / 500, 1.0)
         return score
     
-    def _check_brightness(self, image: Image.Image) -> float:
+    def _check_brightness(self, analysis: ImageAnalysis) -> float:
         """
         evalúo el brillo y busco un rango equilibrado
         """
-        gray = image.convert('L')
-        stat = ImageStat.Stat(gray)
-        brightness = stat.mean[0]
+        brightness = analysis.mean
         
         if 80 <= brightness <= 170:
             score = 1.0
@@ -105,36 +144,31 @@ class ImageQualityValidator:
         
         return max(0, score)
     
-    def _check_contrast(self, image: Image.Image) -> float:
+    def _check_contrast(self, analysis: ImageAnalysis) -> float:
         """
         evalúo el contraste mediante desviación estándar
         """
-        gray = image.convert('L')
-        stat = ImageStat.Stat(gray)
-        contrast = stat.stddev[0]
-        score = min(contrast / 60, 1.0)
+        score = min(analysis.stddev / 60, 1.0)
         return score
     
-    def _check_noise(self, image: Image.Image) -> float:
+    def _check_noise(self, analysis: ImageAnalysis) -> float:
         """
         detecto el ruido estimando la diferencia con un filtro mediano
         """
-        gray = image.convert('L')
-        img_array = np.array(gray)
-        
-        median_filtered = cv2.medianBlur(img_array, 5)
-        noise = np.abs(img_array.astype(float) - median_filtered.astype(float))
+        median_filtered = cv2.medianBlur(analysis.gray, 5)
+        # absdiff en uint8 da el mismo valor que restar en float, sin copias
+        noise = cv2.absdiff(analysis.gray, median_filtered)
         noise_level = noise.mean() / 255.0
         
         score = 1.0 - min(noise_level * 5, 1.0)
         return score
     
-    def _check_composition(self, image: Image.Image) -> float:
+    def _check_composition(self, analysis: ImageAnalysis) -> float:
         """
         evalúo composición básica dividiendo la imagen en cuadrantes
         """
-        width, height = image.size
-        img_array = np.array(image.convert('L'))
+        img_array = analysis.gray
+        height, width = img_array.shape
         
         h_mid, w_mid = height // 2, width // 2
         
@@ -151,29 +185,25 @@ class ImageQualityValidator:
         
         return min(max(balance, 0), 1.0)
     
-    def _check_color_balance(self, image: Image.Image) -> float:
+    def _check_color_balance(self, analysis: ImageAnalysis) -> float:
         """
         evalúo el balance de color para evitar sesgos excesivos
         """
-        if image.mode != 'RGB':
+        if analysis.channel_means is None:
             return 1.0
         
-        stat = ImageStat.Stat(image)
-        r_mean, g_mean, b_mean = stat.mean[:3]
+        r_mean, g_mean, b_mean = analysis.channel_means
         deviation = np.std([r_mean, g_mean, b_mean])
         
         score = 1.0 - min(deviation / 100, 1.0)
         return score
     
-    def _check_technical_clarity(self, image: Image.Image) -> float:
+    def _check_technical_clarity(self, analysis: ImageAnalysis) -> float:
         """
         evalúo claridad técnica mediante detección de bordes
         """
-        gray = image.convert('L')
-        img_array = np.array(gray)
-        
-        edges = cv2.Canny(img_array, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
+        edges = cv2.Canny(analysis.gray, 50, 150)
+        edge_density = np.count_nonzero(edges) / edges.size
         
         if 0.05 <= edge_density <= 0.20:
             score = 1.0
@@ -0,0 +1,212 @@
+"""
+índice de hashes perceptuales (dhash de 64 bits) de las imágenes generadas
+detecto casi-duplicados por distancia de hamming antes de guardar una imagen nueva
+"""
+
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+INDEX_FILENAME = ".phash_index.tsv"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+# con 64 bits, hasta 4 bits distintos es prácticamente la misma imagen
+DEFAULT_MAX_DISTANCE = 4
+
+
+def dhash(image: Image.Image) -> int:
+    """
+    difference hash: reduzco a 9x8 en gris y comparo cada píxel
+    con su vecino de la derecha (64 bits)
+    """
+    small = image.convert('L').resize((9, 8), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def hamming_distances(hashes: np.ndarray, value: int) -> np.ndarray:
+    """distancia de hamming de value contra todo el arreglo (uint64) en una pasada"""
+    xor = np.bitwise_xor(hashes, np.uint64(value))
+    # unpackbits funciona en cualquier versión de numpy (bitwise_count es de numpy 2)
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class PerceptualHashIndex:
+    """
+    guardo los hashes en un arreglo uint64 contiguo y los nombres de archivo en paralelo
+    persisto en un tsv de solo-append dentro del directorio de imágenes
+    cada entrada puede llevar un scope opcional que elige quien genera; sin scope decide
+    solo la distancia de hamming dentro del directorio
+    varios procesos (api, worker de la ui) comparten el tsv: lo releo cuando cambia en disco
+    """
+
+    def __init__(self, directory: str, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / INDEX_FILENAME
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._names: List[str] = []
+        self._scopes: List[str] = []
+        self._loaded_version = None
+
+        if self.index_path.exists():
+            self._load()
+        else:
+            self.rebuild()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _file_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.index_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        # se llama con el lock tomado; otro proceso pudo haber agregado imágenes
+        version = self._file_version()
+        if version is not None and version != self._loaded_version:
+            self._load()
+
+    def _load(self):
+        self._loaded_version = self._file_version()
+        hashes, names, scopes = [], [], []
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                # las líneas viejas no tienen scope (tercera columna)
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) < 2:
+                    continue
+                hashes.append(int(parts[0], 16))
+                names.append(parts[1])
+                scopes.append(parts[2] if len(parts) > 2 else "")
+        self._hashes = np.array(hashes, dtype=np.uint64)
+        self._names = names
+        self._scopes = scopes
+
+    def rebuild(self) -> int:
+        """indexo las imágenes que ya están en el directorio (primera vez o índice perdido)"""
+        hashes, names = [], []
+        for path in sorted(self.directory.iterdir()):
+            if not path.name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            try:
+                with Image.open(path) as image:
+                    hashes.append(dhash(image))
+                names.append(path.name)
+            except Exception as e:
+                self.logger.warning(f"no pude indexar {path.name}: {e}")
+
+        with self._lock:
+            self._hashes = np.array(hashes, dtype=np.uint64)
+            self._names = names
+            # lo reconstruido desde disco no sabe de qué pedido salió: queda sin scope
+            self._scopes = [""] * len(names)
+            with open(self.index_path, 'w', encoding='utf-8') as f:
+                for value, name in zip(hashes, names):
+                    f.write(f"{value:016x}\t{name}\n")
+            self._loaded_version = self._file_version()
+
+        if names:
+            self.logger.info(f"índice perceptual reconstruido con {len(names)} imágenes")
+        return len(names)
+
+    def _find(self, value: int, scope: Optional[str]) -> Optional[Tuple[str, int]]:
+        # se llama con el lock tomado
+        self._refresh()
+        if not self._names:
+            return None
+        distances = hamming_distances(self._hashes, value)
+        # recorro por distancia por si algún archivo ya no existe
+        for i in np.argsort(distances, kind='stable'):
+            distance = int(distances[i])
+            if distance > self.max_distance:
+                return None
+            if scope is not None and self._scopes[i] != scope:
+                continue
+            path = self.directory / self._names[i]
+            if path.exists():
+                return str(path), distance
+        return None
+
+    def _add(self, value: int, path: str, scope: Optional[str]):
+        # se llama con el lock tomado
+        self._refresh()
+        name = os.path.relpath(path, self.directory)
+        scope = scope or ""
+        self._hashes = np.append(self._hashes, np.uint64(value))
+        self._names.append(name)
+        self._scopes.append(scope)
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(f"{value:016x}\t{name}\t{scope}\n" if scope else f"{value:016x}\t{name}\n")
+        self._loaded_version = self._file_version()
+
+    def find(self, value: int, scope: Optional[str] = None) -> Optional[Tuple[str, int]]:
+        """
+        retorno (ruta, distancia) de la imagen existente más parecida dentro del umbral
+        con scope solo miro las entradas de ese scope
+        """
+        with self._lock:
+            return self._find(value, scope)
+
+    def add(self, value: int, path: str, scope: Optional[str] = None):
+        with self._lock:
+            self._add(value, path, scope)
+
+    def find_or_add(self, value: int, path: str, scope: Optional[str] = None) -> Optional[Tuple[str, int]]:
+        """
+        busco y agrego en una sola operación bajo el lock: si hay un casi-duplicado lo retorno
+        y no agrego nada; si no, registro path y retorno None
+        así dos lotes concurrentes no pueden fallar la búsqueda y agregar los dos
+        """
+        with self._lock:
+            duplicate = self._find(value, scope)
+            if duplicate is None:
+                self._add(value, path, scope)
+            return duplicate
+
+    def find_duplicate_groups(self) -> List[List[str]]:
+        """agrupo las imágenes del índice que son casi-duplicados entre sí"""
+        with self._lock:
+            self._refresh()
+            hashes = self._hashes.copy()
+            names = list(self._names)
+
+        seen = np.zeros(len(names), dtype=bool)
+        groups = []
+        for i in range(len(names)):
+            if seen[i]:
+                continue
+            members = np.flatnonzero((hamming_distances(hashes, int(hashes[i])) <= self.max_distance) & ~seen)
+            seen[members] = True
+            if len(members) > 1:
+                groups.append([names[j] for j in members])
+        return groups
+
+    def deduplicate(self, dry_run: bool = True) -> List[str]:
+        """
+        borro los casi-duplicados que ya están en disco, conservo el primero de cada grupo
+        con dry_run solo retorno lo que borraría
+        """
+        removed = []
+        for group in self.find_duplicate_groups():
+            for name in group[1:]:
+                removed.append(name)
+                if not dry_run:
+                    (self.directory / name).unlink(missing_ok=True)
+
+        if removed and not dry_run:
+            self.rebuild()
+            self.logger.info(f"eliminé {len(removed)} imágenes duplicadas")
+        return removed
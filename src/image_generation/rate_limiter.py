@@ -0,0 +1,111 @@
+"""
+limitador token bucket y ejecución concurrente de lotes
+lo uso para respetar la cuota del proveedor sin sleeps fijos entre imágenes
+"""
+
+import os
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# stability ai permite 150 requests cada 10 segundos
+DEFAULT_RATE_PER_SECOND = float(os.getenv("STABILITY_RATE_LIMIT", "15"))
+DEFAULT_BURST = int(os.getenv("STABILITY_RATE_BURST", "15"))
+DEFAULT_MAX_WORKERS = int(os.getenv("IMAGE_BATCH_WORKERS", "4"))
+
+
+class TokenBucket:
+    """
+    token bucket thread-safe: se recargan rate tokens por segundo hasta capacity
+    acquire bloquea hasta que haya tokens (o hasta timeout)
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE_PER_SECOND, capacity: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate debe ser mayor a cero")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(int(rate), 1)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """espero hasta tener tokens; retorno False si vence el timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+_shared_bucket: Optional[TokenBucket] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> TokenBucket:
+    """un solo bucket por proceso: la cuota es de la api key, no del generador"""
+    global _shared_bucket
+    if _shared_bucket is None:
+        with _shared_lock:
+            if _shared_bucket is None:
+                _shared_bucket = TokenBucket(DEFAULT_RATE_PER_SECOND, DEFAULT_BURST)
+    return _shared_bucket
+
+
+def run_batch(func: Callable[[Any], Dict],
+              items: Sequence[Any],
+              max_workers: int = DEFAULT_MAX_WORKERS,
+              description: str = "item") -> List[Dict]:
+    """
+    ejecuto func sobre cada item con max_workers hilos
+    los resultados salen en el orden de entrada; si un item falla
+    registro el error en su posición y el resto del lote sigue
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def safe_call(index_item):
+        index, item = index_item
+        logger.info(f"procesando {description} {index + 1}/{len(items)}")
+        try:
+            return func(item)
+        except Exception as e:
+            logger.error(f"error en {description} {index + 1}: {e}")
+            return {'success': False, 'error': str(e)}
+
+    workers = max(1, min(max_workers, len(items)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image_batch") as executor:
+        # copio el contexto por item para que las trazas queden bajo el span actual
+        futures = [
+            executor.submit(contextvars.copy_context().run, safe_call, (i, item))
+            for i, item in enumerate(items)
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,129 @@
+"""
+política adaptativa de reintentos para la generación con control de calidad
+uso los scores por métrica del validador para ajustar prompt y parámetros,
+corto temprano cuando otro intento difícilmente apruebe y respeto un presupuesto por request
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_TIME_BUDGET_S = float(os.getenv("IMAGE_TIME_BUDGET_S", "180"))
+
+
+@dataclass
+class AttemptRecord:
+    """lo que pasó en un intento"""
+    attempt: int
+    duration_s: float
+    params: Dict[str, Any]
+    global_score: Optional[float] = None
+    scores: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class AdaptiveRetryPolicy:
+    """
+    decide si vale la pena otro intento y con qué ajustes
+    cada regla ataca la métrica más débil, igual que las recomendaciones del validador
+    """
+
+    # métrica -> (umbral, texto para el prompt, texto para el negative prompt)
+    PROMPT_FIXES = {
+        'brightness': (0.5, "well-lit, clear", None),
+        'contrast': (0.5, "high contrast, clear lines", None),
+        'noise': (0.6, "clean, professional", "noisy, grainy"),
+        'technical_clarity': (0.5, "technical diagram, clear lines", "cluttered"),
+        'composition': (0.5, "centered, balanced layout", None),
+    }
+
+    def __init__(self,
+                 min_quality_score: float = 0.6,
+                 max_attempts: int = 3,
+                 time_budget_s: Optional[float] = DEFAULT_TIME_BUDGET_S,
+                 max_recoverable_gap: float = 0.25,
+                 min_improvement: float = 0.02,
+                 max_steps: int = 50,
+                 max_cfg_scale: float = 12.0):
+        self.min_quality_score = min_quality_score
+        self.max_attempts = max_attempts
+        self.time_budget_s = time_budget_s
+        # si el mejor score queda a más de esto del mínimo, ajustar el prompt no alcanza
+        self.max_recoverable_gap = max_recoverable_gap
+        self.min_improvement = min_improvement
+        self.max_steps = max_steps
+        self.max_cfg_scale = max_cfg_scale
+
+    def should_retry(self, history: List[AttemptRecord], started_at: float) -> Tuple[bool, str]:
+        """retorno (seguir, motivo)"""
+        if len(history) >= self.max_attempts:
+            return False, "max_attempts"
+
+        last = history[-1]
+        if last.error and self._is_permanent_error(last.error):
+            return False, "permanent_error"
+
+        # presupuesto de tiempo: no arranco un intento que no voy a poder terminar
+        if self.time_budget_s is not None:
+            elapsed = time.monotonic() - started_at
+            durations = [r.duration_s for r in history]
+            expected = sum(durations) / len(durations)
+            if elapsed + expected > self.time_budget_s:
+                return False, "time_budget"
+
+        scored = [r.global_score for r in history if r.global_score is not None]
+        if scored:
+            best = max(scored)
+            if self.min_quality_score - best > self.max_recoverable_gap:
+                return False, "unrecoverable_gap"
+
+            # el ajuste anterior no mejoró el score: otro intento no va a cambiar el resultado
+            if len(scored) >= 2 and scored[-1] < max(scored[:-1]) + self.min_improvement:
+                return False, "no_improvement"
+
+        return True, "retry"
+
+    @staticmethod
+    def _is_permanent_error(error: str) -> bool:
+        # el filtro de contenido y los 4xx (salvo 429, que ya reintenta la sesión) no se arreglan reintentando
+        if error.startswith("contenido no permitido"):
+            return True
+        return error.startswith("API error (4") and not error.startswith("API error (429")
+
+    def adjust(self,
+               prompt: str,
+               negative_prompt: str,
+               params: Dict[str, Any],
+               scores: Dict[str, float]) -> Tuple[str, str, Dict[str, Any], List[str]]:
+        """
+        ajusto prompt, negative prompt y parámetros según las métricas débiles
+        retorno también la lista de cambios para el log
+        """
+        params = dict(params)
+        changes = []
+
+        if scores.get('sharpness', 1.0) < 0.5 and params.get('steps', 30) < self.max_steps:
+            params['steps'] = min(params.get('steps', 30) + 10, self.max_steps)
+            changes.append(f"steps={params['steps']}")
+
+        if scores.get('technical_clarity', 1.0) < 0.5 and params.get('cfg_scale', 7) < self.max_cfg_scale:
+            params['cfg_scale'] = min(params.get('cfg_scale', 7) + 1.5, self.max_cfg_scale)
+            changes.append(f"cfg_scale={params['cfg_scale']}")
+
+        for metric, (threshold, positive, negative) in self.PROMPT_FIXES.items():
+            if scores.get(metric, 1.0) >= threshold:
+                continue
+            if positive and positive not in prompt:
+                prompt = f"{prompt}, {positive}"
+                changes.append(f"+'{positive}'")
+            if negative and negative not in negative_prompt:
+                negative_prompt = f"{negative_prompt}, {negative}"
+                changes.append(f"-'{negative}'")
+
+        # con seed fija repetir sería pagar por la misma imagen
+        if params.get('seed') is not None:
+            params['seed'] += 1
+            changes.append(f"seed={params['seed']}")
+
+        return prompt, negative_prompt, params, changes
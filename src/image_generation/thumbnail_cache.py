@@ -0,0 +1,82 @@
+"""
+miniaturas en disco para la galería
+las indexo por hash del contenido de la imagen, así un mismo png nunca se reduce dos veces
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+DEFAULT_THUMBNAIL_SIZE = 256
+
+
+class ThumbnailCache:
+    """
+    genero miniaturas webp (o jpeg si pil no trae webp) en cache_dir
+    el hash de cada imagen lo recuerdo por (ruta, mtime, tamaño) para no releer el archivo
+    """
+
+    def __init__(self,
+                 cache_dir: str = "data/thumbnails",
+                 size: int = DEFAULT_THUMBNAIL_SIZE,
+                 quality: int = 80):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.size = size
+        self.quality = quality
+
+        from PIL import features
+        self.format, self.extension = ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+
+        self._lock = threading.Lock()
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+
+    def content_hash(self, image_path: str) -> str:
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached:
+            return cached
+
+        digest = hashlib.sha256()
+        with open(image_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self._lock:
+            self._hashes[key] = value
+        return value
+
+    def get_thumbnail(self, image_path: str) -> Optional[str]:
+        """retorno la ruta de la miniatura, generándola la primera vez"""
+        try:
+            thumb_path = self.cache_dir / f"{self.content_hash(image_path)}_{self.size}.{self.extension}"
+        except OSError as e:
+            self.logger.warning(f"no encontré la imagen {image_path}: {e}")
+            return None
+
+        if thumb_path.exists():
+            return str(thumb_path)
+
+        try:
+            with Image.open(image_path) as image:
+                # draft acelera los jpeg (decodifica a menor escala); en png no hace nada
+                image.draft('RGB', (self.size, self.size))
+                thumb = image.convert('RGB')
+                thumb.thumbnail((self.size, self.size), Image.LANCZOS)
+
+            tmp_path = thumb_path.with_suffix(f".{self.extension}.tmp")
+            thumb.save(tmp_path, format=self.format, quality=self.quality)
+            os.replace(tmp_path, thumb_path)
+            return str(thumb_path)
+
+        except Exception as e:
+            self.logger.warning(f"no pude generar la miniatura de {image_path}: {e}")
+            return None
@@ -0,0 +1,3 @@
+from .job_queue import JobQueue, QUEUED, RUNNING, COMPLETED, FAILED
+
+__all__ = ['JobQueue', 'QUEUED', 'RUNNING', 'COMPLETED', 'FAILED']
@@ -0,0 +1,240 @@
+"""
+cola de trabajos persistente en sqlite con un pool de workers en hilos
+la uso para generar imágenes sin mantener abierta la conexión http;
+los trabajos sobreviven a un reinicio y se retoman al arrancar
+"""
+
+import json
+import time
+import uuid
+import logging
+import sqlite3
+import threading
+from enum import Enum
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "data/jobs/jobs.db"
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def _json_default(value: Any) -> Any:
+    """serializo lo que devuelven los generadores (dataclasses, enums, paths, numpy)"""
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Path):
+        return str(value)
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+
+class JobQueue:
+    """
+    submit() guarda el trabajo y retorna su id al instante
+    los workers toman trabajos en orden de llegada y guardan el resultado en la base
+    """
+
+    def __init__(self,
+                 handler: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 db_path: str = DEFAULT_DB_PATH,
+                 workers: int = 2,
+                 poll_interval: float = 1.0,
+                 name: str = "jobs"):
+        self.logger = logging.getLogger(__name__)
+        self.handler = handler
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.name = name
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        # una conexión por operación: sqlite no comparte conexiones entre hilos
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        finally:
+            conn.close()
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        """encolo un trabajo y retorno su id"""
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, status, payload, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, _dumps(payload), time.time())
+            )
+        finally:
+            conn.close()
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """estado del trabajo; incluye el resultado cuando terminó"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            position = None
+            if row['status'] == QUEUED:
+                position = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?",
+                    (QUEUED, row['created_at'])
+                ).fetchone()[0]
+        finally:
+            conn.close()
+
+        job = {
+            'job_id': row['id'],
+            'status': row['status'],
+            'payload': json.loads(row['payload']),
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'attempts': row['attempts'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at'],
+        }
+        if position is not None:
+            job['queue_position'] = position
+        return job
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """tomo el trabajo más antiguo en cola de forma atómica"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, payload FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (RUNNING, time.time(), row['id'])
+                )
+            conn.execute("COMMIT")
+            return row
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, _dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+        finally:
+            conn.close()
+
+    def recover(self) -> int:
+        """
+        vuelvo a encolar los trabajos que quedaron en running por un reinicio
+        asumo un solo proceso consumiendo esta base
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+                (QUEUED, RUNNING)
+            )
+            recovered = cursor.rowcount
+        finally:
+            conn.close()
+        if recovered:
+            self.logger.info(f"{self.name}: retomo {recovered} trabajos interrumpidos")
+        return recovered
+
+    def start(self) -> "JobQueue":
+        """retomo trabajos interrumpidos y arranco los workers"""
+        if self._threads:
+            return self
+        self.recover()
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"{self.name}-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info(f"{self.name}: {self.workers} workers iniciados ({self.db_path})")
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """los trabajos en curso que no terminen quedan en running y se retoman al reiniciar"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                row = self._claim()
+            except sqlite3.Error as e:
+                self.logger.warning(f"{self.name}: no pude tomar un trabajo: {e}")
+                row = None
+
+            if row is None:
+                # espero un submit o reviso la base cada poll_interval (otros procesos pueden encolar)
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            job_id = row['id']
+            try:
+                result = self.handler(json.loads(row['payload']))
+                self._finish(job_id, COMPLETED, result=result)
+            except Exception as e:
+                self.logger.error(f"{self.name}: trabajo {job_id} falló: {e}")
+                self._finish(job_id, FAILED, error=str(e))
+
+    def get_stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        return {status: count for status, count in rows}
@@ -0,0 +1,18 @@
+from .metrics import (
+    REGISTRY,
+    STAGE_LATENCY,
+    CACHE_REQUESTS,
+    GEMINI_ERRORS,
+    FILTER_BLOCKS,
+    timed,
+    record_cache,
+    render_latest,
+    instrument_app,
+)
+from .tracing import Span, Tracer, tracer, JsonFileExporter, OTLPHttpExporter
+
+__all__ = [
+    'REGISTRY', 'STAGE_LATENCY', 'CACHE_REQUESTS', 'GEMINI_ERRORS', 'FILTER_BLOCKS',
+    'timed', 'record_cache', 'render_latest', 'instrument_app',
+    'Span', 'Tracer', 'tracer', 'JsonFileExporter', 'OTLPHttpExporter'
+]
@@ -0,0 +1,258 @@
+"""
+métricas estilo prometheus (contadores e histogramas) sin dependencias externas
+las expongo en /metrics con el formato de texto 0.0.4
+"""
+
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# buckets en segundos: cubren desde encode_query (ms) hasta generación de imágenes (decenas de s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    """base común: un valor por combinación de labels"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} espera labels {self.labelnames}, recibí {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = sorted(self._children.items())
+        for key, child in items:
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """contador monótono"""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._children.get(self._key(labels), 0.0)
+
+    def _render_child(self, key, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """histograma acumulativo con buckets fijos"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    child['counts'][i] += 1
+                    break
+            child['sum'] += value
+            child['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """mido la duración del bloque en segundos"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_count(self, **labels) -> int:
+        with self._lock:
+            child = self._children.get(self._key(labels))
+            return child['count'] if child else 0
+
+    def _render_child(self, key, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child['counts']):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {child['sum']!r}")
+        lines.append(f"{self.name}_count{labels} {child['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """registro de métricas del proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """registro una métrica; si ya existe con ese nombre retorno la existente"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _shared_registry() -> MetricsRegistry:
+    # según el punto de entrada este módulo se importa como `monitoring.metrics`
+    # o como `src.monitoring.metrics`; comparto un solo registro entre ambos
+    for module_name in ('monitoring.metrics', 'src.monitoring.metrics'):
+        module = sys.modules.get(module_name)
+        registry = getattr(module, 'REGISTRY', None) if module else None
+        if registry is not None:
+            return registry
+    return MetricsRegistry()
+
+
+REGISTRY = _shared_registry()
+
+# métricas del pipeline
+STAGE_LATENCY = REGISTRY.histogram(
+    "jaks_stage_duration_seconds",
+    "duración de cada etapa del pipeline en segundos",
+    labelnames=("stage",)
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "jaks_http_request_duration_seconds",
+    "duración de los requests http en segundos",
+    labelnames=("app", "method", "path", "status")
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "jaks_cache_requests_total",
+    "consultas a caches por resultado (hit/miss)",
+    labelnames=("cache", "result")
+)
+GEMINI_ERRORS = REGISTRY.counter(
+    "jaks_gemini_errors_total",
+    "errores al llamar a gemini",
+)
+FILTER_BLOCKS = REGISTRY.counter(
+    "jaks_filter_blocks_total",
+    "prompts bloqueados por el filtro de contenido",
+    labelnames=("component",)
+)
+
+IMAGE_ATTEMPTS = REGISTRY.counter(
+    "jaks_image_generation_attempts_total",
+    "generaciones de imagen pagadas por resultado de validación (passed/rejected/error)",
+    labelnames=("result",)
+)
+
+
+def timed(stage: str):
+    """decorador que registra la duración de la función en STAGE_LATENCY"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with STAGE_LATENCY.time(stage=stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache: str, hit: bool):
+    """registro un hit o miss de cache"""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render_latest(registry: Optional[MetricsRegistry] = None) -> str:
+    """texto de exposición para /metrics"""
+    return (registry or REGISTRY).render()
+
+
+def instrument_app(app, app_name: str):
+    """
+    agrego a una app fastapi el endpoint /metrics y un middleware
+    que mide la latencia de cada request por ruta
+    """
+    from fastapi import Request
+    from fastapi.responses import Response
+
+    @app.middleware("http")
+    async def _metrics_middleware(request: Request, call_next):
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # uso la plantilla de la ruta para no explotar la cardinalidad
+            route = request.scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_LATENCY.observe(
+                time.perf_counter() - start,
+                app=app_name, method=request.method, path=path, status=str(status)
+            )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """métricas en formato prometheus"""
+        return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
+
+    return app
@@ -0,0 +1,234 @@
+"""
+tracing liviano basado en spans (padre/hijo, atributos y trace id)
+exporto cada traza completa a un archivo jsonl o a un colector otlp/http
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """un paso medido dentro de una traza"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time: float = field(default_factory=time.time)
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time is None:
+            return None
+        return (self.end_time - self.start_time) * 1000.0
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['duration_ms'] = round(self.duration_ms, 3) if self.end_time is not None else None
+        return data
+
+
+class JsonFileExporter:
+    """escribo una traza por línea en un archivo jsonl"""
+
+    def __init__(self, path: str = "data/traces/traces.jsonl"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        record = {
+            'trace_id': spans[0].trace_id,
+            'spans': [span.to_dict() for span in spans]
+        }
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+class OTLPHttpExporter:
+    """envío las trazas a un colector compatible con otlp/http (json)"""
+
+    def __init__(self, endpoint: str, service_name: str = "jaks3", timeout: float = 5.0):
+        self.url = endpoint.rstrip('/')
+        if not self.url.endswith('/v1/traces'):
+            self.url += '/v1/traces'
+        self.service_name = service_name
+        self.timeout = timeout
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {'key': key, 'value': {'boolValue': value}}
+        if isinstance(value, int):
+            return {'key': key, 'value': {'intValue': str(value)}}
+        if isinstance(value, float):
+            return {'key': key, 'value': {'doubleValue': value}}
+        return {'key': key, 'value': {'stringValue': str(value)}}
+
+    def to_otlp(self, spans: List[Span]) -> Dict[str, Any]:
+        otlp_spans = []
+        for span in spans:
+            item = {
+                'traceId': span.trace_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': 1,  # SPAN_KIND_INTERNAL
+                'startTimeUnixNano': str(int(span.start_time * 1e9)),
+                'endTimeUnixNano': str(int((span.end_time or span.start_time) * 1e9)),
+                'attributes': [self._attribute(k, v) for k, v in span.attributes.items()],
+                'status': {'code': 2, 'message': span.error or ''} if span.status == "error" else {'code': 1}
+            }
+            if span.parent_id:
+                item['parentSpanId'] = span.parent_id
+            otlp_spans.append(item)
+
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [self._attribute('service.name', self.service_name)]},
+                'scopeSpans': [{'scope': {'name': 'jaks3.tracing'}, 'spans': otlp_spans}]
+            }]
+        }
+
+    def export(self, spans: List[Span]):
+        import requests
+        response = requests.post(self.url, json=self.to_otlp(spans), timeout=self.timeout)
+        if response.status_code >= 300:
+            logger.warning(f"el colector otlp respondió {response.status_code}: {response.text[:200]}")
+
+
+class Tracer:
+    """
+    creo spans anidados con contextvars, así los hijos encuentran a su padre
+    incluso en hilos si se propaga el contexto (contextvars.copy_context)
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+        self._current: contextvars.ContextVar = contextvars.ContextVar("jaks_current_span", default=None)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[Span]] = {}
+        self._queue: Optional[queue.Queue] = None
+
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    def current_trace_id(self) -> Optional[str]:
+        span = self.current_span()
+        return span.trace_id if span else None
+
+    @contextmanager
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        """abro un span hijo del actual (o raíz de una traza nueva)"""
+        parent = self._current.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            attributes=dict(attributes or {})
+        )
+        token = self._current.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_time = time.time()
+            self._current.reset(token)
+            self._finish(span)
+
+    def _finish(self, span: Span):
+        with self._lock:
+            spans = self._pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent_id is not None:
+                return
+            # cerró la raíz: la traza está completa
+            finished = self._pending.pop(span.trace_id)
+
+        if self.exporter is not None:
+            finished.sort(key=lambda s: s.start_time)
+            self._enqueue(finished)
+
+    def _enqueue(self, spans: List[Span]):
+        # exporto en un hilo aparte para no sumar latencia al request
+        if self._queue is None:
+            with self._lock:
+                if self._queue is None:
+                    self._queue = queue.Queue(maxsize=1000)
+                    threading.Thread(target=self._export_loop, daemon=True).start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            logger.warning("cola de trazas llena, descarto una traza")
+
+    def _export_loop(self):
+        while True:
+            spans = self._queue.get()
+            try:
+                self.exporter.export(spans)
+            except Exception as e:
+                logger.warning(f"no se pudo exportar la traza: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0):
+        """espero a que se exporten las trazas pendientes"""
+        if self._queue is None:
+            return
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+
+
+def exporter_from_env():
+    """
+    TRACE_EXPORTER=json  -> TRACE_FILE (por defecto data/traces/traces.jsonl)
+    TRACE_EXPORTER=otlp  -> OTEL_EXPORTER_OTLP_ENDPOINT (por defecto http://localhost:4318)
+    """
+    kind = os.getenv("TRACE_EXPORTER", "").lower()
+    if kind == "json":
+        return JsonFileExporter(os.getenv("TRACE_FILE", "data/traces/traces.jsonl"))
+    if kind == "otlp":
+        return OTLPHttpExporter(
+            os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318"),
+            service_name=os.getenv("OTEL_SERVICE_NAME", "jaks3")
+        )
+    return None
+
+
+def _shared_tracer() -> Tracer:
+    # igual que en metrics: un solo tracer aunque el módulo se importe con dos nombres
+    for module_name in ('monitoring.tracing', 'src.monitoring.tracing'):
+        module = sys.modules.get(module_name)
+        existing = getattr(module, 'tracer', None) if module else None
+        if existing is not None:
+            return existing
+    return Tracer(exporter_from_env())
+
+
+tracer = _shared_tracer()
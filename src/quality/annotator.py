@@ -0,0 +1,62 @@
+"""
+etapa de ingesta que califica los documentos antes de guardarlos en el vector store
+corro clasificador y detector en lote y dejo el resultado como metadata de chromadb,
+así la búsqueda puede filtrar o priorizar por calidad sin llamar a los modelos por query
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from .quality_metrics import QualityMetrics
+from .feature_store import FeatureStore
+from .quality_classifier import QualityClassifier
+from .anomaly_detector import AnomalyDetector
+
+
+class QualityAnnotator:
+    """
+    annotate() retorna doc_id -> metadata de calidad (solo tipos que acepta chromadb)
+    el score heurístico y la confiabilidad de la fuente van siempre; la clase y el flag de
+    anomalía solo si hay modelos entrenados (en la ingesta no entreno nada)
+    """
+
+    def __init__(self,
+                 classifier: Optional[QualityClassifier] = None,
+                 anomaly_detector: Optional[AnomalyDetector] = None,
+                 feature_store: Optional[FeatureStore] = None):
+        self.logger = logging.getLogger(__name__)
+        self.metrics_extractor = QualityMetrics()
+        self.feature_store = feature_store or FeatureStore(metrics=self.metrics_extractor)
+        self.classifier = classifier or QualityClassifier(feature_store=self.feature_store)
+        self.anomaly_detector = anomaly_detector or AnomalyDetector(feature_store=self.feature_store)
+
+    def annotate(self, documents: List) -> Dict[str, Dict[str, Any]]:
+        if not documents:
+            return {}
+
+        features = self.feature_store.get_features(documents)
+        scores = self.metrics_extractor.calculate_quality_scores(features).tolist()
+        reliability = features['source_reliability'].astype(float).tolist()
+
+        annotations = {
+            doc.id: {'quality_score': score, 'source_reliability': source}
+            for doc, score, source in zip(documents, scores, reliability)
+        }
+
+        if self.classifier.is_trained:
+            predictions = self.classifier.predict_quality_batch(documents, features)
+            for doc, prediction in zip(documents, predictions):
+                annotations[doc.id]['quality_class'] = prediction['quality_class']
+                annotations[doc.id]['quality_confidence'] = prediction['confidence']
+
+        if self.anomaly_detector.is_trained:
+            # detect_anomalies ordena por score, por eso asocio por id
+            for result in self.anomaly_detector.detect_anomalies(documents, features):
+                annotations[result['document_id']]['is_anomaly'] = result['is_anomaly']
+                annotations[result['document_id']]['anomaly_score'] = result['anomaly_score']
+
+        self.logger.info(
+            f"califiqué {len(annotations)} documentos "
+            f"(clasificador: {self.classifier.is_trained}, detector: {self.anomaly_detector.is_trained})"
+        )
+        return annotations
@@ -1,7 +1,7 @@
 import logging
 import numpy as np
 import joblib
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
@@ -9,70 +9,76 @@ import pandas as pd
 from pathlib import Path
 
 from .quality_metrics import QualityMetrics
+from .feature_store import FeatureStore
+
+try:
+    from storage.model_registry import MODEL_REGISTRY
+except ImportError:
+    from src.storage.model_registry import MODEL_REGISTRY
 
 class AnomalyDetector:
     """detector de anomalías en documentos usando isolation forest"""
     
-    def __init__(self, model_path: str = "data/models/anomaly_detector.joblib"):
+    def __init__(self, model_path: str = "data/models/anomaly_detector.joblib",
+                 feature_store: Optional[FeatureStore] = None):
         self.logger = logging.getLogger(__name__)
         self.model_path = Path(model_path)
         self.model_path.parent.mkdir(parents=True, exist_ok=True)
         
         self.metrics_extractor = QualityMetrics()
+        self.feature_store = feature_store or FeatureStore(metrics=self.metrics_extractor)
         self.model = None
         self.scaler = None
         self.pca = None
         self.feature_names = None
-        self.is_trained = False
-        
-        # intento cargar modelo existente
+        self.contamination = 0.1
+        self._trained = False
+        # versión del archivo que tengo en memoria; el modelo se carga de forma diferida
+        self._artifact_version = None
+    
+    @property
+    def is_trained(self) -> bool:
+        """el modelo guardado lo tomo del registro compartido recién cuando hace falta"""
         self._load_model()
+        return self._trained
+    
+    @is_trained.setter
+    def is_trained(self, value: bool):
+        self._trained = value
     
     def _load_model(self):
-        """cargo modelo pre-entrenado si existe"""
+        """tomo el detector pre-entrenado del registro si existe o cambió en disco"""
+        artifact = MODEL_REGISTRY.get(self.model_path)
+        if artifact is None or artifact.version == self._artifact_version:
+            return
+        self._artifact_version = artifact.version
         try:
-            if self.model_path.exists():
-                saved_data = joblib.load(self.model_path)
-                self.model = saved_data['model']
-                self.scaler = saved_data['scaler']
-                self.pca = saved_data.get('pca')
-                self.feature_names = saved_data['feature_names']
-                self.is_trained = True
-                self.logger.info("detector de anomalías cargado exitosamente")
+            saved_data = artifact.data
+            self.model = saved_data['model']
+            self.scaler = saved_data['scaler']
+            self.pca = saved_data.get('pca')
+            self.feature_names = saved_data['feature_names']
+            self.contamination = saved_data.get('contamination', 0.1)
+            self._trained = True
+            self.logger.info("detector de anomalías cargado exitosamente")
         except Exception as e:
             self.logger.warning(f"no se pudo cargar detector existente: {e}")
     
-    def prepare_features(self, documents: List) -> np.ndarray:
+    # selecciono solo features numéricas relevantes
+    FEATURE_COLUMNS = [
+        'content_length', 'word_count', 'paragraph_count',
+        'has_headers', 'has_lists', 'code_blocks', 'code_inline',
+        'quality_keywords', 'low_quality_indicators', 'technical_terms',
+        'external_links', 'avg_sentence_length', 'readability_score',
+        'java_keywords', 'spring_keywords', 'source_reliability'
+    ]
+    
+    def prepare_features(self, documents: List, features: Optional[pd.DataFrame] = None) -> np.ndarray:
         """preparo features numéricas para detección de anomalías"""
-        features_list = []
-        
-        for doc in documents:
-            features = self.metrics_extractor.extract_features(doc)
-            
-            # selecciono solo features numéricas relevantes
-            numeric_features = {
-                'content_length': features['content_length'],
-                'word_count': features['word_count'],
-                'paragraph_count': features['paragraph_count'],
-                'has_headers': features['has_headers'],
-                'has_lists': features['has_lists'],
-                'code_blocks': features['code_blocks'],
-                'code_inline': features['code_inline'],
-                'quality_keywords': features['quality_keywords'],
-                'low_quality_indicators': features['low_quality_indicators'],
-                'technical_terms': features['technical_terms'],
-                'external_links': features['external_links'],
-                'avg_sentence_length': features['avg_sentence_length'],
-                'readability_score': features['readability_score'],
-                'java_keywords': features['java_keywords'],
-                'spring_keywords': features['spring_keywords'],
-                'source_reliability': features['source_reliability']
-            }
-            
-            features_list.append(numeric_features)
+        # leo las features del feature store (o reutilizo las que me pasan)
+        df = features if features is not None else self.feature_store.get_features(documents)
         
-        # convierto a dataframe
-        df = pd.DataFrame(features_list)
+        df = df[self.FEATURE_COLUMNS]
         self.feature_names = df.columns.tolist()
         
         return df.values
@@ -87,27 +93,12 @@ class AnomalyDetector:
         # preparo features
         X = self.prepare_features(documents)
         
-        # normalizo datos
-        self.scaler = StandardScaler()
-        X_scaled = self.scaler.fit_transform(X)
-        
-        # reducción dimensional opcional (si hay muchas features)
-        if X_scaled.shape[1] > 10:
-            self.pca = PCA(n_components=min(10, X_scaled.shape[1]))
-            X_scaled = self.pca.fit_transform(X_scaled)
-        
-        # entreno isolation forest
-        self.model = IsolationForest(
-            contamination=contamination,
-            random_state=42,
-            n_estimators=100
-        )
-        
-        self.model.fit(X_scaled)
+        self.scaler, self.pca, self.model = self.fit_components(X, contamination)
+        self.contamination = contamination
         
         # evalúo en datos de entrenamiento
-        predictions = self.model.predict(X_scaled)
-        anomaly_scores = self.model.decision_function(X_scaled)
+        anomaly_scores = self.score_matrix(X)
+        predictions = np.where(anomaly_scores < 0, -1, 1)
         
         n_anomalies = np.sum(predictions == -1)
         anomaly_rate = n_anomalies / len(documents)
@@ -132,49 +123,86 @@ class AnomalyDetector:
             'feature_count': len(self.feature_names)
         }
     
+    @staticmethod
+    def fit_components(X: np.ndarray, contamination: float) -> Tuple[StandardScaler, Optional[PCA], IsolationForest]:
+        """
+        ajusto scaler, pca e isolation forest sobre una matriz de features
+        no toco el estado del detector, así puedo reentrenar en segundo plano y cambiar todo junto
+        """
+        # normalizo datos
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        
+        # reducción dimensional opcional (si hay muchas features)
+        pca = None
+        if X_scaled.shape[1] > 10:
+            pca = PCA(n_components=min(10, X_scaled.shape[1]))
+            X_scaled = pca.fit_transform(X_scaled)
+        
+        # entreno isolation forest
+        model = IsolationForest(
+            contamination=contamination,
+            random_state=42,
+            n_estimators=100
+        )
+        model.fit(X_scaled)
+        
+        return scaler, pca, model
+    
+    def score_matrix(self, X: np.ndarray) -> np.ndarray:
+        """scores de decision_function para una matriz de features (negativo = anomalía)"""
+        X_scaled = self.scaler.transform(X)
+        if self.pca:
+            X_scaled = self.pca.transform(X_scaled)
+        return self.model.decision_function(X_scaled)
+    
     def _save_model(self):
         """guardo modelo entrenado"""
+        # un guardado fallido no debe dejar que el registro recargue el detector viejo
+        self._artifact_version = MODEL_REGISTRY.version(self.model_path)
         try:
             save_data = {
                 'model': self.model,
                 'scaler': self.scaler,
                 'pca': self.pca,
-                'feature_names': self.feature_names
+                'feature_names': self.feature_names,
+                'contamination': self.contamination
             }
             joblib.dump(save_data, self.model_path)
+            # lo que tengo en memoria ya es esta versión, no hace falta releerla
+            self._artifact_version = MODEL_REGISTRY.version(self.model_path)
             self.logger.info(f"detector guardado en {self.model_path}")
         except Exception as e:
             self.logger.error(f"error guardando detector: {e}")
     
-    def detect_anomalies(self, documents: List) -> List[Dict[str, Any]]:
+    def detect_anomalies(self, documents: List,
+                         features: Optional[pd.DataFrame] = None) -> List[Dict[str, Any]]:
         """detecto anomalías en lista de documentos"""
         if not self.is_trained:
             self.logger.warning("detector no entrenado. entrenando automáticamente...")
             self.train(documents)
         
         # preparo features
-        X = self.prepare_features(documents)
+        X = self.prepare_features(documents, features)
         
-        # transformo datos
-        X_scaled = self.scaler.transform(X)
-        if self.pca:
-            X_scaled = self.pca.transform(X_scaled)
-        
-        # detecto anomalías
-        predictions = self.model.predict(X_scaled)
-        scores = self.model.decision_function(X_scaled)
+        # detecto anomalías: predict de isolation forest es decision_function < 0,
+        # así recorro los árboles una sola vez
+        scores = self.score_matrix(X)
+        is_anomaly = (scores < 0).tolist()
+        confidences = (1 / (1 + np.exp(-np.abs(scores)))).tolist()  # aplico sigmoid
         
         # preparo resultados
-        results = []
-        for i, (doc, pred, score) in enumerate(zip(documents, predictions, scores)):
-            results.append({
+        results = [
+            {
                 'document_id': doc.id,
                 'title': doc.title,
-                'is_anomaly': pred == -1,
-                'anomaly_score': float(score),
-                'confidence': float(1 / (1 + np.exp(-abs(score)))),  # aplico sigmoid
+                'is_anomaly': anomaly,
+                'anomaly_score': score,
+                'confidence': confidence,
                 'file_path': doc.file_path
-            })
+            }
+            for doc, anomaly, score, confidence in zip(documents, is_anomaly, scores.tolist(), confidences)
+        ]
         
         # ordeno por score (anomalías más extremas primero)
         results.sort(key=lambda x: x['anomaly_score'])
@@ -186,9 +214,12 @@ class AnomalyDetector:
         results = self.detect_anomalies([document])
         return results[0] if results else {}
     
-    def get_anomaly_summary(self, documents: List) -> Dict[str, Any]:
+    def get_anomaly_summary(self, documents: List,
+                            features: Optional[pd.DataFrame] = None,
+                            results: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """obtengo resumen de anomalías detectadas"""
-        results = self.detect_anomalies(documents)
+        if results is None:
+            results = self.detect_anomalies(documents, features)
         
         anomalies = [r for r in results if r['is_anomaly']]
         normal_docs = [r for r in results if not r['is_anomaly']]
@@ -0,0 +1,242 @@
+"""
+estadísticas del corpus mantenidas de forma incremental
+actualizo conteos, distribuciones y cubetas de longitud a medida que se agregan o quitan
+documentos y guardo todo en disco; el dashboard lee la foto sin recorrer el corpus
+"""
+
+import os
+import json
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_STATS_PATH = os.getenv("CORPUS_STATS_PATH", "data/features/corpus_stats.json")
+
+STATS_VERSION = 1
+
+# cubetas de longitud del reporte del dashboard
+LENGTH_BUCKETS = (('short', 0, 500), ('medium', 500, 2000), ('long', 2000, None))
+
+
+def _length_bucket(length: int) -> str:
+    for name, low, high in LENGTH_BUCKETS:
+        if length >= low and (high is None or length < high):
+            return name
+    return 'short'
+
+
+def _histogram_bucket(length: int) -> int:
+    """cubeta de potencias de 2: 0 -> [0, 1), k -> [2^(k-1), 2^k)"""
+    return length.bit_length()
+
+
+def _source(file_path: str) -> str:
+    return file_path.split('_')[0] if '_' in file_path else 'unknown'
+
+
+def _entry(doc) -> List:
+    return [len(doc.content), len(doc.content.split()), doc.doc_type, _source(doc.file_path)]
+
+
+class CorpusStats:
+    """
+    por documento guardo solo (longitud, palabras, tipo, fuente), así puedo quitarlo exacto
+    los agregados se actualizan en O(1) por documento y la foto se arma una vez por cambio
+    la ingesta escribe el archivo; los lectores (dashboard) llaman a refresh() y leen snapshot()
+    con path=None las estadísticas quedan solo en memoria
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_STATS_PATH):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path) if path is not None else None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._loaded_mtime = None
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self._documents: Dict[str, List] = {}
+        self._total_length = 0
+        self._total_words = 0
+        self._length_counts: Counter = Counter()
+        self._file_types: Counter = Counter()
+        self._sources: Counter = Counter()
+        self._buckets: Counter = Counter()
+        self._histogram: Counter = Counter()
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._documents
+
+    @classmethod
+    def from_documents(cls, documents: Iterable) -> "CorpusStats":
+        """
+        estadísticas en memoria de una lista de documentos, sin archivo
+        cuento cada documento aunque dos compartan id (txt_{stem} se repite entre carpetas)
+        """
+        stats = cls(path=None)
+        with stats._lock:
+            for position, doc in enumerate(documents):
+                stats._apply(str(position), _entry(doc), 1)
+        return stats
+
+    def covers(self, doc_ids: Iterable[str]) -> bool:
+        """si el acumulador tiene exactamente estos ids (sin repetidos)"""
+        doc_ids = list(doc_ids)
+        unique = set(doc_ids)
+        with self._lock:
+            return (len(unique) == len(doc_ids) == len(self._documents)
+                    and all(doc_id in self._documents for doc_id in unique))
+
+    def _file_mtime(self) -> Optional[int]:
+        if self.path is None:
+            return None
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        self._loaded_mtime = self._file_mtime()
+        if self._loaded_mtime is None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != STATS_VERSION:
+                return
+            # los agregados los reconstruyo de las entradas (una pasada sin tocar el contenido)
+            for doc_id, entry in data['documents'].items():
+                self._apply(doc_id, entry, 1)
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"no pude leer las estadísticas del corpus: {e}")
+            self._reset()
+
+    def refresh(self) -> bool:
+        """releo el archivo si otro proceso (la ingesta) lo reescribió; retorno si lo releí"""
+        with self._lock:
+            if self.path is None or self._file_mtime() == self._loaded_mtime:
+                return False
+            self._reset()
+            self._load()
+            return True
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            payload = {'version': STATS_VERSION, 'documents': self._documents}
+            tmp_path = self.path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._loaded_mtime = self._file_mtime()
+
+    def _apply(self, doc_id: str, entry: List, sign: int):
+        length, words, doc_type, source = entry
+        self._total_length += sign * length
+        self._total_words += sign * words
+        self._length_counts[length] += sign
+        self._file_types[doc_type] += sign
+        self._sources[source] += sign
+        self._buckets[_length_bucket(length)] += sign
+        self._histogram[_histogram_bucket(length)] += sign
+        if sign > 0:
+            self._documents[doc_id] = entry
+        else:
+            del self._documents[doc_id]
+        self._snapshot = None
+
+    def add_documents(self, documents: Iterable) -> int:
+        """agrego documentos; si el id ya estaba reemplazo su entrada"""
+        added = 0
+        with self._lock:
+            for doc in documents:
+                previous = self._documents.get(doc.id)
+                if previous is not None:
+                    self._apply(doc.id, previous, -1)
+                self._apply(doc.id, _entry(doc), 1)
+                added += 1
+        return added
+
+    def remove_documents(self, doc_ids: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for doc_id in doc_ids:
+                entry = self._documents.get(doc_id)
+                if entry is not None:
+                    self._apply(doc_id, entry, -1)
+                    removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def sync(self, documents: List) -> bool:
+        """
+        reconstrucción explícita: dejo el acumulador igual al conjunto de documentos
+        recuento todos (O(n)) y aplico solo las diferencias; no guardo en disco,
+        eso lo decide quien llama (por ejemplo un script de mantenimiento)
+        retorno si hubo cambios
+        """
+        current = {doc.id: _entry(doc) for doc in documents}
+        with self._lock:
+            stale = [doc_id for doc_id in self._documents if doc_id not in current]
+            changed = [doc_id for doc_id, entry in current.items() if self._documents.get(doc_id) != entry]
+            for doc_id in stale:
+                self._apply(doc_id, self._documents[doc_id], -1)
+            for doc_id in changed:
+                previous = self._documents.get(doc_id)
+                if previous is not None:
+                    self._apply(doc_id, previous, -1)
+                self._apply(doc_id, current[doc_id], 1)
+        if stale or changed:
+            self.logger.info(f"estadísticas del corpus: {len(changed)} documentos nuevos o cambiados, {len(stale)} quitados")
+        return bool(stale or changed)
+
+    def _median_length(self) -> float:
+        total = len(self._documents)
+        lengths = sorted(length for length, count in self._length_counts.items() if count > 0)
+        middle = [(total - 1) // 2, total // 2]
+        values, seen = [], 0
+        for length in lengths:
+            seen += self._length_counts[length]
+            while middle and middle[0] < seen:
+                values.append(length)
+                middle.pop(0)
+            if not middle:
+                break
+        return (values[0] + values[1]) / 2
+
+    def snapshot(self) -> Dict[str, Any]:
+        """estadísticas para el reporte del dashboard; la foto la recalculo solo si algo cambió"""
+        with self._lock:
+            if self._snapshot is not None:
+                return dict(self._snapshot)
+            total = len(self._documents)
+            if not total:
+                return {}
+
+            sources = {name: count for name, count in self._sources.items() if count > 0}
+            self._snapshot = {
+                'total_documents': total,
+                'avg_content_length': self._total_length / total,
+                'median_content_length': self._median_length(),
+                'avg_word_count': self._total_words / total,
+                'file_types': {name: count for name, count in self._file_types.items() if count > 0},
+                'top_sources': dict(sorted(sources.items(), key=lambda x: x[1], reverse=True)[:5]),
+                'length_distribution': {name: self._buckets[name] for name, _, _ in LENGTH_BUCKETS},
+                # cubetas de potencias de 2 (límite superior exclusivo -> cantidad)
+                'length_histogram': {
+                    (1 << bucket): count for bucket, count in sorted(self._histogram.items()) if count > 0
+                }
+            }
+            return dict(self._snapshot)
@@ -1,21 +1,28 @@
 """dashboard de control de calidad"""
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import pandas as pd
 import numpy as np
 
 from .quality_classifier import QualityClassifier
 from .anomaly_detector import AnomalyDetector
 from .quality_metrics import QualityMetrics
+from .feature_store import FeatureStore
+from .corpus_stats import CorpusStats
 
 class QualityDashboard:
     """dashboard para análisis de calidad del corpus"""
     
-    def __init__(self):
+    def __init__(self, feature_store: Optional[FeatureStore] = None,
+                 corpus_stats: Optional[CorpusStats] = None):
         self.logger = logging.getLogger(__name__)
-        self.classifier = QualityClassifier()
-        self.anomaly_detector = AnomalyDetector()
         self.metrics_extractor = QualityMetrics()
+        # un solo feature store para el clasificador, el detector y los reportes
+        self.feature_store = feature_store or FeatureStore(metrics=self.metrics_extractor)
+        self.classifier = QualityClassifier(feature_store=self.feature_store)
+        self.anomaly_detector = AnomalyDetector(feature_store=self.feature_store)
+        # estadísticas del corpus persistidas; la ingesta las mantiene al día
+        self.corpus_stats = corpus_stats or CorpusStats()
     
     def generate_quality_report(self, documents: List) -> Dict[str, Any]:
         """genero un reporte completo de calidad"""
@@ -25,10 +32,13 @@ class QualityDashboard:
         quality_results = []
         anomaly_results = []
         
-        for doc in documents:
-            # clasifico calidad
-            if self.classifier.is_trained:
-                quality_info = self.classifier.predict_quality(doc)
+        # leo las features una sola vez (solo calculo las que faltan) y las comparto entre clasificador y detector
+        features = self.feature_store.get_features(documents)
+        
+        # clasifico calidad
+        if self.classifier.is_trained and documents:
+            predictions = self.classifier.predict_quality_batch(documents, features)
+            for doc, quality_info in zip(documents, predictions):
                 quality_results.append({
                     'document_id': doc.id,
                     'title': doc.title,
@@ -39,8 +49,8 @@ class QualityDashboard:
         
         # detecto anomalías
         if self.anomaly_detector.is_trained and documents:
-            anomaly_summary = self.anomaly_detector.get_anomaly_summary(documents)
-            anomaly_results = self.anomaly_detector.detect_anomalies(documents)
+            anomaly_results = self.anomaly_detector.detect_anomalies(documents, features)
+            anomaly_summary = self.anomaly_detector.get_anomaly_summary(documents, results=anomaly_results)
         
         # saco estadísticas generales
         stats = self._calculate_corpus_stats(documents)
@@ -60,40 +70,19 @@ class QualityDashboard:
         }
     
     def _calculate_corpus_stats(self, documents: List) -> Dict[str, Any]:
-        """calculo estadísticas básicas del corpus"""
+        """
+        uso la foto que mantiene la ingesta solo si describe exactamente estos documentos;
+        si no (otro corpus, ids repetidos o nada ingestado) los cuento en memoria,
+        sin escribir el archivo compartido
+        """
         if not documents:
             return {}
         
-        # saco métricas básicas
-        lengths = [len(doc.content) for doc in documents]
-        word_counts = [len(doc.content.split()) for doc in documents]
-        
-        # tipos de archivos
-        file_types = {}
-        for doc in documents:
-            file_types[doc.doc_type] = file_types.get(doc.doc_type, 0) + 1
-        
-        # fuentes
-        sources = {}
-        for doc in documents:
-            source = doc.file_path.split('_')[0] if '_' in doc.file_path else 'unknown'
-            sources[source] = sources.get(source, 0) + 1
+        self.corpus_stats.refresh()
+        if self.corpus_stats.covers(doc.id for doc in documents):
+            return self.corpus_stats.snapshot()
         
-        return {
-            'total_documents': len(documents),
-            'avg_content_length': np.mean(lengths),
-            'median_content_length': np.median(lengths),
-            'avg_word_count': np.mean(word_counts),
-            'file_types': file_types,
-            'top_sources': dict(sorted(sources.items(), 
-                                     key=lambda x: x[1], 
-                                     reverse=True)[:5]),
-            'length_distribution': {
-                'short': len([l for l in lengths if l < 500]),
-                'medium': len([l for l in lengths if 500 <= l < 2000]),
-                'long': len([l for l in lengths if l >= 2000])
-            }
-        }
+        return CorpusStats.from_documents(documents).snapshot()
     
     def _analyze_quality_distribution(self, quality_results: List[Dict]) -> Dict[str, Any]:
         """analizo distribución de calidad"""
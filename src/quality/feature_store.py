@@ -0,0 +1,283 @@
+"""
+almacén persistente de features de calidad por documento
+guardo la matriz numérica en un .npy con capacidad reservada que abro con memory-map y
+el índice (id, hash del contenido, tipo, fila) en un jsonl de solo-append con la versión
+del esquema en la primera línea; solo recalculo los documentos nuevos o cuyo contenido
+cambió y cada lote escribe solo sus filas y sus líneas del índice
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # windows: solo queda el lock dentro del proceso
+    fcntl = None
+
+from .quality_metrics import QualityMetrics, NUMERIC_FEATURES, FEATURE_SCHEMA_VERSION
+
+DEFAULT_STORE_DIR = os.getenv("QUALITY_FEATURE_STORE", "data/features/quality")
+
+INDEX_FILENAME = "index.jsonl"
+LOCK_FILENAME = ".lock"
+
+# filas reservadas al crear la matriz; al llenarse la compacto con el doble de lugar
+MIN_CAPACITY = 1024
+
+# siempre las retorno como float (extract_features a veces da 0 o 100 enteros); el resto son conteos
+_FLOAT_FEATURES = ('avg_sentence_length', 'readability_score', 'source_reliability')
+
+
+def content_hash(document) -> str:
+    """hash de los campos que usa extract_features; si cambia alguno la fila queda vieja"""
+    digest = hashlib.sha1()
+    for value in (document.title, document.content, document.file_path, document.doc_type):
+        digest.update(str(value).encode('utf-8', 'surrogatepass'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """
+    get_features() retorna el mismo dataframe que extract_features_batch
+    pero leyendo del disco las filas que ya estaban calculadas
+
+    las filas nunca se reescriben: un documento que cambió va a una fila nueva y su línea
+    nueva en el índice pisa a la anterior; al llenarse la capacidad compacto en una matriz
+    nueva (otra generación) con solo las filas vivas, así el costo de agregar es amortizado
+    entre procesos escribo con un flock sobre .lock (en windows solo el lock del proceso)
+    """
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR, metrics: Optional[QualityMetrics] = None):
+        self.logger = logging.getLogger(__name__)
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.store_dir / INDEX_FILENAME
+        self.lock_path = self.store_dir / LOCK_FILENAME
+        self.metrics = metrics or QualityMetrics()
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    def _reset(self):
+        self._matrix: Optional[np.memmap] = None
+        self._matrix_name: Optional[str] = None
+        self._rows: Dict[str, int] = {}
+        self._hashes: Dict[str, str] = {}
+        self._file_types: Dict[str, str] = {}
+        self._next_row = 0
+        # hasta dónde leí el índice (inodo y offset) para leer solo lo agregado
+        self._index_inode = None
+        self._index_offset = 0
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """leo las líneas del índice que agregaron otras instancias (o todo si lo compactaron)"""
+        try:
+            stat = self.index_path.stat()
+        except FileNotFoundError:
+            self._reset()
+            return
+        if stat.st_ino == self._index_inode and stat.st_size == self._index_offset:
+            return
+
+        try:
+            with open(self.index_path, 'rb') as f:
+                if stat.st_ino != self._index_inode:
+                    # índice nuevo (primera lectura o compactado): releo desde el encabezado
+                    self._reset()
+                    header = json.loads(f.readline())
+                    if header.get('schema_version') != FEATURE_SCHEMA_VERSION or header.get('columns') != NUMERIC_FEATURES:
+                        self.logger.info("el esquema de features cambió, recalculo el feature store")
+                        return
+                    self._matrix = np.load(self.store_dir / header['matrix'], mmap_mode='r+')
+                    self._matrix_name = header['matrix']
+                    self._index_inode = stat.st_ino
+                    self._index_offset = f.tell()
+                f.seek(self._index_offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # línea a medio escribir: la leo la próxima vez
+                    doc_id, doc_hash, file_type, row = json.loads(line)
+                    self._rows[doc_id] = row
+                    self._hashes[doc_id] = doc_hash
+                    self._file_types[doc_id] = file_type
+                    self._next_row = max(self._next_row, row + 1)
+                    self._index_offset += len(line)
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"no pude leer el feature store: {e}")
+            self._reset()
+            return
+
+        if self._next_row > len(self._matrix):
+            self.logger.warning("feature store inconsistente, lo recalculo")
+            self._reset()
+
+    def _compact(self, extra: int):
+        """
+        matriz nueva con las filas vivas y lugar para extra más; el índice nuevo reemplaza
+        al anterior de forma atómica y recién ahí borro la matriz vieja
+        """
+        live = sorted(self._rows.items(), key=lambda item: item[1])
+        capacity = max(MIN_CAPACITY, 2 * (len(live) + extra))
+        generation = int(self._matrix_name.split('.')[1]) + 1 if self._matrix_name else 0
+        matrix_name = f"features.{generation}.npy"
+
+        matrix = np.lib.format.open_memmap(
+            self.store_dir / matrix_name, mode='w+', dtype=np.float64, shape=(capacity, len(NUMERIC_FEATURES))
+        )
+        if live:
+            matrix[:len(live)] = self._matrix[[row for _, row in live]]
+        matrix.flush()
+
+        tmp_index = self.store_dir / f"{INDEX_FILENAME}.tmp"
+        with open(tmp_index, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'schema_version': FEATURE_SCHEMA_VERSION,
+                'columns': NUMERIC_FEATURES,
+                'matrix': matrix_name,
+            }) + '\n')
+            for new_row, (doc_id, _) in enumerate(live):
+                f.write(json.dumps([doc_id, self._hashes[doc_id], self._file_types[doc_id], new_row],
+                                   ensure_ascii=False) + '\n')
+        os.replace(tmp_index, self.index_path)
+
+        old_name = self._matrix_name
+        self._reset()
+        self._refresh()
+        if old_name and old_name != matrix_name:
+            try:
+                # en posix los lectores que la tienen mapeada la siguen viendo hasta cerrarla
+                (self.store_dir / old_name).unlink()
+            except OSError:
+                pass
+        self.logger.info(f"feature store compactado: {len(live)} filas, capacidad {capacity}")
+
+    def _save(self, ids: List[str], hashes: List[str], file_types: List[str], values: np.ndarray):
+        """escribo solo las filas nuevas y agrego sus líneas al índice"""
+        with self._file_lock():
+            self._refresh()
+            if self._matrix is None or self._next_row + len(ids) > len(self._matrix):
+                self._compact(extra=len(ids))
+
+            # primero las filas y después el índice: una línea siempre apunta a una fila escrita
+            start = self._next_row
+            self._matrix[start:start + len(ids)] = values
+            self._matrix.flush()
+
+            lines = ''.join(
+                json.dumps([doc_id, doc_hash, file_type, start + i], ensure_ascii=False) + '\n'
+                for i, (doc_id, doc_hash, file_type) in enumerate(zip(ids, hashes, file_types))
+            )
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            self._refresh()
+
+    def sample(self, max_rows: int, seed: int = 42) -> pd.DataFrame:
+        """muestra uniforme (sin reemplazo) de las filas guardadas, sin recalcular nada"""
+        with self._lock:
+            self._refresh()
+            doc_ids = list(self._rows)
+            if len(doc_ids) > max_rows:
+                chosen = np.sort(np.random.default_rng(seed).choice(len(doc_ids), max_rows, replace=False))
+                doc_ids = [doc_ids[i] for i in chosen]
+            rows = [self._rows[doc_id] for doc_id in doc_ids]
+            values = (np.asarray(self._matrix[rows], dtype=np.float64) if rows
+                      else np.empty((0, len(NUMERIC_FEATURES))))
+            file_types = [self._file_types[doc_id] for doc_id in doc_ids]
+        return self._to_frame(values, file_types)
+
+    def get_features(self, documents: List, n_jobs: Optional[int] = None) -> pd.DataFrame:
+        """
+        features de los documentos en el mismo orden (igual que extract_features_batch)
+        calculo solo las filas que faltan o cuyo contenido cambió
+        """
+        if not documents:
+            return self.metrics.extract_features_batch(documents)
+
+        hashes = [content_hash(doc) for doc in documents]
+        values = np.empty((len(documents), len(NUMERIC_FEATURES)), dtype=np.float64)
+        file_types: List[str] = [None] * len(documents)
+
+        with self._lock:
+            self._refresh()
+
+            fresh, stored_rows, missing = [], [], []
+            for i, (doc, doc_hash) in enumerate(zip(documents, hashes)):
+                position = self._rows.get(doc.id)
+                if position is not None and self._hashes[doc.id] == doc_hash:
+                    fresh.append(i)
+                    stored_rows.append(position)
+                    file_types[i] = self._file_types[doc.id]
+                else:
+                    missing.append(i)
+
+            if fresh:
+                # indexado con lista: leo del memory-map solo las filas que necesito
+                values[fresh] = self._matrix[stored_rows]
+
+            if missing:
+                computed = self.metrics.extract_features_batch([documents[i] for i in missing], n_jobs=n_jobs)
+                computed_values = computed[NUMERIC_FEATURES].to_numpy(dtype=np.float64)
+                computed_types = computed['file_type'].tolist()
+                values[missing] = computed_values
+                for i, file_type in zip(missing, computed_types):
+                    file_types[i] = file_type
+
+                try:
+                    self._save(
+                        [documents[i].id for i in missing],
+                        [hashes[i] for i in missing],
+                        computed_types,
+                        computed_values
+                    )
+                except OSError as e:
+                    self.logger.warning(f"no pude guardar el feature store: {e}")
+
+        self.logger.info(
+            f"feature store: {len(fresh)} documentos reutilizados, {len(missing)} calculados"
+        )
+        return self._to_frame(values, file_types)
+
+    @staticmethod
+    def _to_frame(values: np.ndarray, file_types: List[str]) -> pd.DataFrame:
+        df = pd.DataFrame(values, columns=NUMERIC_FEATURES)
+        for column in NUMERIC_FEATURES:
+            if column not in _FLOAT_FEATURES:
+                df[column] = df[column].astype(np.int64)
+        # mismo orden de columnas que extract_features (file_type va antes de source_reliability)
+        df.insert(NUMERIC_FEATURES.index('source_reliability'), 'file_type', file_types)
+        return df
+
+    def clear(self):
+        """borro el almacén completo"""
+        with self._lock, self._file_lock():
+            self.index_path.unlink(missing_ok=True)
+            for path in self.store_dir.glob("features.*.npy"):
+                path.unlink(missing_ok=True)
+            self._reset()
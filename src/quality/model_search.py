@@ -0,0 +1,139 @@
+"""
+búsqueda de hiperparámetros con validación cruzada en paralelo
+evalúo los candidatos fold por fold (successive halving): después de cada fold sigo solo con la
+mejor parte, así los candidatos flojos se cortan temprano y no gastan el resto de los folds
+las matrices de los folds las guardo una vez en disco y los procesos las abren con memory-map
+"""
+
+import os
+import math
+import time
+import shutil
+import logging
+import tempfile
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARAM_GRID = {
+    'n_estimators': [100, 300],
+    'max_depth': [None, 12, 24],
+    'min_samples_leaf': [1, 3],
+    'max_features': ['sqrt', 0.5],
+}
+
+_fold_data = None
+
+
+def build_model(params: Dict[str, Any], n_jobs: int = 1) -> RandomForestClassifier:
+    """mismo random forest que QualityClassifier.train, con los parámetros del candidato"""
+    return RandomForestClassifier(random_state=42, class_weight='balanced', n_jobs=n_jobs, **params)
+
+
+def _init_worker(cache_path: str):
+    """cada proceso abre una sola vez las matrices cacheadas (memory-map, sin copias)"""
+    global _fold_data
+    _fold_data = joblib.load(cache_path, mmap_mode='r')
+
+
+def _evaluate(task: Tuple[int, Dict[str, Any], int]) -> Tuple[int, int, float, float]:
+    """entreno un candidato en un fold y retorno (candidato, fold, accuracy, segundos)"""
+    candidate, params, fold = task
+    X, y = _fold_data['X'], _fold_data['y']
+    train_idx, test_idx = _fold_data['folds'][fold]
+
+    start = time.perf_counter()
+    model = build_model(params)
+    model.fit(X[train_idx], y[train_idx])
+    score = accuracy_score(y[test_idx], model.predict(X[test_idx]))
+    return candidate, fold, float(score), time.perf_counter() - start
+
+
+def expand_grid(param_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+
+
+def search(X: np.ndarray,
+           y: np.ndarray,
+           param_grid: Optional[Dict[str, List[Any]]] = None,
+           cv: int = 3,
+           n_jobs: Optional[int] = None,
+           keep_ratio: float = 0.5) -> Dict[str, Any]:
+    """
+    retorno el mejor candidato y la tabla de resultados
+    keep_ratio es la fracción de candidatos que pasa al fold siguiente
+    """
+    candidates = expand_grid(param_grid or DEFAULT_PARAM_GRID)
+
+    # con clases chicas no puedo tener más folds que ejemplos de la clase menor
+    class_counts = np.bincount(y)
+    cv = max(2, min(cv, int(class_counts[class_counts > 0].min())))
+    folds = list(StratifiedKFold(n_splits=cv, shuffle=True, random_state=42).split(X, y))
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    cache_dir = tempfile.mkdtemp(prefix="quality_search_")
+    cache_path = os.path.join(cache_dir, "folds.joblib")
+    joblib.dump({'X': np.ascontiguousarray(X, dtype=float), 'y': np.asarray(y), 'folds': folds}, cache_path)
+
+    scores: Dict[int, List[float]] = {i: [] for i in range(len(candidates))}
+    fit_seconds: Dict[int, float] = {i: 0.0 for i in range(len(candidates))}
+    alive = list(range(len(candidates)))
+    start = time.perf_counter()
+
+    executor = None
+    try:
+        if n_jobs > 1:
+            executor = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(cache_path,))
+            run = executor.map
+        else:
+            _init_worker(cache_path)
+            run = map
+
+        for fold in range(cv):
+            tasks = [(i, candidates[i], fold) for i in alive]
+            for candidate, _, score, seconds in run(_evaluate, tasks):
+                scores[candidate].append(score)
+                fit_seconds[candidate] += seconds
+
+            if fold < cv - 1:
+                # corte temprano: sigo solo con los mejores según el promedio hasta acá
+                keep = max(1, math.ceil(len(alive) * keep_ratio))
+                alive = sorted(alive, key=lambda i: np.mean(scores[i]), reverse=True)[:keep]
+                logger.info(f"fold {fold + 1}/{cv}: sigo con {len(alive)} de {len(candidates)} candidatos")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    results = [
+        {
+            'params': candidates[i],
+            'mean_accuracy': float(np.mean(scores[i])),
+            'folds_evaluated': len(scores[i]),
+            'fit_seconds': fit_seconds[i],
+        }
+        for i in range(len(candidates))
+    ]
+    # el mejor sale de los que completaron todos los folds
+    best = max(alive, key=lambda i: np.mean(scores[i]))
+    results.sort(key=lambda r: (r['folds_evaluated'], r['mean_accuracy']), reverse=True)
+
+    return {
+        'best_params': candidates[best],
+        'best_cv_accuracy': float(np.mean(scores[best])),
+        'cv_folds': cv,
+        'candidates': len(candidates),
+        'fold_fits': sum(len(s) for s in scores.values()),
+        'search_seconds': time.perf_counter() - start,
+        'n_jobs': n_jobs,
+        'results': results,
+    }
@@ -1,7 +1,8 @@
+import time
 import logging
 import joblib
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
@@ -9,53 +10,71 @@ import pandas as pd
 from pathlib import Path
 
 from .quality_metrics import QualityMetrics
+from .feature_store import FeatureStore
+from . import model_search
+
+try:
+    from storage.model_registry import MODEL_REGISTRY
+except ImportError:
+    from src.storage.model_registry import MODEL_REGISTRY
 
 class QualityClassifier:
     """clasificador de calidad de documentos usando random forest"""
     
-    def __init__(self, model_path: str = "data/models/quality_classifier.joblib"):
+    def __init__(self, model_path: str = "data/models/quality_classifier.joblib",
+                 feature_store: Optional[FeatureStore] = None):
         self.logger = logging.getLogger(__name__)
         self.model_path = Path(model_path)
         self.model_path.parent.mkdir(parents=True, exist_ok=True)
         
         self.metrics_extractor = QualityMetrics()
+        self.feature_store = feature_store or FeatureStore(metrics=self.metrics_extractor)
         self.model = None
         self.feature_names = None
-        self.is_trained = False
-        
-        # intento cargar modelo existente
+        self.training_report = None
+        self._trained = False
+        # versión del archivo que tengo en memoria; el modelo se carga de forma diferida
+        self._artifact_version = None
+    
+    @property
+    def is_trained(self) -> bool:
+        """el modelo guardado lo tomo del registro compartido recién cuando hace falta"""
         self._load_model()
+        return self._trained
+    
+    @is_trained.setter
+    def is_trained(self, value: bool):
+        self._trained = value
     
     def _load_model(self):
-        """cargo modelo pre-entrenado si existe"""
+        """tomo el modelo pre-entrenado del registro si existe o cambió en disco"""
+        artifact = MODEL_REGISTRY.get(self.model_path)
+        if artifact is None or artifact.version == self._artifact_version:
+            return
+        self._artifact_version = artifact.version
         try:
-            if self.model_path.exists():
-                saved_data = joblib.load(self.model_path)
-                self.model = saved_data['model']
-                self.feature_names = saved_data['feature_names']
-                self.is_trained = True
-                self.logger.info("modelo de calidad cargado exitosamente")
+            saved_data = artifact.data
+            self.model = saved_data['model']
+            self.feature_names = saved_data['feature_names']
+            self.training_report = saved_data.get('training_report')
+            self._trained = True
+            self.logger.info("modelo de calidad cargado exitosamente")
         except Exception as e:
             self.logger.warning(f"no se pudo cargar modelo existente: {e}")
     
-    def prepare_training_data(self, documents: List) -> Tuple[np.ndarray, np.ndarray]:
+    def prepare_training_data(self, documents: List,
+                              features: Optional[pd.DataFrame] = None) -> Tuple[np.ndarray, np.ndarray]:
         """preparo datos de entrenamiento con etiquetas automáticas"""
-        features_list = []
-        labels = []
-        
         self.logger.info(f"preparando datos de entrenamiento para {len(documents)} documentos")
         
-        for doc in documents:
-            # extraigo features
-            features = self.metrics_extractor.extract_features(doc)
-            features_list.append(features)
-            
-            # creo etiquetas automáticas basadas en heurísticas
-            label = self._create_automatic_label(features, doc)
-            labels.append(label)
-        
-        # convierto a dataframe para manejo más fácil
-        df = pd.DataFrame(features_list)
+        # leo las features del feature store (o reutilizo las que me pasan)
+        df = features if features is not None else self.feature_store.get_features(documents)
+        
+        # creo etiquetas automáticas basadas en heurísticas
+        labels = [
+            self._create_automatic_label(row, doc)
+            for row, doc in zip(df.to_dict('records'), documents)
+        ]
 
 # me quedo solo con columnas numéricas
         df = df.select_dtypes(include=[np.number])
@@ -110,10 +129,8 @@ class QualityClassifier:
         else:
             return 0  # baja calidad
     
-    def train(self, documents: List, test_size: float = 0.2) -> Dict[str, Any]:
-        """entreno el clasificador"""
-        self.logger.info("iniciando entrenamiento del clasificador de calidad")
-        
+    def _split_dataset(self, documents: List, test_size: float) -> Tuple[np.ndarray, ...]:
+        """preparo features y etiquetas y separo train/test"""
         # preparo datos
         X, y = self.prepare_training_data(documents)
         
@@ -127,9 +144,13 @@ class QualityClassifier:
             y = np.where(y == 2, 1, y)
         
         # divido en train/test
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=42, stratify=y
-        )
+        return train_test_split(X, y, test_size=test_size, random_state=42, stratify=y)
+    
+    def train(self, documents: List, test_size: float = 0.2) -> Dict[str, Any]:
+        """entreno el clasificador"""
+        self.logger.info("iniciando entrenamiento del clasificador de calidad")
+        
+        X_train, X_test, y_train, y_test = self._split_dataset(documents, test_size)
 
         # creo y entreno modelo
         self.model = RandomForestClassifier(
@@ -147,6 +168,7 @@ class QualityClassifier:
         self.logger.info(f"accuracy en test: {accuracy:.3f}")
         
         # guardo modelo
+        self.training_report = {'mode': 'fixed', 'test_accuracy': float(accuracy)}
         self._save_model()
         self.is_trained = True
         
@@ -164,14 +186,81 @@ class QualityClassifier:
         
         return report
     
+    def train_with_search(self,
+                          documents: List,
+                          test_size: float = 0.2,
+                          param_grid: Optional[Dict[str, List[Any]]] = None,
+                          cv: int = 3,
+                          n_jobs: Optional[int] = None) -> Dict[str, Any]:
+        """
+        entreno con búsqueda de hiperparámetros por validación cruzada en un pool de procesos
+        el mejor candidato se reentrena con todo el train, se evalúa en test y se guarda
+        junto con el reporte de tiempos y accuracy
+        """
+        self.logger.info("iniciando búsqueda de hiperparámetros del clasificador de calidad")
+        start = time.perf_counter()
+        
+        X_train, X_test, y_train, y_test = self._split_dataset(documents, test_size)
+        
+        search_report = model_search.search(X_train, y_train, param_grid=param_grid, cv=cv, n_jobs=n_jobs)
+        self.logger.info(
+            f"mejores parámetros: {search_report['best_params']} "
+            f"(cv accuracy {search_report['best_cv_accuracy']:.3f}, "
+            f"{search_report['fold_fits']} entrenamientos en {search_report['search_seconds']:.1f}s)"
+        )
+        
+        # el modelo final sí puede usar todos los núcleos
+        fit_start = time.perf_counter()
+        self.model = model_search.build_model(search_report['best_params'], n_jobs=n_jobs or -1)
+        self.model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - fit_start
+        # el paralelismo es solo para entrenar: predecir un documento con n_jobs=-1 arma un pool por llamada
+        self.model.set_params(n_jobs=1)
+        
+        y_pred = self.model.predict(X_test)
+        accuracy = accuracy_score(y_test, y_pred)
+        self.logger.info(f"accuracy en test: {accuracy:.3f}")
+        
+        self.training_report = {
+            'mode': 'search',
+            'test_accuracy': float(accuracy),
+            'best_params': search_report['best_params'],
+            'best_cv_accuracy': search_report['best_cv_accuracy'],
+            'cv_folds': search_report['cv_folds'],
+            'candidates': search_report['candidates'],
+            'fold_fits': search_report['fold_fits'],
+            'search_seconds': search_report['search_seconds'],
+            'final_fit_seconds': fit_seconds,
+            'total_seconds': time.perf_counter() - start,
+            'n_jobs': search_report['n_jobs'],
+            'results': search_report['results'],
+        }
+        self._save_model()
+        self.is_trained = True
+        
+        return {
+            'accuracy': accuracy,
+            'classification_report': classification_report(y_test, y_pred),
+            'feature_importance': dict(zip(self.feature_names, self.model.feature_importances_)),
+            'training_samples': len(X_train),
+            'test_samples': len(X_test),
+            'search': self.training_report
+        }
+    
     def _save_model(self):
         """guardo modelo entrenado"""
+        # si el guardado falla, el archivo viejo no puede reemplazar al modelo recién entrenado:
+        # doy por cargada la versión que hay en disco
+        self._artifact_version = MODEL_REGISTRY.version(self.model_path)
         try:
             save_data = {
                 'model': self.model,
-                'feature_names': self.feature_names
+                'feature_names': self.feature_names,
+                'training_report': self.training_report
             }
             joblib.dump(save_data, self.model_path)
+            # lo que tengo en memoria ya es esta versión, no hace falta releerla
+            self._artifact_version = MODEL_REGISTRY.version(self.model_path)
             self.logger.info(f"modelo guardado en {self.model_path}")
         except Exception as e:
             self.logger.error(f"error guardando modelo: {e}")
@@ -187,9 +276,9 @@ class QualityClassifier:
         # convierto a array
         feature_array = np.array([[features[name] for name in self.feature_names]])
         
-        # predigo
-        prediction = self.model.predict(feature_array)[0]
+        # predigo (predict es el argmax de predict_proba, así recorro el bosque una sola vez)
         probabilities = self.model.predict_proba(feature_array)[0]
+        prediction = self.model.classes_[np.argmax(probabilities)]
         
         # calculo score numérico también
         quality_score = self.metrics_extractor.calculate_quality_score(features)
@@ -205,6 +294,42 @@ class QualityClassifier:
             }
         }
     
+    def predict_quality_batch(self, documents: List,
+                              features: Optional[pd.DataFrame] = None) -> List[Dict[str, Any]]:
+        """
+        predigo la calidad de muchos documentos con una sola llamada al modelo
+        los scores y las confianzas también los calculo vectorizados sobre toda la matriz
+        """
+        if not self.is_trained:
+            return [{'quality_class': 1, 'confidence': 0.5, 'quality_score': 50} for _ in documents]
+        if not documents:
+            return []
+        
+        df = features if features is not None else self.feature_store.get_features(documents)
+        
+        feature_array = df[self.feature_names].to_numpy(dtype=float)
+        probabilities = self.model.predict_proba(feature_array)
+        predictions = self.model.classes_[np.argmax(probabilities, axis=1)]
+        confidences = probabilities.max(axis=1)
+        quality_scores = self.metrics_extractor.calculate_quality_scores(df)
+        
+        # convierto a tipos de python en bloque (tolist) en vez de elemento por elemento
+        high = probabilities[:, 2] if probabilities.shape[1] > 2 else np.zeros(len(probabilities))
+        columns = zip(
+            predictions.astype(int).tolist(), confidences.tolist(), quality_scores.tolist(),
+            probabilities[:, 0].tolist(), probabilities[:, 1].tolist(), high.tolist()
+        )
+        
+        return [
+            {
+                'quality_class': prediction,
+                'confidence': confidence,
+                'quality_score': score,
+                'class_probabilities': {'low': low, 'medium': medium, 'high': high_proba}
+            }
+            for prediction, confidence, score, low, medium, high_proba in columns
+        ]
+    
     def get_feature_importance(self) -> Dict[str, float]:
         """obtengo importancia de features"""
         if not self.is_trained:
@@ -1,8 +1,45 @@
+import os
 import re
 import logging
-from typing import Dict, Any, List
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import numpy as np
+import pandas as pd
+
+try:
+    from filters.keyword_matcher import KeywordMatcher
+except ImportError:
+    from src.filters.keyword_matcher import KeywordMatcher
+
+# features numéricas en el orden en que las retorna extract_features
+NUMERIC_FEATURES = [
+    'content_length', 'title_length', 'word_count', 'paragraph_count',
+    'has_headers', 'has_lists', 'code_blocks', 'code_inline',
+    'quality_keywords', 'low_quality_indicators', 'technical_terms', 'external_links',
+    'avg_sentence_length', 'readability_score',
+    'java_keywords', 'spring_keywords', 'source_reliability'
+]
+
+# subo esta versión cada vez que cambie cómo se calcula alguna feature (invalida el feature store)
+FEATURE_SCHEMA_VERSION = 1
+
+# a partir de este tamaño de corpus conviene pagar el arranque del pool de procesos
+MIN_PARALLEL_DOCUMENTS = 256
+
+# solo los campos que usa extract_features, así mando menos datos a cada proceso
+_DocumentFields = namedtuple('_DocumentFields', ['title', 'content', 'file_path', 'doc_type'])
+
+_worker_metrics = None
+
+
+def _extract_chunk(chunk: List[_DocumentFields]) -> List[Dict[str, Any]]:
+    """extraigo features de un lote dentro de un proceso del pool"""
+    global _worker_metrics
+    if _worker_metrics is None:
+        _worker_metrics = QualityMetrics()
+    return [_worker_metrics.extract_features(doc) for doc in chunk]
 
 class QualityMetrics:
     """extractor de features para evaluación de calidad de documentos"""
@@ -32,12 +69,45 @@ class QualityMetrics:
             'todo', 'fixme', 'hack', 'temporary', 'placeholder',
             'coming soon', 'under construction', 'work in progress'
         ]
+        
+        # términos técnicos y keywords de java/spring
+        self.tech_terms = [
+            'api', 'rest', 'http', 'json', 'xml', 'database', 'sql',
+            'framework', 'library', 'dependency', 'configuration',
+            'annotation', 'interface', 'abstract', 'inheritance'
+        ]
+        self.java_keywords = [
+            'java', 'class', 'interface', 'extends', 'implements',
+            'public', 'private', 'protected', 'static', 'final',
+            'abstract', 'synchronized', 'package', 'import'
+        ]
+        self.spring_keywords = [
+            'spring', 'boot', 'mvc', 'rest', 'controller', 'service',
+            'repository', 'component', 'autowired', 'bean', 'configuration'
+        ]
+        
+        # un solo matcher para todas las familias: las keywords compartidas se buscan una vez
+        self.keyword_matcher = KeywordMatcher({
+            'quality_keywords': self.quality_keywords,
+            'low_quality_indicators': self.low_quality_indicators,
+            'technical_terms': self.tech_terms,
+            'java_keywords': self.java_keywords,
+            'spring_keywords': self.spring_keywords,
+        })
     
     def extract_features(self, document) -> Dict[str, Any]:
         """extraigo todas las features de calidad de un documento"""
         content = document.content.lower()
         title = document.title.lower()
         
+        # cuento todas las familias de keywords: calidad sobre contenido + título, el resto sobre contenido
+        text_counts = self.keyword_matcher.count(
+            content + ' ' + title, ('quality_keywords', 'low_quality_indicators')
+        )
+        content_counts = self.keyword_matcher.count(
+            content, ('technical_terms', 'java_keywords', 'spring_keywords')
+        )
+        
         features = {
             # features básicas
             'content_length': len(document.content),
@@ -52,9 +122,9 @@ class QualityMetrics:
             'code_inline': self._count_inline_code(document.content),
             
             # features de contenido
-            'quality_keywords': self._count_quality_keywords(content + ' ' + title),
-            'low_quality_indicators': self._count_low_quality_indicators(content + ' ' + title),
-            'technical_terms': self._count_technical_terms(content),
+            'quality_keywords': text_counts['quality_keywords'],
+            'low_quality_indicators': text_counts['low_quality_indicators'],
+            'technical_terms': content_counts['technical_terms'],
             'external_links': self._count_external_links(document.content),
             
             # features de legibilidad
@@ -62,8 +132,8 @@ class QualityMetrics:
             'readability_score': self._simple_readability_score(document.content),
             
             # features específicas de java/spring
-            'java_keywords': self._count_java_keywords(content),
-            'spring_keywords': self._count_spring_keywords(content),
+            'java_keywords': content_counts['java_keywords'],
+            'spring_keywords': content_counts['spring_keywords'],
             
             # features de metadatos
             'file_type': document.doc_type,
@@ -72,6 +142,35 @@ class QualityMetrics:
         
         return features
     
+    def extract_features_batch(self,
+                               documents: List,
+                               n_jobs: Optional[int] = None,
+                               chunk_size: int = 64) -> pd.DataFrame:
+        """
+        extraigo las features de todo el corpus en una sola pasada
+        retorno un dataframe (una fila por documento, en el mismo orden)
+        con corpus grandes reparto los documentos en un pool de procesos
+        """
+        if not documents:
+            return pd.DataFrame(columns=NUMERIC_FEATURES + ['file_type'])
+        
+        n_jobs = n_jobs or os.cpu_count() or 1
+        fields = [
+            _DocumentFields(doc.title, doc.content, doc.file_path, doc.doc_type)
+            for doc in documents
+        ]
+        
+        if n_jobs == 1 or len(fields) < MIN_PARALLEL_DOCUMENTS:
+            rows = [self.extract_features(doc) for doc in fields]
+        else:
+            chunks = [fields[i:i + chunk_size] for i in range(0, len(fields), chunk_size)]
+            self.logger.info(f"extrayendo features de {len(fields)} documentos con {n_jobs} procesos")
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                # map conserva el orden de los lotes
+                rows = [row for chunk_rows in executor.map(_extract_chunk, chunks) for row in chunk_rows]
+        
+        return pd.DataFrame(rows)
+    
     def _count_headers(self, content: str) -> int:
         """cuento headers markdown"""
         return len(re.findall(r'^#{1,6}\s+.+$', content, re.MULTILINE))
@@ -92,20 +191,15 @@ class QualityMetrics:
     
     def _count_quality_keywords(self, text: str) -> int:
         """cuento palabras clave de calidad"""
-        return sum(1 for keyword in self.quality_keywords if keyword in text)
+        return self.keyword_matcher.count(text, ('quality_keywords',))['quality_keywords']
     
     def _count_low_quality_indicators(self, text: str) -> int:
         """cuento indicadores de baja calidad"""
-        return sum(1 for indicator in self.low_quality_indicators if indicator in text)
+        return self.keyword_matcher.count(text, ('low_quality_indicators',))['low_quality_indicators']
     
     def _count_technical_terms(self, content: str) -> int:
         """cuento términos técnicos"""
-        tech_terms = [
-            'api', 'rest', 'http', 'json', 'xml', 'database', 'sql',
-            'framework', 'library', 'dependency', 'configuration',
-            'annotation', 'interface', 'abstract', 'inheritance'
-        ]
-        return sum(1 for term in tech_terms if term in content)
+        return self.keyword_matcher.count(content, ('technical_terms',))['technical_terms']
     
     def _count_external_links(self, content: str) -> int:
         """cuento enlaces externos"""
@@ -135,20 +229,11 @@ class QualityMetrics:
     
     def _count_java_keywords(self, content: str) -> int:
         """cuento keywords específicas de java"""
-        java_keywords = [
-            'java', 'class', 'interface', 'extends', 'implements',
-            'public', 'private', 'protected', 'static', 'final',
-            'abstract', 'synchronized', 'package', 'import'
-        ]
-        return sum(1 for keyword in java_keywords if keyword in content)
+        return self.keyword_matcher.count(content, ('java_keywords',))['java_keywords']
     
     def _count_spring_keywords(self, content: str) -> int:
         """cuento keywords específicas de spring"""
-        spring_keywords = [
-            'spring', 'boot', 'mvc', 'rest', 'controller', 'service',
-            'repository', 'component', 'autowired', 'bean', 'configuration'
-        ]
-        return sum(1 for keyword in spring_keywords if keyword in content)
+        return self.keyword_matcher.count(content, ('spring_keywords',))['spring_keywords']
     
     def _assess_source_reliability(self, file_path: str) -> float:
         """evalúo confiabilidad de la fuente (0-1)"""
@@ -202,6 +287,27 @@ class QualityMetrics:
         score += features['source_reliability'] * 15
         
         return max(0, min(100, score))
+    
+    def calculate_quality_scores(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        misma fórmula que calculate_quality_score pero sobre todas las filas a la vez
+        (features es el dataframe de extract_features_batch)
+        """
+        f = {name: features[name].to_numpy(dtype=float) for name in NUMERIC_FEATURES}
+        length = f['content_length']
+        
+        score = np.select([length > 1000, length > 500, length > 200], [25, 15, 10], 0).astype(float)
+        score += np.where(f['has_headers'] > 0, 8, 0)
+        score += np.where(f['has_lists'] > 0, 6, 0)
+        score += np.where(f['code_blocks'] > 0, 6, 0)
+        score += np.minimum(10, f['technical_terms'] * 2)
+        score += np.minimum(10, f['java_keywords'] + f['spring_keywords'])
+        score += np.minimum(10, f['quality_keywords'] * 2)
+        score -= f['low_quality_indicators'] * 3
+        score += np.minimum(10, f['readability_score'] / 10)
+        score += f['source_reliability'] * 15
+        
+        return np.clip(score, 0, 100)
 
 # test de las métricas
 if __name__ == "__main__":
@@ -0,0 +1,360 @@
+"""
+detección de anomalías en modo streaming para la ingesta continua
+califico cada lote contra el modelo persistido, sigo online la deriva de las features
+respecto del entrenamiento y reentreno en segundo plano solo cuando la deriva supera un umbral
+"""
+
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .anomaly_detector import AnomalyDetector
+
+
+class FeatureDriftMonitor:
+    """
+    media y varianza online por feature (welford, combinando lotes con la fórmula de chan)
+    la deriva es el corrimiento de la media medido en desvíos estándar del entrenamiento
+    """
+
+    def __init__(self, reference_mean: np.ndarray, reference_std: np.ndarray):
+        self.reference_mean = np.asarray(reference_mean, dtype=float)
+        # las features constantes en el entrenamiento no dividen por cero
+        self.reference_std = np.where(np.asarray(reference_std, dtype=float) > 0, reference_std, 1.0)
+        self.count = 0
+        self.mean = np.zeros_like(self.reference_mean)
+        self.m2 = np.zeros_like(self.reference_mean)
+        self.anomalies = 0
+
+    def update(self, X: np.ndarray, n_anomalies: int = 0):
+        n = len(X)
+        if n == 0:
+            return
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.anomalies += n_anomalies
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.m2 / self.count) if self.count else np.zeros_like(self.mean)
+
+    def feature_shift(self) -> np.ndarray:
+        return np.abs(self.mean - self.reference_mean) / self.reference_std
+
+    def drift_score(self) -> float:
+        """el peor corrimiento entre todas las features (0 si todavía no vi nada)"""
+        return float(self.feature_shift().max()) if self.count else 0.0
+
+    @property
+    def anomaly_rate(self) -> float:
+        return self.anomalies / self.count if self.count else 0.0
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {'count': np.array(self.count), 'mean': self.mean, 'm2': self.m2,
+                'anomalies': np.array(self.anomalies)}
+
+    def restore(self, state: Dict[str, np.ndarray]):
+        self.count = int(state['count'])
+        self.mean = np.asarray(state['mean'], dtype=float)
+        self.m2 = np.asarray(state['m2'], dtype=float)
+        self.anomalies = int(state['anomalies'])
+
+
+class ReservoirSample:
+    """
+    muestra uniforme de tamaño fijo de todas las filas vistas (algoritmo R), para reentrenar
+    junto a cada fila guardo si el modelo de ese momento la marcó como anomalía
+    """
+
+    def __init__(self, capacity: int, n_features: int, seed: int = 42):
+        self.capacity = capacity
+        self.rows = np.empty((0, n_features))
+        self.flags = np.zeros(0, dtype=bool)
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, X: np.ndarray, flags: Optional[np.ndarray] = None):
+        flags = np.zeros(len(X), dtype=bool) if flags is None else np.asarray(flags, dtype=bool)
+        free = max(0, self.capacity - len(self.rows))
+        if free:
+            self.rows = np.vstack([self.rows, X[:free]])
+            self.flags = np.concatenate([self.flags, flags[:free]])
+            self.seen += min(free, len(X))
+            X, flags = X[free:], flags[free:]
+        if len(X) == 0:
+            return
+
+        # cada fila nueva reemplaza a una existente con probabilidad capacity / vistas
+        positions = self._rng.integers(0, self.seen + np.arange(1, len(X) + 1))
+        self.seen += len(X)
+        keep = positions < self.capacity
+        # si dos filas caen en el mismo lugar gana la última, igual que en la versión secuencial
+        self.rows[positions[keep]] = X[keep]
+        self.flags[positions[keep]] = flags[keep]
+
+    def clear(self):
+        self.rows = self.rows[:0]
+        self.flags = self.flags[:0]
+        self.seen = 0
+
+
+class StreamingAnomalyDetector:
+    """
+    score_batch() califica documentos con el modelo guardado (nunca entrena en el camino)
+    el estado del streaming (estadísticas y muestras) se guarda al lado del modelo
+    reference es una muestra de la matriz con la que se entrenó el modelo actual: el
+    reentrenamiento siempre la mezcla con lo nuevo, así nunca aprende solo de documentos raros
+    """
+
+    def __init__(self,
+                 detector: Optional[AnomalyDetector] = None,
+                 drift_threshold: float = 0.5,
+                 min_samples: int = 200,
+                 max_anomaly_rate: Optional[float] = None,
+                 reservoir_size: int = 5000,
+                 min_reference_share: float = 0.5,
+                 background: bool = True):
+        if not 0 < min_reference_share < 1:
+            raise ValueError("min_reference_share tiene que estar entre 0 y 1")
+        self.logger = logging.getLogger(__name__)
+        self.detector = detector or AnomalyDetector()
+        self.drift_threshold = drift_threshold
+        self.min_samples = min_samples
+        # si no me lo dan, una tasa de anomalías de 3x la contaminación también indica un modelo viejo
+        self.max_anomaly_rate = max_anomaly_rate
+        self.reservoir_size = reservoir_size
+        # fracción mínima de filas de antes de la deriva en cada reentrenamiento
+        self.min_reference_share = min_reference_share
+        self.background = background
+        self.state_path = Path(f"{self.detector.model_path}.stream.npz")
+
+        self._lock = threading.Lock()
+        self._refit_thread: Optional[threading.Thread] = None
+        self.refits = 0
+        n_features = len(AnomalyDetector.FEATURE_COLUMNS)
+        self.monitor: Optional[FeatureDriftMonitor] = None
+        # versión del artefacto contra la que mido la deriva
+        self._monitor_version = None
+        self.reservoir = ReservoirSample(reservoir_size, n_features)
+        self.reference = np.empty((0, n_features))
+
+        if self.detector.is_trained:
+            with self._lock:
+                self._ensure_monitor()
+
+    @property
+    def is_trained(self) -> bool:
+        return self.detector.is_trained
+
+    def _reset_monitor(self):
+        self.monitor = FeatureDriftMonitor(self.detector.scaler.mean_, self.detector.scaler.scale_)
+        self._monitor_version = self.detector._artifact_version
+
+    def _ensure_monitor(self):
+        """
+        armo el monitor cuando aparece un modelo (se carga de forma diferida) y lo vuelvo
+        a armar si cambió el artefacto en disco; se llama con el lock tomado
+        """
+        if self.monitor is not None and self._monitor_version == self.detector._artifact_version:
+            return
+        first = self.monitor is None
+        self._reset_monitor()
+        if first:
+            self._load_state()
+        else:
+            self.logger.info("el modelo de anomalías cambió en disco: reinicio la deriva")
+        if first and len(self.reference):
+            return
+        self._seed_reference()
+
+    def _seed_reference(self):
+        """la referencia sale del feature store, que tiene las features del entrenamiento"""
+        try:
+            df = self.detector.feature_store.sample(self.reservoir_size)
+            self.reference = df[AnomalyDetector.FEATURE_COLUMNS].to_numpy(dtype=float)
+        except Exception as e:
+            self.logger.warning(f"no pude leer la referencia del feature store: {e}")
+
+    def _version_array(self) -> np.ndarray:
+        version = self._monitor_version
+        return np.array(version if version is not None else (-1, -1), dtype=np.int64)
+
+    def _load_state(self):
+        if not self.state_path.exists():
+            return
+        try:
+            with np.load(self.state_path) as state:
+                if state['mean'].shape != self.monitor.mean.shape:
+                    return
+                # las estadísticas solo valen contra el mismo artefacto
+                if 'model_version' in state.files and np.array_equal(state['model_version'], self._version_array()):
+                    self.monitor.restore(state)
+                self.reservoir.rows = state['reservoir']
+                self.reservoir.seen = int(state['reservoir_seen'])
+                self.reservoir.flags = (state['reservoir_flags'] if 'reservoir_flags' in state.files
+                                        else np.zeros(len(self.reservoir.rows), dtype=bool))
+                if 'reference' in state.files:
+                    self.reference = state['reference']
+        except (OSError, KeyError, ValueError) as e:
+            self.logger.warning(f"no pude leer el estado del streaming: {e}")
+
+    def _save_state(self):
+        tmp_path = self.state_path.with_suffix('.tmp.npz')
+        try:
+            np.savez(tmp_path, reservoir=self.reservoir.rows, reservoir_flags=self.reservoir.flags,
+                     reservoir_seen=np.array(self.reservoir.seen), reference=self.reference,
+                     model_version=self._version_array(), **self.monitor.state())
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            self.logger.warning(f"no pude guardar el estado del streaming: {e}")
+
+    def score_batch(self, documents: List, features: Optional[pd.DataFrame] = None) -> List[Dict[str, Any]]:
+        """califico un lote nuevo (resultados en el mismo orden) y actualizo la deriva"""
+        if not self.detector.is_trained:
+            raise RuntimeError("el detector no está entrenado; ejecuta scripts/train_quality_models.py")
+        if not documents:
+            return []
+
+        X = self.detector.prepare_features(documents, features).astype(float)
+
+        with self._lock:
+            self._ensure_monitor()
+            scores = self.detector.score_matrix(X)
+            is_anomaly = scores < 0
+            self.monitor.update(X, int(is_anomaly.sum()))
+            self.reservoir.add(X, is_anomaly)
+            self._save_state()
+            reason = self._refit_reason()
+
+        if reason:
+            self._start_refit(reason)
+
+        confidences = (1 / (1 + np.exp(-np.abs(scores)))).tolist()
+        return [
+            {
+                'document_id': doc.id,
+                'title': doc.title,
+                'is_anomaly': anomaly,
+                'anomaly_score': score,
+                'confidence': confidence,
+                'file_path': doc.file_path
+            }
+            for doc, anomaly, score, confidence in zip(documents, is_anomaly.tolist(), scores.tolist(), confidences)
+        ]
+
+    # misma interfaz que AnomalyDetector, para usarlo en QualityAnnotator
+    detect_anomalies = score_batch
+
+    def _refit_reason(self) -> Optional[str]:
+        """'drift', 'anomaly_rate' o None"""
+        if self.monitor.count < self.min_samples:
+            return None
+        if self._refit_thread is not None and self._refit_thread.is_alive():
+            return None
+        if self.monitor.drift_score() > self.drift_threshold:
+            return 'drift'
+        max_rate = self.max_anomaly_rate or 3 * self.detector.contamination
+        if self.monitor.anomaly_rate > max_rate:
+            return 'anomaly_rate'
+        return None
+
+    def _start_refit(self, reason: str):
+        self.logger.info(
+            f"deriva {self.monitor.drift_score():.2f} / tasa de anomalías {self.monitor.anomaly_rate:.1%}: "
+            f"reentreno ({reason}) con {len(self.reservoir.rows)} documentos nuevos"
+        )
+        if self.background:
+            self._refit_thread = threading.Thread(target=self._refit, args=(reason,), name="anomaly-refit", daemon=True)
+            self._refit_thread.start()
+        else:
+            self._refit(reason)
+
+    def _training_matrix(self, reference: np.ndarray, rows: np.ndarray) -> Optional[np.ndarray]:
+        """
+        mezclo la referencia con las filas nuevas respetando min_reference_share
+        si falta referencia recorto las filas nuevas; sin referencia no reentreno
+        """
+        if len(reference) == 0:
+            return None
+        rng = np.random.default_rng(self.refits)
+        share = self.min_reference_share
+        max_new = int(len(reference) * (1 - share) / share)
+        if len(rows) > max_new:
+            rows = rows[rng.choice(len(rows), max_new, replace=False)]
+        needed = int(np.ceil(len(rows) * share / (1 - share)))
+        if len(reference) > needed:
+            reference = reference[rng.choice(len(reference), needed, replace=False)]
+        return np.vstack([reference, rows])
+
+    def _refit(self, reason: str = 'drift'):
+        with self._lock:
+            rows = self.reservoir.rows.copy()
+            flags = self.reservoir.flags.copy()
+            reference = self.reference.copy()
+            contamination = self.detector.contamination
+        if reason != 'drift':
+            # sin deriva, las filas marcadas no son un cambio de distribución: no las aprendo como normales
+            rows = rows[~flags]
+
+        X = self._training_matrix(reference, rows)
+        if X is None:
+            self.logger.warning("sin muestra del entrenamiento no reentreno el detector")
+            return
+        if len(X) < 10:
+            return
+
+        try:
+            # el ajuste pesado va fuera del lock; los lotes se siguen calificando con el modelo anterior
+            components = AnomalyDetector.fit_components(X, contamination)
+        except Exception as e:
+            self.logger.error(f"falló el reentrenamiento del detector: {e}")
+            return
+
+        with self._lock:
+            self.detector.scaler, self.detector.pca, self.detector.model = components
+            self.detector.feature_names = list(AnomalyDetector.FEATURE_COLUMNS)
+            self.detector._save_model()
+            # la nueva referencia es la matriz del reentrenamiento; la muestra vuelve a empezar
+            if len(X) > self.reservoir_size:
+                X = X[np.random.default_rng(self.refits).choice(len(X), self.reservoir_size, replace=False)]
+            self.reference = X
+            self.reservoir.clear()
+            self._reset_monitor()
+            self._save_state()
+            self.refits += 1
+        self.logger.info("detector reentrenado y reemplazado")
+
+    def wait_for_refit(self, timeout: Optional[float] = None):
+        """espero un reentrenamiento en curso (útil en scripts que terminan después de ingestar)"""
+        thread = self._refit_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        if self.monitor is None:
+            return {'trained': False}
+        with self._lock:
+            shift = self.monitor.feature_shift()
+            return {
+                'trained': True,
+                'documents_seen': self.monitor.count,
+                'drift_score': self.monitor.drift_score(),
+                'anomaly_rate': self.monitor.anomaly_rate,
+                'refits': self.refits,
+                'reservoir_size': len(self.reservoir.rows),
+                'reference_size': len(self.reference),
+                'top_drifting_features': sorted(
+                    zip(AnomalyDetector.FEATURE_COLUMNS, shift.tolist()), key=lambda x: x[1], reverse=True
+                )[:5] if self.monitor.count else [],
+            }
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import numpy as np
 from dataclasses import dataclass
 
@@ -12,37 +12,93 @@ class SearchResult:
     similarity_score: float
     metadata: Dict[str, Any]
     file_path: str
+    rank_score: Optional[float] = None
+
+# función de ranking: (similaridades de los candidatos, sus metadatas) -> score final
+RankingFunction = Callable[[np.ndarray, List[Dict[str, Any]]], np.ndarray]
+
+class QualityRanker:
+    """
+    combino la similaridad coseno con la calidad guardada al ingestar (quality_score de 0 a 100)
+    y la confiabilidad de la fuente de QualityMetrics; los documentos anómalos pierden puntos
+    a los documentos sin calificar les asigno un valor neutro, así un corpus sin metadata
+    de calidad conserva el orden por similaridad
+    """
+    
+    def __init__(self,
+                 similarity_weight: float = 0.75,
+                 quality_weight: float = 0.15,
+                 reliability_weight: float = 0.10,
+                 anomaly_penalty: float = 0.10,
+                 neutral_value: float = 0.5):
+        self.similarity_weight = similarity_weight
+        self.quality_weight = quality_weight
+        self.reliability_weight = reliability_weight
+        self.anomaly_penalty = anomaly_penalty
+        self.neutral_value = neutral_value
+    
+    def _column(self, metadatas: List[Dict[str, Any]], key: str, scale: float = 1.0) -> np.ndarray:
+        values = np.array([m.get(key, np.nan) if m else np.nan for m in metadatas], dtype=float) / scale
+        return np.where(np.isnan(values), self.neutral_value, values)
+    
+    def __call__(self, similarities: np.ndarray, metadatas: List[Dict[str, Any]]) -> np.ndarray:
+        quality = self._column(metadatas, 'quality_score', scale=100.0)
+        reliability = self._column(metadatas, 'source_reliability')
+        anomalous = np.array([bool(m and m.get('is_anomaly', False)) for m in metadatas])
+        
+        return (self.similarity_weight * similarities
+                + self.quality_weight * quality
+                + self.reliability_weight * reliability
+                - self.anomaly_penalty * anomalous)
 
 class SemanticSearch:
     """motor de búsqueda semántica mejorado"""
     
-    def __init__(self, vector_store, embedding_engine):
+    def __init__(self, vector_store, embedding_engine,
+                 ranking: Optional[RankingFunction] = None,
+                 candidate_multiplier: int = 3):
         self.vector_store = vector_store
         self.embedding_engine = embedding_engine
         self.logger = logging.getLogger(__name__)
+        # pido más candidatos de los que retorno para que el ranking tenga de dónde elegir
+        self.ranking = ranking if ranking is not None else QualityRanker()
+        self.candidate_multiplier = max(1, candidate_multiplier)
     
-    def search(self, query: str, top_k: int = 10, min_similarity: float = 0.1) -> List[SearchResult]:
-        """búsqueda semántica con filtrado"""
+    def search(self, query: str, top_k: int = 10, min_similarity: float = 0.1,
+               min_quality_score: Optional[float] = None,
+               exclude_anomalies: bool = False) -> List[SearchResult]:
+        """
+        búsqueda semántica con filtrado
+        los filtros de calidad usan la metadata que se guarda al ingestar; los documentos
+        ingestados sin calificar no tienen esos campos y quedan fuera cuando filtro
+        """
         try:
             # genero el embedding del query
             query_embedding = self.embedding_engine.encode_query(query)
             
-            # busco en el vector store
-            raw_results = self.vector_store.search_similar(query_embedding, top_k=top_k)
+            # busco en el vector store (el filtro de calidad lo resuelve chromadb)
+            where = self._quality_filter(min_quality_score, exclude_anomalies)
+            raw_results = self.vector_store.search_similar(
+                query_embedding, top_k=top_k * self.candidate_multiplier, where=where
+            )
             
-            # filtro y estructuro los resultados
+            # filtro por similaridad y reordeno los candidatos con el ranking
+            candidates = [r for r in raw_results if r['similarity'] >= min_similarity]
+            ranked = self._rank(candidates)[:top_k]
+            
+            # estructuro los resultados
             search_results = []
-            for result in raw_results:
-                if result['similarity'] >= min_similarity:
-                    search_result = SearchResult(
-                        document_id=result['id'],
-                        title=result['metadata'].get('title', 'Unknown'),
-                        content_preview=self._create_preview(result['content_preview']),
-                        similarity_score=round(result['similarity'], 3),
-                        metadata=result['metadata'],
-                        file_path=result['metadata'].get('file_path', '')
-                    )
-                    search_results.append(search_result)
+            for result, rank_score in ranked:
+                search_result = SearchResult(
+                    document_id=result['id'],
+                    title=result['metadata'].get('title', 'Unknown'),
+                    content_preview=self._create_preview(result['content_preview']),
+                    similarity_score=round(result['similarity'], 3),
+                    metadata=result['metadata'],
+                    file_path=result['metadata'].get('file_path', ''),
+                    rank_score=round(rank_score, 3)
+                )
+                search_results.append(search_result)
             
             self.logger.info(f"Found {len(search_results)} results for query: '{query}'")
             return search_results
@@ -51,6 +107,28 @@ class SemanticSearch:
             self.logger.error(f"Error in semantic search: {e}")
             return []
     
+    def _rank(self, candidates: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], float]]:
+        """calculo el score de todos los candidatos en una pasada y los ordeno (orden estable)"""
+        if not candidates:
+            return []
+        similarities = np.array([r['similarity'] for r in candidates], dtype=float)
+        scores = np.asarray(self.ranking(similarities, [r['metadata'] for r in candidates]), dtype=float)
+        order = np.argsort(-scores, kind='stable')
+        return [(candidates[i], float(scores[i])) for i in order]
+    
+    @staticmethod
+    def _quality_filter(min_quality_score: Optional[float], exclude_anomalies: bool) -> Optional[Dict[str, Any]]:
+        """armo el where de chromadb para los filtros de calidad"""
+        conditions = []
+        if min_quality_score is not None:
+            conditions.append({'quality_score': {'$gte': min_quality_score}})
+        if exclude_anomalies:
+            conditions.append({'is_anomaly': {'$eq': False}})
+        
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+    
     def _create_preview(self, content: str, max_length: int = 200) -> str:
         """crear preview del contenido"""
         if len(content) <= max_length:
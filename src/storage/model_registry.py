@@ -0,0 +1,112 @@
+"""
+registro de artefactos de modelos (joblib), uno por proceso
+cargo cada archivo la primera vez que alguien lo necesita y solo lo vuelvo a leer cuando
+cambia la versión del archivo (mtime y tamaño); dentro del proceso todos usan la misma copia
+
+mmap_mode='r' solo mapea los arreglos de numpy que están sueltos en el artefacto (medias
+del scaler, componentes de pca, embeddings, coordenadas): esos quedan en el page cache y
+los comparten los procesos. los árboles de sklearn (RandomForest, IsolationForest) se
+reconstruyen al deserializar y copian sus nodos, así que cada proceso tiene su propia copia
+"""
+
+import os
+import sys
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import joblib
+
+try:
+    from monitoring.metrics import record_cache
+except ImportError:
+    from src.monitoring.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+ArtifactVersion = Tuple[int, int]
+
+
+class ModelArtifact(NamedTuple):
+    version: ArtifactVersion
+    data: Any
+
+
+class ModelRegistry:
+    """
+    get() retorna el artefacto cacheado mientras el archivo no cambie
+    los arreglos mapeados son de solo lectura: los modelos se reemplazan al entrenar, no se modifican
+    lo que se ahorra entre procesos son solo esos arreglos, no los árboles de los estimadores
+    """
+
+    def __init__(self, mmap_mode: Optional[str] = 'r'):
+        self.mmap_mode = mmap_mode
+        self._lock = threading.Lock()
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._artifacts: Dict[str, ModelArtifact] = {}
+
+    @staticmethod
+    def version(path) -> Optional[ArtifactVersion]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _path_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._path_locks.setdefault(key, threading.Lock())
+
+    def get(self, path) -> Optional[ModelArtifact]:
+        """artefacto del archivo, o None si no existe o no se pudo leer"""
+        key = str(Path(path).resolve())
+        version = self.version(key)
+        if version is None:
+            return None
+
+        cached = self._artifacts.get(key)
+        if cached is not None and cached.version == version:
+            record_cache("model_registry", True)
+            return cached
+
+        # un lock por archivo: dos hilos que piden el mismo modelo lo cargan una sola vez
+        with self._path_lock(key):
+            cached = self._artifacts.get(key)
+            if cached is not None and cached.version == version:
+                record_cache("model_registry", True)
+                return cached
+
+            record_cache("model_registry", False)
+            try:
+                data = joblib.load(key, mmap_mode=self.mmap_mode)
+            except Exception as e:
+                logger.warning(f"no se pudo cargar {key}: {e}")
+                return None
+
+            artifact = ModelArtifact(version, data)
+            self._artifacts[key] = artifact
+            logger.info(f"artefacto cargado: {key}")
+            return artifact
+
+    def invalidate(self, path=None):
+        """olvido un artefacto (o todos)"""
+        with self._lock:
+            if path is None:
+                self._artifacts.clear()
+            else:
+                self._artifacts.pop(str(Path(path).resolve()), None)
+
+
+def _shared_model_registry() -> ModelRegistry:
+    # igual que el registro de métricas: un solo registro aunque el módulo
+    # se importe como `storage.model_registry` y como `src.storage.model_registry`
+    for module_name in ('storage.model_registry', 'src.storage.model_registry'):
+        module = sys.modules.get(module_name)
+        registry = getattr(module, 'MODEL_REGISTRY', None) if module else None
+        if registry is not None:
+            return registry
+    return ModelRegistry()
+
+
+MODEL_REGISTRY = _shared_model_registry()
@@ -7,15 +7,21 @@ import numpy as np
 from pathlib import Path
 
 from ingestion.document_loader import Document
+from monitoring.metrics import STAGE_LATENCY
 
 class VectorStore:
     """almacenamiento vectorial usando chromadb"""
     
-    def __init__(self, db_path: str = "./data/vectordb"):
+    def __init__(self, db_path: str = "./data/vectordb", quality_annotator=None, corpus_stats=None):
         self.logger = logging.getLogger(__name__)
         self.db_path = Path(db_path)
         self.db_path.mkdir(parents=True, exist_ok=True)
         
+        # opcional: califico los documentos al agregarlos (quality.annotator.QualityAnnotator)
+        self.quality_annotator = quality_annotator
+        # opcional: mantengo las estadísticas del corpus al agregar y borrar (quality.corpus_stats.CorpusStats)
+        self.corpus_stats = corpus_stats
+        
         # acá inicializo chromadb
         self.client = None
         self.collection = None
@@ -50,6 +56,14 @@ class VectorStore:
             return
         
         try:
+            # acá califico en lote los documentos que voy a agregar
+            quality = {}
+            if self.quality_annotator is not None:
+                with STAGE_LATENCY.time(stage="quality_annotation"):
+                    quality = self.quality_annotator.annotate(
+                        [doc for doc in documents if doc.id in embeddings]
+                    )
+            
             # acá preparo los datos para chromadb
             ids = []
             embeddings_list = []
@@ -68,6 +82,7 @@ class VectorStore:
                         "doc_type": doc.doc_type,
                         "content_length": len(doc.content)
                     }
+                    metadata.update(quality.get(doc.id, {}))
                     metadatas.append(metadata)
                     
                     # acá recorto el contenido para guardarlo en chromadb
@@ -84,17 +99,27 @@ class VectorStore:
             
             self.logger.info(f"agregué {len(ids)} documentos al vector store")
             
+            if self.corpus_stats is not None:
+                self.corpus_stats.add_documents(doc for doc in documents if doc.id in embeddings)
+                self.corpus_stats.save()
+            
         except Exception as e:
             self.logger.error(f"error agregando documentos: {e}")
             raise
     
-    def search_similar(self, query_embedding: np.ndarray, top_k: int = 10) -> List[Dict[str, Any]]:
-        """acá busco documentos similares"""
+    def search_similar(self, query_embedding: np.ndarray, top_k: int = 10,
+                       where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """acá busco documentos similares (where filtra por metadata, p.ej. por calidad)"""
         try:
-            results = self.collection.query(
-                query_embeddings=[query_embedding.tolist()],
-                n_results=top_k
-            )
+            query_args = {}
+            if where:
+                query_args['where'] = where
+            with STAGE_LATENCY.time(stage="collection_query"):
+                results = self.collection.query(
+                    query_embeddings=[query_embedding.tolist()],
+                    n_results=top_k,
+                    **query_args
+                )
             
             # acá formateo los resultados
             similar_docs = []
@@ -136,6 +161,9 @@ class VectorStore:
             if results and 'ids' in results:
                 self.collection.delete(ids=results['ids'])
                 self.logger.info("eliminé todos los documentos del vector store")
+            if self.corpus_stats is not None:
+                self.corpus_stats.clear()
+                self.corpus_stats.save()
         except Exception as e:
             self.logger.error(f"error eliminando documentos: {e}")
     
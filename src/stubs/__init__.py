@@ -0,0 +1,3 @@
+from .fake_services import FakeGeminiServer, FakeStabilityServer, FakeServiceConfig
+
+__all__ = ['FakeGeminiServer', 'FakeStabilityServer', 'FakeServiceConfig']
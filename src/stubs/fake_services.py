@@ -0,0 +1,279 @@
+"""
+servidores locales que imitan las apis de gemini y stability ai
+los uso para medir latencia y throughput sin api keys ni red
+"""
+
+import base64
+import json
+import logging
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class FakeServiceConfig:
+    """comportamiento configurable de un servidor falso"""
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    # gemini: largo de la respuesta en caracteres
+    response_chars: int = 800
+    # stability: lado de la imagen (si es None uso el del request) y compresión png
+    image_size: Optional[int] = None
+    compress_level: int = 6
+
+
+def _build_png(width: int, height: int, compress_level: int = 6) -> bytes:
+    """
+    armo un png rgb tipo diagrama (fondo blanco, cajas y flechas grises)
+    solo con la librería estándar para no depender de pil en el servidor
+    """
+    box_w, box_h = max(width // 5, 1), max(height // 8, 1)
+    boxes = [
+        (width // 10, height // 6),
+        (width // 2 - box_w // 2, height // 6),
+        (width - width // 10 - box_w, height // 6),
+        (width // 2 - box_w // 2, height // 2),
+    ]
+
+    rows = []
+    for y in range(height):
+        row = bytearray(b'\xff' * (width * 3))
+        for bx, by in boxes:
+            if by <= y < by + box_h:
+                left, right = max(bx, 0), min(bx + box_w, width)
+                if y in (by, by + 1, by + box_h - 2, by + box_h - 1):
+                    row[left * 3:right * 3] = b'\x40' * ((right - left) * 3)
+                else:
+                    for x in (left, left + 1, right - 2, right - 1):
+                        if 0 <= x < width:
+                            row[x * 3:x * 3 + 3] = b'\x40\x40\x40'
+        # línea horizontal que une las cajas superiores
+        if y == height // 6 + box_h // 2:
+            row[(width // 10 + box_w) * 3:(width - width // 10 - box_w) * 3] = \
+                b'\x60' * (max(width - 2 * (width // 10 + box_w), 0) * 3)
+        rows.append(b'\x00' + bytes(row))
+
+    raw = b''.join(rows)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (struct.pack('>I', len(data)) + tag + data +
+                struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', ihdr) +
+            chunk(b'IDAT', zlib.compress(raw, compress_level)) + chunk(b'IEND', b''))
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    """handler base: aplico latencia y errores antes de responder"""
+
+    # lo asigna el servidor al crear la subclase
+    service = None
+
+    def log_message(self, format, *args):
+        self.service.logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        service = self.service
+        body = self._read_json()
+        service.simulate_latency()
+
+        if service.should_fail():
+            service.record(error=True)
+            self._send_json(service.config.error_status, {
+                'error': {'code': service.config.error_status, 'message': 'fallo simulado'}
+            })
+            return
+
+        status, payload = service.handle(self.path, body)
+        service.record(error=status != 200)
+        self._send_json(status, payload)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/health':
+            self._send_json(200, {'status': 'healthy', 'stats': self.service.get_stats()})
+        else:
+            self._send_json(404, {'error': {'code': 404, 'message': 'ruta no encontrada'}})
+
+
+class _FakeService:
+    """base común: servidor http en un hilo de fondo"""
+
+    name = "fake"
+
+    def __init__(self, config: Optional[FakeServiceConfig] = None,
+                 host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.config = config or FakeServiceConfig()
+        self.host = host
+        self.port = port
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self.stats = {'requests': 0, 'errors': 0}
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """levanto el servidor en segundo plano"""
+        handler = type(f"{type(self).__name__}Handler", (_FakeHandler,), {'service': self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self.logger.info(f"{self.name} falso escuchando en {self.url}")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def simulate_latency(self):
+        with self._lock:
+            jitter = self._random.uniform(-1, 1) * self.config.latency_jitter_ms
+        delay = max(self.config.latency_ms + jitter, 0) / 1000.0
+        if delay:
+            time.sleep(delay)
+
+    def should_fail(self) -> bool:
+        if self.config.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.config.error_rate
+
+    def record(self, error: bool = False):
+        with self._lock:
+            self.stats['requests'] += 1
+            if error:
+                self.stats['errors'] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def handle(self, path: str, body: Dict) -> Tuple[int, Dict]:
+        raise NotImplementedError
+
+
+class FakeGeminiServer(_FakeService):
+    """
+    imita POST /v1beta/models/{model}:generateContent (transporte rest)
+    para usarlo: GEMINI_API_ENDPOINT=<url> en el entorno del RAGEngine
+    """
+
+    name = "gemini"
+    _path = re.compile(r'^/v1(?:beta)?/models/(?P<model>[^:/]+):generateContent')
+
+    def handle(self, path: str, body: Dict) -> Tuple[int, Dict]:
+        match = self._path.match(path)
+        if not match:
+            return 404, {'error': {'code': 404, 'message': f'ruta no soportada: {path}'}}
+
+        prompt_chars = sum(
+            len(part.get('text', ''))
+            for content in body.get('contents', [])
+            for part in content.get('parts', [])
+        )
+        filler = "Spring Boot simplifica la configuración de aplicaciones Java. "
+        text = (filler * (self.config.response_chars // len(filler) + 1))[:self.config.response_chars]
+
+        return 200, {
+            'candidates': [{
+                'content': {'parts': [{'text': text}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0
+            }],
+            'usageMetadata': {
+                'promptTokenCount': prompt_chars // 4,
+                'candidatesTokenCount': len(text) // 4,
+                'totalTokenCount': (prompt_chars + len(text)) // 4
+            },
+            'modelVersion': match.group('model')
+        }
+
+
+class FakeStabilityServer(_FakeService):
+    """
+    imita POST /v1/generation/{engine}/text-to-image de stability ai
+    para usarlo: STABILITY_API_URL=<url>/v1/generation/<engine>/text-to-image
+    """
+
+    name = "stability"
+    _path = re.compile(r'^/v1/generation/(?P<engine>[^/]+)/text-to-image')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._png_cache = {}
+
+    def text_to_image_url(self, engine: str = "stable-diffusion-xl-1024-v1-0") -> str:
+        return f"{self.url}/v1/generation/{engine}/text-to-image"
+
+    def _get_png(self, width: int, height: int) -> bytes:
+        # el png es determinista, lo genero una vez por tamaño
+        key = (width, height, self.config.compress_level)
+        with self._lock:
+            if key not in self._png_cache:
+                self._png_cache[key] = _build_png(width, height, self.config.compress_level)
+            return self._png_cache[key]
+
+    def handle(self, path: str, body: Dict) -> Tuple[int, Dict]:
+        if not self._path.match(path):
+            return 404, {'name': 'not_found', 'message': f'ruta no soportada: {path}'}
+
+        if not body.get('text_prompts'):
+            return 400, {'name': 'bad_request', 'message': 'text_prompts es obligatorio'}
+
+        size = self.config.image_size
+        width = size or int(body.get('width', 1024))
+        height = size or int(body.get('height', 1024))
+        seed = body.get('seed') or self._random.randint(1, 2**32 - 1)
+        png = self._get_png(width, height)
+
+        return 200, {
+            'artifacts': [{
+                'base64': base64.b64encode(png).decode('ascii'),
+                'seed': seed,
+                'finishReason': 'SUCCESS'
+            }]
+        }
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+from src.quality.corpus_stats import CorpusStats
+
+
+@dataclass
+class Doc:
+    id: str
+    content: str
+    file_path: str
+    doc_type: str = "txt"
+
+
+def test_add_remove_and_reload(tmp_path):
+    path = str(tmp_path / "stats.json")
+    stats = CorpusStats(path)
+    stats.add_documents([
+        Doc("a", "x" * 100, "spring_boot.md"),
+        Doc("b", "y " * 400, "spring_data.md", "pdf"),
+        Doc("c", "z" * 3000, "notes.md"),
+    ])
+    stats.remove_documents(["c"])
+    stats.save()
+
+    snapshot = CorpusStats(path).snapshot()
+
+    assert snapshot['total_documents'] == 2
+    assert snapshot['median_content_length'] == 450
+    assert snapshot['avg_word_count'] == 200.5
+    assert snapshot['file_types'] == {'txt': 1, 'pdf': 1}
+    assert snapshot['top_sources'] == {'spring': 2}
+    assert snapshot['length_distribution'] == {'short': 1, 'medium': 1, 'long': 0}
+
+
+def test_sync_rebuilds_including_same_length_edits(tmp_path):
+    stats = CorpusStats(str(tmp_path / "stats.json"))
+    docs = [Doc("a", "uno dos", "a.md"), Doc("b", "tres", "b.md")]
+    stats.sync(docs)
+
+    assert stats.sync(docs) is False
+
+    # misma longitud, otra cantidad de palabras
+    docs[1].content = "a bc"
+    assert stats.sync(docs[1:]) is True
+    assert stats.snapshot()['total_documents'] == 1
+    assert stats.snapshot()['avg_word_count'] == 2
+    assert not (tmp_path / "stats.json").exists()
+
+
+def test_reader_sees_what_ingestion_saved(tmp_path):
+    path = str(tmp_path / "stats.json")
+    reader = CorpusStats(path)
+    writer = CorpusStats(path)
+    writer.add_documents([Doc("a", "uno dos", "a.md")])
+    writer.save()
+
+    assert reader.snapshot() == {}
+    assert reader.refresh() is True
+    assert reader.snapshot()['total_documents'] == 1
+    assert reader.refresh() is False
+
+
+def test_dashboard_counts_the_report_documents_when_stats_disagree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.quality.dashboard import QualityDashboard
+
+    ingested = CorpusStats("stats.json")
+    ingested.add_documents([Doc("txt_otro", "x" * 5000, "otro.md")])
+    ingested.save()
+    dashboard = QualityDashboard(corpus_stats=CorpusStats("stats.json"))
+
+    # dos archivos con el mismo stem comparten id pero se cuentan los dos
+    docs = [Doc("txt_readme", "uno dos", "spring_a.md"), Doc("txt_readme", "tres", "spring_b.md")]
+    stats = dashboard._calculate_corpus_stats(docs)
+
+    assert stats['total_documents'] == 2
+    assert stats['avg_word_count'] == 1.5
+    assert CorpusStats("stats.json").snapshot()['total_documents'] == 1
+
+    matching = [Doc("txt_otro", "ignorado", "otro.md")]
+    assert dashboard._calculate_corpus_stats(matching)['avg_content_length'] == 5000
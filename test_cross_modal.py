@@ -0,0 +1,38 @@
+import threading
+
+from src.cross_modal.cross_modal_coordinator import CrossModalCoordinator
+
+
+class FailingRag:
+    """falla cuando la imagen ya está en curso"""
+
+    def __init__(self, images):
+        self.images = images
+
+    def generate_answer(self, question, top_k):
+        self.images.started.wait(1)
+        raise RuntimeError("gemini caído")
+
+
+class SlowImageGenerator:
+    def __init__(self):
+        self.started = threading.Event()
+        self.finished = threading.Event()
+
+    def generate_with_quality_check(self, concept):
+        self.started.set()
+        self.finished.wait(0.2)
+        self.finished.set()
+        return {'success': True, 'path': "data/generated_images/mvc.png", 'prompt': concept}
+
+
+def test_image_branch_is_awaited_when_rag_fails():
+    images = SlowImageGenerator()
+    coordinator = CrossModalCoordinator(FailingRag(images), images, max_workers=1)
+
+    result = coordinator.process_cross_modal_query("explica la arquitectura mvc con un diagrama")
+
+    assert "gemini caído" in result['text_answer']
+    assert result['image_generated'] is False
+    # la rama de imagen ya arrancada terminó antes de responder, no quedó suelta
+    assert images.finished.is_set()
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from src.quality import feature_store
+from src.quality.feature_store import FeatureStore
+from src.quality.quality_metrics import QualityMetrics
+
+
+@dataclass
+class Doc:
+    id: str
+    title: str
+    content: str
+    file_path: str
+    doc_type: str
+
+
+def make_docs():
+    return [
+        Doc(f"txt_{i}", f"guía {i}", f"# Spring\n\nexample de api rest {i}. ```java\nclass A {{}}\n```",
+            f"data/raw/github_docs/spring/doc_{i}.md", "txt")
+        for i in range(5)
+    ]
+
+
+def test_matches_batch_extraction_and_reuses_rows(tmp_path):
+    metrics = QualityMetrics()
+    docs = make_docs()
+    expected = metrics.extract_features_batch(docs, n_jobs=1)
+
+    pd.testing.assert_frame_equal(FeatureStore(str(tmp_path), metrics).get_features(docs), expected, check_dtype=False)
+
+    # otra instancia lee del disco sin recalcular
+    store = FeatureStore(str(tmp_path), metrics)
+    metrics.extract_features_batch = None
+    pd.testing.assert_frame_equal(store.get_features(docs), expected, check_dtype=False)
+    assert len(store) == 5
+
+
+def test_recomputes_only_stale_rows(tmp_path):
+    metrics = QualityMetrics()
+    docs = make_docs()
+    store = FeatureStore(str(tmp_path), metrics)
+    store.get_features(docs)
+
+    docs[2].content += "\n\nTODO: fixme, work in progress"
+    computed = []
+    original = metrics.extract_features_batch
+    metrics.extract_features_batch = lambda batch, n_jobs=None: computed.extend(batch) or original(batch, n_jobs=1)
+
+    features = store.get_features(docs)
+
+    assert [doc.id for doc in computed] == ["txt_2"]
+    assert features['low_quality_indicators'].tolist() == [0, 0, 3, 0, 0]
+
+
+def test_batches_append_rows_and_compact_when_full(tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_store, "MIN_CAPACITY", 4)
+    metrics = QualityMetrics()
+    docs = make_docs()
+    store = FeatureStore(str(tmp_path), metrics)
+    other = FeatureStore(str(tmp_path), metrics)
+
+    store.get_features(docs[:2])
+    matrix_files = sorted(p.name for p in tmp_path.glob("features.*.npy"))
+    index_lines = (tmp_path / "index.jsonl").read_text().splitlines()
+
+    # el segundo lote entra en la capacidad: misma matriz, solo una línea más en el índice
+    store.get_features(docs[2:3])
+    assert sorted(p.name for p in tmp_path.glob("features.*.npy")) == matrix_files
+    assert (tmp_path / "index.jsonl").read_text().splitlines()[:len(index_lines)] == index_lines
+    assert len((tmp_path / "index.jsonl").read_text().splitlines()) == len(index_lines) + 1
+
+    # el tercero no entra: compacto en otra generación sin perder filas
+    docs[0].content += "\n\nTODO: fixme"
+    features = store.get_features(docs)
+    assert sorted(p.name for p in tmp_path.glob("features.*.npy")) != matrix_files
+    assert len(other) == 5
+    metrics.extract_features_batch = None
+    pd.testing.assert_frame_equal(other.get_features(docs), features)
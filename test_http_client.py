@@ -0,0 +1,88 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.image_generation.http_client import build_retry, create_session, retries_within_budget
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """responde los POST según la lista de la clase: un status o 'slow' (tarda más que el timeout)"""
+    script = []
+    calls = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        type(self).calls += 1
+        step = self.script.pop(0) if self.script else 200
+        if step == 'slow':
+            time.sleep(0.5)
+            step = 200
+        self.send_response(step)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    ScriptedHandler.script = []
+    ScriptedHandler.calls = 0
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/generate"
+    httpd.shutdown()
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self, tokens=1.0, timeout=None):
+        self.acquired += tokens
+        return True
+
+
+def post(url, timeout=(1.0, 5.0), rate_limiter=None):
+    session = create_session(retry=build_retry(total=3, backoff_factor=0, rate_limiter=rate_limiter))
+    return session.post(url, json={'prompt': "mvc"}, timeout=timeout)
+
+
+def test_post_is_retried_only_when_the_server_rejected_it(server):
+    ScriptedHandler.script = [429, 503]
+    assert post(server).status_code == 200
+    assert ScriptedHandler.calls == 3
+
+    ScriptedHandler.calls = 0
+    ScriptedHandler.script = [500]
+    assert post(server).status_code == 500
+    assert ScriptedHandler.calls == 1
+
+
+def test_post_is_not_resent_after_a_read_timeout(server):
+    ScriptedHandler.script = ['slow']
+    with pytest.raises(requests.exceptions.ConnectionError):
+        post(server, timeout=(1.0, 0.1))
+    time.sleep(0.5)
+    assert ScriptedHandler.calls == 1
+
+
+def test_each_retry_takes_a_token(server):
+    limiter = CountingLimiter()
+    ScriptedHandler.script = [429, 429, 503]
+
+    assert post(server, rate_limiter=limiter).status_code == 200
+    assert ScriptedHandler.calls == 4
+    assert limiter.acquired == 3
+
+
+def test_default_retries_fit_the_time_budget():
+    retries = retries_within_budget(budget_s=180, timeout=(5.0, 90.0), backoff_max=10.0)
+    assert retries * (5.0 + 10.0) + 95.0 <= 180
+    assert retries_within_budget(budget_s=60, timeout=(5.0, 90.0)) == 0
@@ -0,0 +1,82 @@
+import base64
+from io import BytesIO
+
+from PIL import Image
+
+from src.image_generation.image_generator import ImageGenerator
+from src.image_generation.phash_index import PerceptualHashIndex
+
+
+def png_base64(color):
+    image = Image.new('RGB', (32, 32), color)
+    image.paste((255, 255, 255), (0, 0, 16, 32))
+    buffer = BytesIO()
+    image.save(buffer, format='PNG')
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """siempre devuelve la misma imagen, como el servidor fake de src/stubs"""
+
+    def __init__(self):
+        self.image = png_base64((0, 0, 0))
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        return FakeResponse({'artifacts': [{'base64': self.image}]})
+
+
+class NoLimit:
+    def acquire(self, tokens=1):
+        return 0.0
+
+
+def make_generator(tmp_path):
+    return ImageGenerator("test-key", output_dir=str(tmp_path), api_url="http://fake",
+                          session=FakeSession(), rate_limiter=NoLimit())
+
+
+def test_explicit_save_path_is_written_and_indexed(tmp_path):
+    generator = make_generator(tmp_path)
+    target = tmp_path / "mvc.png"
+
+    result = generator.generate_image("spring mvc diagram", save_path=str(target))
+
+    assert result['success'], result
+    assert result['path'] == str(target)
+    assert target.exists()
+    assert len(generator.phash_index) == 1
+
+
+def test_retries_with_other_params_reuse_the_image_unless_scoped(tmp_path):
+    generator = make_generator(tmp_path)
+
+    first = generator.generate_image("spring mvc diagram", steps=30, seed=1)
+    retry = generator.generate_image("spring mvc diagram, clear lines", steps=40, cfg_scale=8.5, seed=2)
+    scoped = generator.generate_image("jpa entity diagram", dedupe_scope="jpa")
+
+    assert not first['duplicate']
+    assert retry['duplicate'] and retry['path'] == first['path']
+    assert not scoped['duplicate'] and scoped['path'] != first['path']
+    assert len(list(tmp_path.glob("*.png"))) == 2
+
+
+def test_index_sees_images_added_by_another_process(tmp_path):
+    api_index = PerceptualHashIndex(str(tmp_path))
+    worker_index = PerceptualHashIndex(str(tmp_path))
+    image_path = tmp_path / "generated.png"
+    image_path.write_bytes(base64.b64decode(png_base64((0, 0, 0))))
+
+    worker_index.add(0x0F0F0F0F0F0F0F0F, str(image_path))
+
+    assert api_index.find(0x0F0F0F0F0F0F0F0E) == (str(image_path), 1)
@@ -0,0 +1,68 @@
+import time
+
+from src.jobs.job_queue import JobQueue, QUEUED, RUNNING, COMPLETED, FAILED
+
+
+def wait_for(queue, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in (COMPLETED, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"el trabajo {job_id} no terminó")
+
+
+def test_submit_claim_complete(tmp_path):
+    queue = JobQueue(lambda payload: {'concept': payload['concept'].upper()},
+                     db_path=str(tmp_path / "jobs.db"), workers=1, poll_interval=0.05)
+    first = queue.submit({'concept': "mvc"})
+    second = queue.submit({'concept': "jpa"})
+
+    assert queue.get(first)['status'] == QUEUED
+    assert queue.get(second)['queue_position'] == 1
+
+    queue.start()
+    try:
+        job = wait_for(queue, first)
+        assert job['status'] == COMPLETED
+        assert job['result'] == {'concept': "MVC"}
+        assert job['attempts'] == 1
+        assert wait_for(queue, second)['result'] == {'concept': "JPA"}
+    finally:
+        queue.stop()
+
+    assert queue.get_stats() == {COMPLETED: 2}
+
+
+def test_failed_handler_marks_job_failed(tmp_path):
+    def handler(payload):
+        raise RuntimeError("api caída")
+
+    queue = JobQueue(handler, db_path=str(tmp_path / "jobs.db"), workers=1, poll_interval=0.05).start()
+    try:
+        job = wait_for(queue, queue.submit({'concept': "mvc"}))
+    finally:
+        queue.stop()
+
+    assert job['status'] == FAILED
+    assert "api caída" in job['error']
+
+
+def test_running_jobs_are_recovered_after_a_crash(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    crashed = JobQueue(lambda payload: {}, db_path=db_path)
+    job_id = crashed.submit({'concept': "mvc"})
+    # el proceso tomó el trabajo y murió antes de terminarlo
+    assert crashed._claim()['id'] == job_id
+    assert crashed.get(job_id)['status'] == RUNNING
+
+    restarted = JobQueue(lambda payload: {'ok': True}, db_path=db_path, workers=1, poll_interval=0.05).start()
+    try:
+        job = wait_for(restarted, job_id)
+    finally:
+        restarted.stop()
+
+    assert job['status'] == COMPLETED
+    assert job['result'] == {'ok': True}
+    assert job['attempts'] == 2
@@ -0,0 +1,27 @@
+from src.monitoring.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "duración", labelnames=("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="encode_query")
+    histogram.observe(0.5, stage="encode_query")
+
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="encode_query",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="encode_query",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="encode_query",le="+Inf"} 2' in text
+    assert 'stage_seconds_count{stage="encode_query"} 2' in text
+
+
+def test_counter_requires_declared_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("blocks_total", "bloqueos", labelnames=("component",))
+    counter.inc(component="rag_engine")
+    assert counter.get(component="rag_engine") == 1
+
+    try:
+        counter.inc(stage="otro")
+        assert False, "debería fallar con labels desconocidos"
+    except ValueError:
+        pass
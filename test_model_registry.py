@@ -0,0 +1,32 @@
+import numpy as np
+
+from src.quality import anomaly_detector
+from src.quality.anomaly_detector import AnomalyDetector
+from src.quality.feature_store import FeatureStore
+
+
+def fitted_detector(tmp_path, seed):
+    detector = AnomalyDetector(model_path=str(tmp_path / "anomaly.joblib"),
+                               feature_store=FeatureStore(str(tmp_path / "features")))
+    X = np.random.default_rng(seed).normal(size=(50, len(AnomalyDetector.FEATURE_COLUMNS)))
+    detector.scaler, detector.pca, detector.model = AnomalyDetector.fit_components(X, 0.1)
+    detector.feature_names = list(AnomalyDetector.FEATURE_COLUMNS)
+    return detector
+
+
+def test_failed_save_keeps_the_freshly_trained_model(tmp_path, monkeypatch):
+    fitted_detector(tmp_path, seed=0)._save_model()
+
+    detector = fitted_detector(tmp_path, seed=1)
+    fresh_model = detector.model
+
+    def broken_dump(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(anomaly_detector.joblib, "dump", broken_dump)
+    detector._save_model()
+    detector.is_trained = True
+
+    # el registro no reemplaza el modelo en memoria por el archivo viejo
+    assert detector.is_trained
+    assert detector.model is fresh_model
@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+import numpy as np
+
+from src.quality import model_search
+
+GRID = {'n_estimators': [5, 10], 'max_depth': [2, None], 'min_samples_leaf': [1, 3]}
+
+
+def test_successive_halving_and_cleanup(monkeypatch):
+    created = []
+    mkdtemp = tempfile.mkdtemp
+
+    def tracking_mkdtemp(*args, **kwargs):
+        created.append(mkdtemp(*args, **kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(model_search.tempfile, "mkdtemp", tracking_mkdtemp)
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(90, 4))
+    y = (X[:, 0] > 0).astype(int) + (X[:, 1] > 1).astype(int)
+
+    report = model_search.search(X, y, param_grid=GRID, cv=3, n_jobs=1)
+
+    # 8 candidatos en el primer fold, 4 en el segundo, 2 en el último
+    evaluated = sorted((r['folds_evaluated'] for r in report['results']), reverse=True)
+    assert evaluated == [3, 3, 2, 2, 1, 1, 1, 1]
+    assert report['fold_fits'] == 14
+
+    finalists = [r for r in report['results'] if r['folds_evaluated'] == 3]
+    assert report['best_params'] in [r['params'] for r in finalists]
+    assert report['best_cv_accuracy'] == max(r['mean_accuracy'] for r in finalists)
+
+    assert len(created) == 1 and not os.path.exists(created[0])
@@ -0,0 +1,22 @@
+from src.image_generation.rate_limiter import TokenBucket, run_batch
+
+
+def test_token_bucket_respects_capacity():
+    bucket = TokenBucket(rate=1, capacity=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_run_batch_keeps_order_and_isolates_failures():
+    def generate(concept):
+        if concept == "falla":
+            raise RuntimeError("api caída")
+        return {'success': True, 'concept': concept}
+
+    results = run_batch(generate, ["mvc", "falla", "jpa"], max_workers=3)
+
+    assert [r['success'] for r in results] == [True, False, True]
+    assert results[0]['concept'] == "mvc"
+    assert results[2]['concept'] == "jpa"
+    assert "api caída" in results[1]['error']
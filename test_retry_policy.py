@@ -0,0 +1,33 @@
+import time
+
+from src.image_generation.retry_policy import AdaptiveRetryPolicy, AttemptRecord
+
+
+def test_stops_when_score_is_too_far_from_minimum():
+    policy = AdaptiveRetryPolicy(min_quality_score=0.9, max_attempts=3, time_budget_s=None)
+    history = [AttemptRecord(attempt=1, duration_s=1.0, params={}, global_score=0.4)]
+
+    assert policy.should_retry(history, time.monotonic()) == (False, "unrecoverable_gap")
+
+
+def test_stops_on_permanent_error_and_budget():
+    policy = AdaptiveRetryPolicy(max_attempts=3, time_budget_s=10)
+    rejected = [AttemptRecord(attempt=1, duration_s=1.0, params={}, error="API error (400): bad request")]
+    slow = [AttemptRecord(attempt=1, duration_s=8.0, params={}, global_score=0.55)]
+
+    assert policy.should_retry(rejected, time.monotonic()) == (False, "permanent_error")
+    assert policy.should_retry(slow, time.monotonic() - 8.0) == (False, "time_budget")
+
+
+def test_adjust_targets_weak_metrics():
+    policy = AdaptiveRetryPolicy()
+    prompt, negative, params, _ = policy.adjust(
+        "spring mvc", "blurry",
+        {'steps': 30, 'cfg_scale': 7, 'seed': 5},
+        {'sharpness': 0.2, 'technical_clarity': 0.3, 'contrast': 0.9}
+    )
+
+    assert params == {'steps': 40, 'cfg_scale': 8.5, 'seed': 6}
+    assert "technical diagram, clear lines" in prompt
+    assert "high contrast" not in prompt
+    assert "cluttered" in negative
@@ -0,0 +1,47 @@
+import numpy as np
+
+from src.search.semantic_search import QualityRanker, SemanticSearch
+
+
+class FakeEmbeddingEngine:
+    def encode_query(self, query):
+        return np.zeros(3)
+
+
+class FakeVectorStore:
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def search_similar(self, query_embedding, top_k=10, where=None):
+        self.calls.append((top_k, where))
+        return self.results[:top_k]
+
+
+def result(doc_id, similarity, **metadata):
+    return {'id': doc_id, 'similarity': similarity, 'content_preview': doc_id,
+            'metadata': {'title': doc_id, **metadata}}
+
+
+def test_quality_signals_reorder_close_candidates():
+    store = FakeVectorStore([
+        result("blog_todo", 0.82, quality_score=20, source_reliability=0.4, is_anomaly=True),
+        result("forum_copy", 0.81, quality_score=35, source_reliability=0.4),
+        result("spring_reference", 0.78, quality_score=90, source_reliability=1.0),
+    ])
+    search = SemanticSearch(store, FakeEmbeddingEngine())
+
+    results = search.search("spring mvc", top_k=1)
+
+    assert [r.document_id for r in results] == ["spring_reference"]
+    assert results[0].similarity_score == 0.78
+    assert store.calls == [(3, None)]
+
+
+def test_unscored_corpus_keeps_similarity_order():
+    store = FakeVectorStore([result("a", 0.9), result("b", 0.7), result("c", 0.5), result("d", 0.05)])
+    search = SemanticSearch(store, FakeEmbeddingEngine(), ranking=QualityRanker())
+
+    results = search.search("java", top_k=5, min_similarity=0.1)
+
+    assert [r.document_id for r in results] == ["a", "b", "c"]
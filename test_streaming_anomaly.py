@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from src.quality.anomaly_detector import AnomalyDetector
+from src.quality.streaming_anomaly import FeatureDriftMonitor, ReservoirSample, StreamingAnomalyDetector
+
+
+def test_online_statistics_match_full_pass():
+    X = np.random.default_rng(0).normal(5.0, 2.0, size=(1000, 3))
+    monitor = FeatureDriftMonitor(reference_mean=np.full(3, 5.0), reference_std=np.full(3, 2.0))
+
+    for start in range(0, len(X), 137):
+        monitor.update(X[start:start + 137], n_anomalies=1)
+
+    assert np.allclose(monitor.mean, X.mean(axis=0))
+    assert np.allclose(monitor.std, X.std(axis=0))
+    assert monitor.drift_score() < 0.2
+    assert monitor.anomaly_rate == 8 / 1000
+
+
+def test_drift_is_measured_in_training_standard_deviations():
+    monitor = FeatureDriftMonitor(reference_mean=np.zeros(2), reference_std=np.array([1.0, 0.0]))
+    monitor.update(np.array([[2.0, 3.0], [2.0, 3.0]]))
+
+    # una feature constante en el entrenamiento no divide por cero
+    assert monitor.feature_shift().tolist() == [2.0, 3.0]
+
+
+def test_reservoir_keeps_fixed_size_sample():
+    reservoir = ReservoirSample(capacity=100, n_features=1)
+    for start in range(0, 1000, 50):
+        reservoir.add(np.arange(start, start + 50, dtype=float)[:, None])
+
+    assert reservoir.rows.shape == (100, 1)
+    assert reservoir.seen == 1000
+    assert reservoir.rows.max() >= 500
+
+
+class FakeScaler:
+    def __init__(self, n):
+        self.mean_ = np.zeros(n)
+        self.scale_ = np.ones(n)
+
+
+class FakeFeatureStore:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def sample(self, max_rows, seed=42):
+        return self.frame.head(max_rows)
+
+
+class FakeDetector:
+    """el modelo aparece recién después de construir el streaming, como con la carga diferida"""
+
+    def __init__(self, tmp_path):
+        n = len(AnomalyDetector.FEATURE_COLUMNS)
+        self.model_path = tmp_path / "anomaly.joblib"
+        self.is_trained = False
+        self.scaler = None
+        self.contamination = 0.1
+        self._artifact_version = None
+        self.feature_store = FakeFeatureStore(pd.DataFrame(np.zeros((50, n)), columns=AnomalyDetector.FEATURE_COLUMNS))
+
+    def train(self, version):
+        self.is_trained = True
+        self.scaler = FakeScaler(len(AnomalyDetector.FEATURE_COLUMNS))
+        self._artifact_version = version
+
+    def prepare_features(self, documents, features=None):
+        return np.ones((len(documents), len(AnomalyDetector.FEATURE_COLUMNS)))
+
+    def score_matrix(self, X):
+        return np.full(len(X), 0.5)
+
+
+def test_monitor_is_built_when_model_appears_and_reset_on_new_artifact(tmp_path):
+    detector = FakeDetector(tmp_path)
+    stream = StreamingAnomalyDetector(detector, min_samples=10 ** 6, background=False)
+    assert stream.monitor is None
+
+    detector.train(version=(1, 1))
+    docs = [SimpleNamespace(id=str(i), title=str(i), file_path="doc") for i in range(5)]
+    assert len(stream.score_batch(docs)) == 5
+    assert stream.monitor.count == 5
+    assert len(stream.reference) == 50
+
+    detector.train(version=(2, 1))
+    stream.score_batch(docs[:2])
+    assert stream.monitor.count == 2
+
+
+def test_refit_matrix_keeps_minimum_share_of_reference_rows(tmp_path):
+    stream = StreamingAnomalyDetector(FakeDetector(tmp_path), min_reference_share=0.5, background=False)
+    reference = np.zeros((30, 2))
+    new_rows = np.ones((100, 2))
+
+    X = stream._training_matrix(reference, new_rows)
+
+    assert len(X) == 60
+    assert (X == 0).all(axis=1).sum() == 30
+    assert stream._training_matrix(np.empty((0, 2)), new_rows) is None
@@ -16,9 +16,14 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.image_generation.advanced_image_generator import AdvancedImageGenerator
 from src.image_generation.style_controller import StyleController, DiagramType, ColorScheme
+from src.image_generation.thumbnail_cache import ThumbnailCache
+from src.jobs.job_queue import JobQueue, QUEUED, RUNNING, COMPLETED
 
 load_dotenv()
 
+# cada cuánto se vuelve a ejecutar la página mientras hay un trabajo en curso
+JOB_POLL_INTERVAL_S = 1.0
+
 # configuración de la página
 st.set_page_config(
     page_title="Generador de Diagramas Técnicos",
@@ -78,6 +83,9 @@ if 'generated_images' not in st.session_state:
 if 'generation_history' not in st.session_state:
     st.session_state.generation_history = []
 
+if 'active_job' not in st.session_state:
+    st.session_state.active_job = None
+
 def initialize_generator():
     """inicializo el generador con cache"""
     api_key = os.getenv("STABILITY_API_KEY")
@@ -98,6 +106,76 @@ def initialize_generator():
         max_retries=2
     )
 
+def run_generation_job(payload, generators=None):
+    """
+    corro una generación en un worker de la cola (fuera del script de streamlit)
+    generators guarda un generador por configuración: sesión http, cache y validador
+    se reutilizan entre trabajos en vez de armarse en cada uno
+    """
+    key = (payload['min_quality'], payload['max_retries'])
+    generator = generators.get(key) if generators is not None else None
+    if generator is None:
+        generator = AdvancedImageGenerator(
+            api_key=os.getenv("STABILITY_API_KEY"),
+            min_quality_score=payload['min_quality'],
+            max_retries=payload['max_retries']
+        )
+        if generators is not None:
+            generators[key] = generator
+    
+    start_time = time.time()
+    if payload.get('preset'):
+        result = generator.generate_with_preset(payload['concept'], payload['preset'])
+    else:
+        result = generator.generate_with_quality_check(payload['concept'])
+    result['elapsed_time'] = time.time() - start_time
+    return result
+
+@st.cache_resource
+def get_job_queue():
+    """una cola por proceso de streamlit; los trabajos pendientes se retoman al reiniciar"""
+    # los generadores viven lo mismo que la cola (un solo worker, no hace falta lock)
+    generators = {}
+    return JobQueue(
+        lambda payload: run_generation_job(payload, generators),
+        db_path="data/jobs/ui_image_jobs.db",
+        workers=1,
+        name="ui_image_jobs"
+    ).start()
+
+@st.cache_resource
+def get_thumbnail_cache():
+    """miniaturas en disco compartidas entre sesiones"""
+    return ThumbnailCache("data/thumbnails")
+
+def show_thumbnail(img_path, caption=None):
+    """muestro la miniatura en vez del png completo de 1024x1024"""
+    thumb_path = get_thumbnail_cache().get_thumbnail(img_path)
+    if thumb_path is None:
+        st.warning("imagen no disponible")
+        return
+    st.image(thumb_path, caption=caption, use_container_width=True)
+
+def paginate(items, key, page_sizes=(12, 24, 48)):
+    """controles de paginación; retorno solo los elementos de la página actual"""
+    col1, col2, col3 = st.columns([1, 1, 2])
+    
+    with col1:
+        page_size = st.selectbox("por página:", page_sizes, key=f"{key}_page_size")
+    
+    total_pages = max(1, (len(items) + page_size - 1) // page_size)
+    
+    with col2:
+        page = st.number_input(
+            "página:", min_value=1, max_value=total_pages, value=1, step=1, key=f"{key}_page"
+        )
+    
+    with col3:
+        st.caption(f"{len(items)} elementos · página {page} de {total_pages}")
+    
+    start = (page - 1) * page_size
+    return items[start:start + page_size]
+
 def show_quality_metrics(validation_result):
     """muestro métricas de calidad de forma visual"""
     scores = validation_result['scores']
@@ -268,70 +346,90 @@ def show_generation_tab(preset, min_quality, max_retries):
     
     if generate_button and concept:
         generate_image(concept, preset, min_quality, max_retries)
+    
+    # si hay un trabajo en curso (también tras un rerun) sigo consultando su estado
+    if st.session_state.active_job:
+        poll_generation_job()
 
 def generate_image(concept, preset, min_quality, max_retries):
-    """genero imagen con validación"""
+    """encolo la generación; el resultado lo consulta poll_generation_job"""
     
-    generator = initialize_generator()
-    if not generator:
+    if not os.getenv("STABILITY_API_KEY"):
+        initialize_generator()
         return
     
-    generator.min_quality_score = min_quality
-    generator.max_retries = max_retries
+    job_id = get_job_queue().submit({
+        'concept': concept,
+        'preset': preset,
+        'min_quality': min_quality,
+        'max_retries': max_retries
+    })
+    
+    st.session_state.active_job = {
+        'job_id': job_id,
+        'concept': concept,
+        'submitted_at': time.time()
+    }
+
+def poll_generation_job():
+    """
+    consulto el estado del trabajo activo una vez por ejecución del script;
+    si sigue en curso espero un momento y pido un rerun, así la página no queda bloqueada
+    """
     
-    progress_container = st.container()
+    job_queue = get_job_queue()
+    active = st.session_state.active_job
     
-    with progress_container:
-        st.markdown("---")
-        st.subheader("generando diagrama...")
-        
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        status_text.text("inicializando generador...")
-        progress_bar.progress(10)
-        time.sleep(0.5)
+    st.markdown("---")
+    st.subheader("generando diagrama...")
+    
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    job = job_queue.get(active['job_id'])
+    
+    if job is None:
+        st.error("no se encontró el trabajo de generación")
+        st.session_state.active_job = None
+        return
+    
+    waited = time.time() - active['submitted_at']
+    
+    if job['status'] in (QUEUED, RUNNING):
+        if job['status'] == QUEUED:
+            status_text.text(f"en cola (posición {job.get('queue_position', 0) + 1})...")
+            progress_bar.progress(10)
+        else:
+            status_text.text(f"generando y validando imagen... {waited:.0f}s")
+            # la duración real depende de los reintentos, avanzo hasta 90% en ~60s
+            progress_bar.progress(min(30 + int(waited), 90))
+        time.sleep(JOB_POLL_INTERVAL_S)
+        st.rerun()
+    
+    st.session_state.active_job = None
+    
+    if job['status'] != COMPLETED:
+        st.error(f"error inesperado: {job['error']}")
+        return
+    
+    result = job['result']
+    elapsed_time = result.get('elapsed_time', waited)
+    
+    if result.get('success'):
+        progress_bar.progress(100)
+        status_text.text("generación completada")
         
-        status_text.text("generando imagen...")
-        progress_bar.progress(30)
+        show_generation_result(result, active['concept'], elapsed_time)
         
-        start_time = time.time()
+        st.session_state.generation_history.append({
+            'concept': active['concept'],
+            'result': result,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'elapsed_time': elapsed_time
+        })
         
-        try:
-            if preset:
-                result = generator.generate_with_preset(concept, preset)
-            else:
-                result = generator.generate_with_quality_check(concept)
-            
-            elapsed_time = time.time() - start_time
-            
-            progress_bar.progress(70)
-            
-            if result.get('success'):
-                status_text.text("validando calidad...")
-                progress_bar.progress(90)
-                time.sleep(0.5)
-                
-                progress_bar.progress(100)
-                status_text.text("generación completada")
-                
-                show_generation_result(result, concept, elapsed_time)
-                
-                st.session_state.generation_history.append({
-                    'concept': concept,
-                    'result': result,
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'elapsed_time': elapsed_time
-                })
-                
-            else:
-                st.error(f"error: {result.get('error', 'Unknown error')}")
-                
-        except Exception as e:
-            st.error(f"error inesperado: {e}")
-            import traceback
-            with st.expander("ver detalles del error"):
-                st.code(traceback.format_exc())
+    else:
+        st.error(f"error: {result.get('error') or result.get('reason', 'Unknown error')}")
 
 def show_generation_result(result, concept, elapsed_time):
     """muestro el resultado de la generación"""
@@ -416,18 +514,19 @@ def show_gallery_tab():
         st.warning("no hay imágenes que cumplan los filtros seleccionados")
         return
     
+    # solo cargo las miniaturas de la página visible
+    page_items = paginate(history, key="gallery")
+    
     cols_per_row = 3
-    for i in range(0, len(history), cols_per_row):
+    for i in range(0, len(page_items), cols_per_row):
         cols = st.columns(cols_per_row)
         
         for j, col in enumerate(cols):
-            if i + j < len(history):
-                item = history[i + j]
+            if i + j < len(page_items):
+                item = page_items[i + j]
                 
                 with col:
-                    img_path = item['result']['generation']['path']
-                    image = Image.open(img_path)
-                    st.image(image, use_container_width=True)
+                    show_thumbnail(item['result']['generation']['path'])
                     
                     quality = item['result']['validation']['global_score']
                     st.caption(f"{quality:.0%} | {item['elapsed_time']:.1f}s")
@@ -479,6 +578,10 @@ def show_statistics_tab():
     
     st.line_chart(df.set_index('generación')['calidad'])
     
+    st.markdown("historial")
+    
+    st.dataframe(paginate(df, key="statistics"), use_container_width=True, hide_index=True)
+    
     st.markdown("top 3 mejores imágenes")
     
     top_3 = sorted(history, key=lambda x: x['result']['validation']['global_score'], reverse=True)[:3]
@@ -487,9 +590,7 @@ def show_statistics_tab():
     for i, (col, item) in enumerate(zip(cols, top_3)):
         with col:
             st.markdown(f"#{i+1}")
-            img_path = item['result']['generation']['path']
-            image = Image.open(img_path)
-            st.image(image, use_container_width=True)
+            show_thumbnail(item['result']['generation']['path'])
             st.caption(f"{item['result']['validation']['global_score']:.0%}")
 
 if __name__ == "__main__":